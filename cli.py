@@ -0,0 +1,1276 @@
+# -*- coding: utf-8 -*-
+"""Command line tools used by the generated batch files and automation (no Qt import)."""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import shutil
+import tempfile
+import argparse
+import subprocess
+from pathlib import Path
+
+from core import (
+    DEFAULT_ATTRIBUTE_PROFILE, DIFF_CHUNK_RECORDS, FILETOOLS_EXE_NAME, FRAME_BUDGET_MS, INTERMEDIATE_FILES,
+    COLUMNAR_SUFFIX, CONVERTED_SUFFIX, CONVERT_FAILED_SUFFIX, DEFAULT_MAX_SESSIONS, DEFAULT_WARM_ROOT, ESTIMATE_TARGETS,
+    DEFAULT_EXPORT_MODE, DEFAULT_QUALITY_PROFILE, EXPORT_MODES, NUMERIC_ATTRIBUTES, SCHEDULES_FOLDER_NAME,
+    DEFAULT_CATALOG_ROOT, DEFAULT_TILE_TYPES, TILE_IMBALANCE_WARN,
+    PROJECTS_FILE_NAME, PUBLISH_CHUNK_SIZE, RETENTION_DEFAULTS, TYPE_COUNTS_FILE_NAME,
+    CatalogScan, ColumnarDump, CountScan, ExportEstimator, IntermediateArchive, ObjectFilterIndex, PartitionedExport,
+    PipelinedExport, ProjectRegistry, TiledExport,
+    atomic_write_text, attribute_size_stats, diff_attribute_dumps, federate_parts, load_attribute_profiles,
+    load_type_counts, publish_file, convert_part, fit_in_window, record_run_stats, record_type_counts,
+    register_nwd_version, split_by_discipline, object_costs, plan_report, plan_shards,
+    convert_attribute_dump, iter_cadc_elements, parse_number, export_mode, register_schedules, schedule_commands,
+    app_dir, self_command, RunLog, RUNLOG_RETENTION, follow_rvm_log,
+    catalog_is_stale, expand_object_patterns, load_catalog, record_catalog, resolve_object_patterns,
+    plan_tiles, tile_report, uncovered_elements, quality_project, single_pass_report, ATTRIBUTES_DUMP_SUFFIX,
+)
+from jobqueue import JOB_LEASE_SECONDS, WORKER_POLL_SECONDS, JobQueue, E3DRunner, FakeRunner, run_worker
+from warm import WARM_MAX_JOBS, WARM_MAX_MEMORY_MB, WarmSession, WarmSessionError, warm_sessions
+
+# Startup budgets checked by 'startup-check' (operators start the tool on slow VDI machines)
+IMPORT_BUDGET_MS = 300         # import of the command line tools, paid by every batch callback
+FIRST_PAINT_BUDGET_MS = 2500   # process start until the main window has painted
+
+
+def _normalized_settings(path):
+    """A settings.json with forward slashes in every path, as the generators expect (like the GUI)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {k: (v.replace("\\", "/") if isinstance(v, str) else v) for k, v in data.items()}
+
+
+def _cli_publish(args):
+    """Publishes a finished NWD to the output folder and registers it as the latest version."""
+    target, digest = publish_file(args.source, args.dest)
+    print(f"[PUBLISH] {target}")
+    if args.project:
+        record = register_nwd_version(target, args.dest, args.project, digest)
+        state = "deduplicated" if record["deduplicated"] else "new content"
+        print(f"[PUBLISH] {args.project}-latest.nwd -> {target.name} ({state})")
+        RunLog(args.dest, args.project).append("published", nwd=target.name, sha256=digest,
+                                               deduplicated=record["deduplicated"])
+    if args.cleanup:
+        shutil.rmtree(args.cleanup, ignore_errors=True)
+        print(f"[PUBLISH] Removed scratch folder {args.cleanup}")
+    return 0
+
+
+def _cli_retain(args):
+    """Archives the intermediates of a finished run and applies the retention policy."""
+    folder = Path(args.folder)
+    files = [path for pattern in INTERMEDIATE_FILES for path in sorted(folder.glob(pattern))]
+    archive = IntermediateArchive(args.archive_root, args.project)
+    if files:
+        run_id = archive.archive_run(files)
+        for path in files:
+            path.unlink()
+        print(f"[RETAIN] Archived run {run_id} ({archive.codec()})")
+
+    for run_id in archive.enforce(args.keep_runs, args.max_total_mb, args.max_age_days):
+        print(f"[RETAIN] Evicted run {run_id}")
+    return 0
+
+
+def _cli_archive_cat(args):
+    """Streams an archived intermediate file to stdout without unpacking it to disk."""
+    archive = IntermediateArchive(args.archive_root, args.project)
+    run_id = args.run or next((meta["run_id"] for meta in archive.runs()), None)
+    if run_id is None:
+        print(f"No archived runs for {args.project}", file=sys.stderr)
+        return 1
+    with archive.open(run_id, args.name) as stream:
+        shutil.copyfileobj(stream, sys.stdout.buffer, PUBLISH_CHUNK_SIZE)
+    return 0
+
+
+def _cli_diff_attributes(args):
+    """Compares two attribute dumps; exit code 1 means they differ (like diff)."""
+    report = diff_attribute_dumps(args.old, args.new, max_details=args.max_details,
+                                  ignore=args.ignore_attr, chunk_records=args.chunk_records)
+    summary = report["summary"]
+    print(f"[DIFF] added: {summary['added']}  removed: {summary['removed']}  "
+          f"changed: {summary['changed']}  unchanged: {summary['unchanged']}")
+    for key, count in sorted(report["attributes"].items(), key=lambda item: -item[1])[:20]:
+        print(f"[DIFF]   {key}: {count} change(s)")
+
+    if args.report:
+        atomic_write_text(args.report, json.dumps(report, indent=1, ensure_ascii=False))
+        print(f"[DIFF] Report written to {args.report}")
+    return 1 if summary["added"] or summary["removed"] or summary["changed"] else 0
+
+
+def _cli_profile_report(args):
+    """Compares dump sizes before and after an attribute profile (measured or projected)."""
+    before = attribute_size_stats(args.before)
+    if args.after:
+        after = attribute_size_stats(args.after)
+        label = args.after
+    else:
+        profiles = load_attribute_profiles()
+        if args.profile not in profiles:
+            print(f"Unknown attribute profile '{args.profile}'", file=sys.stderr)
+            return 2
+        after = attribute_size_stats(args.before, profiles[args.profile])
+        label = f"profile '{args.profile}' (projected)"
+
+    ratio = before["bytes"] / after["bytes"] if after["bytes"] else float("inf")
+    print(f"[PROFILE] before: {before['bytes'] / 1e6:.1f} MB, {before['elements']} elements, "
+          f"{before['attribute_lines']} attribute lines")
+    print(f"[PROFILE] after:  {after['bytes'] / 1e6:.1f} MB, {after['elements']} elements, "
+          f"{after['attribute_lines']} attribute lines  <- {label}")
+    print(f"[PROFILE] reduction: {ratio:.1f}x")
+    print("[PROFILE] largest attributes before (MB before -> after):")
+    for key, size in sorted(before["by_attribute"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"[PROFILE]   {key:<30} {size / 1e6:8.2f} -> {after['by_attribute'].get(key, 0) / 1e6:8.2f}")
+    return 0
+
+
+def _cli_columnar(args):
+    """Converts a CADC attribute dump into the columnar layout (and optionally Parquet)."""
+    start = time.perf_counter()
+    numeric = list(NUMERIC_ATTRIBUTES) + (args.numeric or [])
+    meta = convert_attribute_dump(args.dump, args.target, numeric)
+    target = Path(args.target) if args.target else Path(meta["source"]).with_name(
+        Path(meta["source"]).name.split(".")[0] + COLUMNAR_SUFFIX)
+    numeric_columns = [name for name, info in meta["columns"].items() if info["kind"] == "float64"]
+    print(f"[COLUMNAR] {meta['rows']} elements, {len(meta['columns'])} columns "
+          f"({len(numeric_columns)} numeric) in {time.perf_counter() - start:.1f}s -> {target}")
+    if args.parquet:
+        print(f"[COLUMNAR] {ColumnarDump(target).to_parquet(args.parquet)}")
+    return 0
+
+
+def _cli_column_summary(args):
+    """Sums the numeric columns of a converted dump per element type (the MTO quantities)."""
+    dump = ColumnarDump(args.folder)
+    start = time.perf_counter()
+    summary = dump.summarize(args.by)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(summary, indent=4))
+    else:
+        columns = [name for name, info in dump.meta["columns"].items() if info["kind"] == "float64"]
+        units = {name: dump.meta["columns"][name]["unit"] for name in columns}
+        print(f"{args.by:<10} {'count':>8}  " + "  ".join(f"{f'{name} [{units[name]}]':>22}" for name in columns))
+        for group, stats in sorted(summary.items(), key=lambda item: -item[1]["count"]):
+            sums = "  ".join(f"{stats[name]['sum'] if name in stats else 0:>22,.1f}" for name in columns)
+            print(f"{group or '-':<10} {stats['count']:>8}  {sums}")
+    print(f"[SUMMARY] {dump.rows} elements summarized in {elapsed * 1000:.0f} ms ({dump.engine})", file=sys.stderr)
+
+    if args.compare:
+        # What the QA/MTO scripts do today: re-parse the text dump element by element
+        start = time.perf_counter()
+        sums = {}
+        for name, attributes in iter_cadc_elements(args.compare):
+            for key, value in attributes.items():
+                if key in dump.meta["columns"] and dump.meta["columns"][key]["kind"] == "float64":
+                    number, _ = parse_number(value)
+                    if number == number:
+                        sums[key] = sums.get(key, 0.0) + number
+        reparse = time.perf_counter() - start
+        columnar = {key: sum(stats[key]["sum"] for stats in summary.values() if key in stats) for key in sums}
+        same = all(abs(columnar[key] - sums[key]) <= 1e-6 * max(1.0, abs(sums[key])) for key in sums)
+        print(f"[SUMMARY] text re-parse: {reparse * 1000:.0f} ms, columnar: {elapsed * 1000:.0f} ms "
+              f"({reparse / max(elapsed, 1e-9):.0f}x), totals {'match' if same else 'DIFFER'}", file=sys.stderr)
+        return 0 if same else 1
+    return 0
+
+
+def _cli_record_counts(args):
+    """
+    Stores the TYPE_COUNTS.txt written by attribute.mac and removes it. After an export
+    the run's duration and file sizes go to the estimator history as well.
+    """
+    counts_file = Path(args.counts_file)
+    if not counts_file.exists():
+        # Geometry-only runs dump no attributes; their stats use the last known element count
+        elements = ExportEstimator(args.output_folder).elements(args.project) if args.mode == "geometry" else None
+        if elements:
+            record_run_stats(args.output_folder, args.project, elements, counts_file.parent, args.nwd, args.mode)
+            print(f"[COUNTS] Geometry-only run of {elements} elements recorded")
+        else:
+            print(f"[COUNTS] {counts_file} not found, nothing recorded")
+        return 0
+    kind = "prescan-counts" if args.prescan else "type-counts"
+    record = record_type_counts(counts_file, args.output_folder, args.project, kind)
+    counts_file.unlink()
+    print(f"[COUNTS] {record['total']} elements in {len(record['counts'])} types")
+    if not args.prescan:
+        record_run_stats(args.output_folder, args.project, record["total"], counts_file.parent, args.nwd, args.mode,
+                         args.single_pass)
+    return 0
+
+
+def _cli_type_counts(args):
+    """Prints the element counts per type of a project's last run."""
+    record = load_type_counts(args.output_folder, args.project)
+    if record is None:
+        print(f"No element counts recorded for {args.project}", file=sys.stderr)
+        return 1
+    recorded = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["recorded"]))
+    print(f"{args.project}: {record['total']} elements (last run {recorded})")
+    for element_type, count in record["counts"].items():
+        share = 100.0 * count / record["total"] if record["total"] else 0.0
+        print(f"  {element_type:<8} {count:>10}  {share:5.1f}%")
+    return 0
+
+
+def _format_duration(seconds):
+    minutes = int(round(seconds / 60))
+    return f"{minutes // 60}:{minutes % 60:02d} h"
+
+
+def _format_estimate(target, estimate):
+    scale = _format_duration if target == "duration_s" else (lambda value: f"{value / 1e6:,.0f} MB")
+    text = scale(estimate["value"])
+    if estimate["high"] is not None:
+        text += f"  ({scale(estimate['low'])} .. {scale(estimate['high'])})"
+    return f"{text}  [{estimate['runs']} run(s), {estimate['basis']}]"
+
+
+def _cli_estimate(args):
+    """Predicts duration and sizes of the next exports and checks them against a time window."""
+    estimator = ExportEstimator(args.output_folder)
+    elements = None
+    if args.counts:
+        with open(args.counts, 'r', encoding='utf-8', errors='replace') as f:
+            elements = sum(int(float(parts[1])) for parts in map(str.split, f) if len(parts) == 2)
+    estimates = [estimator.estimate(project, elements, args.mode) for project in args.project]
+    if args.json:
+        print(json.dumps(estimates, indent=4))
+        return 0
+
+    for estimate in estimates:
+        if estimate["elements"] is None:
+            print(f"{estimate['project']}: no element counts (run 'prescan' or one export first)")
+            continue
+        mode = f" ({EXPORT_MODES[args.mode].lower()})" if args.mode != DEFAULT_EXPORT_MODE else ""
+        print(f"{estimate['project']}: {estimate['elements']} elements{mode}")
+        for target in ESTIMATE_TARGETS:
+            if target in estimate["targets"]:
+                print(f"  {target:<17} {_format_estimate(target, estimate['targets'][target])}")
+        if not estimate["targets"]:
+            print("  no run history yet")
+
+    if args.window:
+        start, _, end = args.window.partition("-")
+        start_h, start_m = map(int, start.split(":"))
+        end_h, end_m = map(int, end.split(":"))
+        window = ((end_h * 60 + end_m) - (start_h * 60 + start_m)) % (24 * 60) * 60 or 24 * 3600
+        total, high, verdict = fit_in_window(estimates, window)
+        if total is None:
+            print(f"[WINDOW] {args.window}: not enough history to decide")
+            return 1
+        print(f"[WINDOW] {args.window} ({_format_duration(window)}): {' + '.join(args.project)} "
+              f"take {_format_duration(total)}, up to {_format_duration(high)} -> {verdict}")
+        return 0 if verdict == "fits" else 1
+    return 0
+
+
+def _cli_schedule(args):
+    """Registers the scheduled runs of settings.json's 'schedules', one Windows task per mode."""
+    with open(args.settings, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    if args.dry_run:
+        spec_path = Path(data["output_folder"]) / SCHEDULES_FOLDER_NAME / f"{data['proj_code']}.json"
+        for command in schedule_commands(spec_path, data["proj_code"], data.get("schedules") or {}):
+            print(subprocess.list2cmdline(command))
+        return 0
+    code = 0
+    for mode, ok, message in register_schedules(data, objects):
+        print(f"[SCHEDULE] {data['proj_code']} {mode}: {'registered' if ok else 'FAILED'} {message}".rstrip())
+        code = code if ok else 1
+    if not data.get("schedules"):
+        print(f"[SCHEDULE] {data['proj_code']}: no schedules, tasks removed")
+    return code
+
+
+def _cli_run_export(args):
+    """Runs one export from a saved schedule spec in its own local job folder (used by the scheduled tasks)."""
+    with open(args.spec, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    data = dict(spec["data"])
+    data["export_mode"] = args.mode or export_mode(data)
+    data["export_attribute"] = data["export_mode"] != "geometry"
+    if args.quality:
+        data["quality_profile"] = args.quality
+    job_id = "-".join(filter(None, (data["proj_code"], data["export_mode"], args.quality)))
+    job = {"id": job_id, "spec": {"data": data, "objects": spec["objects"]}}
+    runner = E3DRunner(args.work_dir or Path(tempfile.gettempdir()) / "e3d_scheduled")
+    print(f"[SCHEDULE] {data['proj_code']}: {EXPORT_MODES[data['export_mode']]} export, "
+          f"{data.get('quality_profile') or DEFAULT_QUALITY_PROFILE} quality")
+    try:
+        result = runner(job)
+    except (OSError, ValueError, RuntimeError, subprocess.CalledProcessError) as e:
+        # RuntimeError: the latest record is missing or from an earlier run
+        print(f"[SCHEDULE] {job['id']} failed: {e}")
+        return 1
+    if data["export_mode"] == "attributes":
+        print(f"[SCHEDULE] {job['id']} finished (attribute dump)")
+        return 0
+    if not result.get("run"):
+        print(f"[SCHEDULE] {job['id']} failed: no published NWD was recorded")
+        return 1
+    print(f"[SCHEDULE] {job['id']} finished {result['run']}")
+    return 0
+
+
+def _cli_plan(args):
+    """Plans balanced shards for the available sessions and compares them with a naive split."""
+    with open(args.settings, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    try:
+        objects = resolve_object_patterns(data, objects)
+    except ValueError as e:
+        print(f"[PLAN] {e}", file=sys.stderr)
+        return 1
+    costs, unit = object_costs(data["output_folder"], data["proj_code"])
+    report = plan_report(objects, args.sessions, costs)
+    if args.json:
+        print(json.dumps({"unit": unit, **report}, indent=4))
+        return 0
+
+    def show(value):
+        return _format_duration(value) if unit == "s" else f"{value:,.0f} elements"
+
+    source = "timings" if unit == "s" else "pre-scan counts" if costs else "none, equal costs"
+    print(f"[PLAN] {data['proj_code']}: {len(objects)} line(s), {args.sessions} session(s), "
+          f"costs known for {report['known']} object(s) ({source})")
+    for name, lines in report["shards"].items():
+        print(f"[PLAN]   {name}: {len(lines):>5} line(s)  {show(report['loads'][name])}")
+    print(f"[PLAN] makespan: balanced {show(report['makespan'])}, naive split {show(report['naive_makespan'])}, "
+          f"lower bound {show(report['lower_bound'])}")
+    if report["makespan"]:
+        print(f"[PLAN] balanced shards finish {report['naive_makespan'] / report['makespan']:.2f}x sooner "
+              "than the naive split")
+    return 0
+
+
+def _grid(text):
+    columns, _, rows = text.lower().partition("x")
+    try:
+        return int(columns), int(rows or columns)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"grid must look like 3x2, not '{text}'")
+
+
+def _cli_tile(args):
+    """Writes a tiled export: one volume-bounded geometry part per grid tile, run in parallel and federated."""
+    data = _normalized_settings(args.settings)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    data["export_mode"], data["export_attribute"] = "geometry", False
+    if args.types:
+        data["tile_types"] = [name.upper() for name in args.types]
+    columns, rows = args.grid
+    try:
+        tiles = plan_tiles(args.extent, columns, rows)
+        written, _ = TiledExport(data, objects, tiles, args.sessions).generate(data["output_folder"], args.parts)
+    except ValueError as e:
+        print(f"[TILES] {e}", file=sys.stderr)
+        return 1
+
+    def edge(value):
+        return "open" if value is None else f"{value:,}"
+
+    for name, (west, south, east, north) in tiles.items():
+        print(f"[TILES]   {name:<6} E {edge(west):>12} .. {edge(east):<12} N {edge(south):>12} .. {edge(north):<12}")
+    print(f"[TILES] {len(tiles)} tile(s), {args.sessions} session(s) at a time, "
+          f"{len(written)} file(s) written: run {Path(data['output_folder']) / 'RunE3D.bat'}")
+    _print_uncovered(data["output_folder"], quality_project(data), data.get("tile_types") or DEFAULT_TILE_TYPES)
+    return 0
+
+
+def _print_uncovered(output_dir, project, tile_types, uncovered=None):
+    """Warns about the elements of the project's last attribute dump that no tile type covers."""
+    dump_path = Path(output_dir) / f"{project}{ATTRIBUTES_DUMP_SUFFIX}"
+    if uncovered is None:
+        if not dump_path.exists():
+            print(f"[TILES] No attribute dump of {project}: run an Attributes only export to check "
+                  f"which elements the tile types ({' '.join(tile_types)}) leave out")
+            return
+        uncovered = uncovered_elements(dump_path, tile_types)
+    if uncovered:
+        print(f"[TILES] {sum(uncovered.values()):,} element(s) of {dump_path.name} are in no tile: "
+              + ", ".join(f"{element_type} {count:,}" for element_type, count in uncovered.items())
+              + " (add their types with --types or the project's tile types)")
+    else:
+        print(f"[TILES] Every element of {dump_path.name} is covered by the tile types")
+
+
+def _cli_tile_report(args):
+    """Per-tile timings of the newest tiled export, to tune the grid size."""
+    try:
+        report = tile_report(args.output_folder, args.project)
+    except FileNotFoundError as e:
+        print(f"[TILES] {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return 0
+
+    def minutes(row, key):
+        return f"{row[key] / 60:.1f} min" if key in row else "-"
+
+    print(f"[TILES] {args.project}: {len(report['tiles'])} tile(s), types {' '.join(report['types'] or [])}")
+    print(f"  {'tile':<6} {'elements':>9} {'export':>10} {'convert':>10} {'total':>10}")
+    for row in report["tiles"]:
+        elements = f"{row['elements']:,}" if "elements" in row else "-"
+        print(f"  {row['tile']:<6} {elements:>9} {minutes(row, 'export_s'):>10} {minutes(row, 'convert_s'):>10} "
+              f"{minutes(row, 'total_s'):>10}")
+    if "uncovered" in report:
+        _print_uncovered(args.output_folder, args.project, report["types"], report["uncovered"])
+    if report["makespan"] is None:
+        print("[TILES] No tile has finished yet")
+        return 0
+    print(f"[TILES] slowest {report['slowest']}: {report['makespan'] / 60:.1f} min, "
+          f"{report['imbalance']}x the mean tile")
+    if report["imbalance"] and report["imbalance"] > TILE_IMBALANCE_WARN:
+        print(f"[TILES] Unbalanced: a finer grid (or an extent centred on {report['slowest']}) "
+              "would shorten the run")
+    return 0
+
+
+def _cli_single_pass_report(args):
+    """Measured effect of single pass: recorded runs of the project with and without it."""
+    report = single_pass_report(args.output_folder, args.project)
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return 0
+    for key, label in (("two_pass", "attribute.mac first"), ("single_pass", "single pass")):
+        rate = report[key]["s_per_1000"]
+        print(f"[SINGLE PASS] {label:<20} {report[key]['runs']:>3} run(s)  "
+              f"{'-' if rate is None else f'{rate:.2f} s per 1000 elements'}")
+    if report["speedup"] is None:
+        print("[SINGLE PASS] Needs finished runs of both kinds to compare")
+    else:
+        print(f"[SINGLE PASS] single pass is {report['speedup']:.2f}x faster than attribute.mac first")
+    return 0
+
+
+def _cli_prescan(args):
+    """Writes COUNT.mac and CountE3D.bat, a count-only E3D run that feeds the estimator."""
+    data = _normalized_settings(args.settings)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    try:
+        written, _ = CountScan(data, objects).generate(data["output_folder"])
+    except ValueError as e:
+        print(f"[PRESCAN] {e}", file=sys.stderr)
+        return 1
+    print(f"[PRESCAN] {', '.join(written) or 'up to date'}: run {Path(data['output_folder']) / 'CountE3D.bat'}")
+    return 0
+
+
+def _cli_catalog(args):
+    """Writes CATALOG.mac and CatalogE3D.bat, an E3D run that caches the site/zone catalog."""
+    data = _normalized_settings(args.settings)
+    catalog = load_catalog(data["proj_code"], data["mdb"], args.root)
+    if catalog and not catalog_is_stale(catalog, args.ttl * 3600) and not args.force:
+        age = (time.time() - catalog["recorded"]) / 3600
+        print(f"[CATALOG] {data['proj_code']} {data['mdb']}: {len(catalog['entries'])} entries of {age:.1f} h ago "
+              "are still fresh (--force to rescan)")
+        return 0
+    written, _ = CatalogScan(data, args.root).generate(data["output_folder"])
+    print(f"[CATALOG] {', '.join(written) or 'up to date'}: run {Path(data['output_folder']) / 'CatalogE3D.bat'}")
+    return 0
+
+
+def _cli_catalog_store(args):
+    """Caches the catalog written by CATALOG.mac (called by CatalogE3D.bat)."""
+    record = record_catalog(args.catalog_file, args.project, args.mdb, args.root)
+    sites = sum(entry["type"] == "SITE" for entry in record["entries"])
+    print(f"[CATALOG] {args.project} {args.mdb}: {sites} site(s), {len(record['entries']) - sites} zone(s) cached")
+    return 0
+
+
+def _cli_catalog_list(args):
+    """Shows the cached catalog, or what object list patterns expand to."""
+    catalog = load_catalog(args.project, args.mdb, args.root)
+    if catalog is None:
+        print(f"[CATALOG] No catalog of {args.project} {args.mdb} under {args.root}: run 'main.py catalog'")
+        return 1
+    age = (time.time() - catalog["recorded"]) / 3600
+    print(f"[CATALOG] {len(catalog['entries'])} entries of {age:.1f} h ago"
+          f"{' (stale)' if catalog_is_stale(catalog) else ''}")
+    if args.patterns:
+        lines, unmatched = expand_object_patterns(args.patterns, catalog)
+        for line in lines:
+            print(line)
+        for pattern in unmatched:
+            print(f"[CATALOG] {pattern} matches nothing", file=sys.stderr)
+        return 1 if unmatched else 0
+    for entry in catalog["entries"]:
+        indent = "  " if entry["type"] == "ZONE" else ""
+        print(f"{indent}{entry['name']:<{40 - len(indent)}} {entry['elements']:>10,}")
+    return 0
+
+
+def _cli_federate(args):
+    """Combines the part NWDs of a discipline split export into <PROJ>.nwf."""
+    try:
+        nwf_path, rebuilt = federate_parts(args.output_folder, args.project, args.parts, args.filetools)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[FEDERATE] {e}", file=sys.stderr)
+        return 1
+    state = "rebuilt" if rebuilt else "up to date, parts are referenced by their latest names"
+    print(f"[FEDERATE] {nwf_path} ({state})")
+    return 0
+
+
+def _cli_convert(args):
+    """
+    Converts one pipelined part to NWD and publishes it (started by RVM.mac while the
+    next part exports), then leaves a <PART>.converted or <PART>.failed marker.
+    """
+    project = f"{args.project}-{args.shard}"
+    runlog = RunLog(args.output_folder, args.project)
+    try:
+        seconds = convert_part([args.roamer], args.rvm, args.nwd)
+        target, digest = publish_file(args.nwd, args.output_folder)
+        register_nwd_version(target, args.output_folder, project, digest)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[CONVERT] {args.shard}: {e}", file=sys.stderr)
+        runlog.append("convert_failed", shard=args.shard, message=str(e))
+        atomic_write_text(Path(args.markers) / f"{args.shard}{CONVERT_FAILED_SUFFIX}", f"{e}\n")
+        return 1
+    if not args.keep_rvm:
+        Path(args.rvm).unlink(missing_ok=True)
+    print(f"[CONVERT] {args.shard}: {target.name} in {seconds:.1f}s")
+    runlog.append("converted", shard=args.shard, nwd=target.name, seconds=round(seconds, 3))
+    atomic_write_text(Path(args.markers) / f"{args.shard}{CONVERTED_SUFFIX}", f"{target}\n")
+    return 0
+
+
+def _cli_wait_converted(args):
+    """
+    Waits until every pipelined part has left its <PART>.converted or <PART>.failed marker
+    (RunE3D.bat after the macro finished), then reports and removes the markers.
+    """
+    markers = Path(args.markers)
+    deadline = time.monotonic() + args.timeout if args.timeout else None
+    while True:
+        pending = [part for part in args.parts if not (markers / f"{part}{CONVERTED_SUFFIX}").exists()
+                   and not (markers / f"{part}{CONVERT_FAILED_SUFFIX}").exists()]
+        if not pending:
+            break
+        if deadline and time.monotonic() > deadline:
+            print(f"[CONVERT] Gave up waiting for {' '.join(pending)}", file=sys.stderr)
+            return 1
+        print(f"[INFO] Export finished, waiting for {len(pending)} NWD conversion(s)...")
+        time.sleep(args.poll)
+
+    failed = [part for part in args.parts if (markers / f"{part}{CONVERT_FAILED_SUFFIX}").exists()]
+    for part in failed:
+        print(f"[WARN] Conversion of {part} failed, its previous NWD is kept")
+    for part in args.parts:
+        (markers / f"{part}{CONVERTED_SUFFIX}").unlink(missing_ok=True)
+        (markers / f"{part}{CONVERT_FAILED_SUFFIX}").unlink(missing_ok=True)
+    return 1 if failed else 0
+
+
+def _cli_fake_e3d(args):
+    """
+    Stand-in for E3D running a generated RVM.mac without AVEVA: it follows the lines that
+    matter to the pipeline (log echoes, NWD name variables, EXPORT FILE / EXPORT FINISH and
+    the background 'start' of the conversions) and sleeps for each part export.
+    """
+    variables = {"PROJ": args.project, "STAMP": "bench"}
+
+    def substitute(text):
+        return re.sub(r"\$!(\w+)", lambda match: variables.get(match.group(1).upper(), ""), text)
+
+    def local_path(text):
+        text = text.strip().strip('"')
+        return text if os.name == "nt" else text.replace("\\", "/")
+
+    rvm_path = None
+    with open(args.macro, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    for line in lines:
+        assignment = re.match(r"!(\w+) = ('[^']*'(?: \+ (?:'[^']*'|!\w+))*)$", line)
+        if assignment:
+            terms = re.findall(r"'([^']*)'|!(\w+)", assignment.group(2))
+            variables[assignment.group(1).upper()] = "".join(substitute(text) or variables.get(name.upper(), "")
+                                                             for text, name in terms)
+        elif line.upper().startswith("EXPORT FILE /"):
+            rvm_path = local_path(line[len("EXPORT FILE /"):].rsplit(" ", 1)[0])
+        elif line.upper() == "EXPORT FINISH" and rvm_path:
+            time.sleep(args.export)  # the part export
+            Path(rvm_path).write_bytes(b"RVM")
+        elif line.startswith("SYSCOM |") and line.endswith("|"):
+            command = substitute(line[len("SYSCOM |"):-1])
+            if command.startswith("echo ") and " >> " in command:
+                text, _, log_path = command[len("echo "):].rpartition(" >> ")
+                with open(local_path(log_path), 'a', encoding='utf-8') as log:
+                    log.write(text + "\n")
+            elif command.startswith('start "" /b '):
+                argv = [local_path(arg) for arg in shlex.split(command[len('start "" /b '):], posix=False)]
+                subprocess.Popen(argv, stdout=subprocess.DEVNULL)
+    return 0
+
+
+def _cli_pipeline_bench(args):
+    """
+    Compares a sequential part export (export, then convert, part after part) with the
+    pipelined one. Both run the real 'convert' command on a fake Roamer; the pipelined
+    run generates a PipelinedExport, runs its RVM.mac in 'fake-e3d' and waits for the
+    conversions with 'wait-converted', as RunE3D.bat does.
+    """
+    print(f"[BENCH] {args.parts} parts: export {args.export}s, conversion {args.convert}s each")
+    tool = self_command()
+    parts = [f"P{number + 1}" for number in range(args.parts)]
+
+    def fake_roamer(folder):
+        # 'Roamer.exe -nwd <nwd> <rvm>' that takes --convert seconds
+        script = Path(folder) / "fake_roamer.py"
+        script.write_text(f"import sys, time\ntime.sleep({args.convert})\n"
+                          "open(sys.argv[2], 'wb').write(b'NWD')\n", encoding='utf-8')
+        if os.name == "nt":
+            launcher = Path(folder) / "Roamer.bat"
+            launcher.write_text(f'@"{sys.executable}" "{script}" %*\n', encoding='utf-8')
+        else:
+            launcher = Path(folder) / "Roamer"
+            launcher.write_text(f"#!{sys.executable}\n" + script.read_text(encoding='utf-8'), encoding='utf-8')
+            launcher.chmod(0o755)
+        return launcher
+
+    def published(output):
+        return len(list(Path(output).glob("BENCH-P*-latest.nwd")))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        roamer, work, output = fake_roamer(temp_dir), Path(temp_dir) / "work", Path(temp_dir) / "out"
+        work.mkdir()
+        output.mkdir()
+        start = time.perf_counter()
+        for part in parts:
+            time.sleep(args.export)  # stand-in for EXPORT ... EXPORT FINISH in E3D
+            rvm_path = work / f"TEMP-{part}.RVM"
+            rvm_path.write_bytes(b"RVM")
+            subprocess.run([*tool, "convert", str(roamer), str(rvm_path), str(work / f"BENCH-{part}.nwd"),
+                            str(output), "--project", "BENCH", "--shard", part, "--markers", str(work)],
+                           stdout=subprocess.DEVNULL)
+        sequential = time.perf_counter() - start
+        sequential_converted = published(output)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        roamer, work, output = fake_roamer(temp_dir), Path(temp_dir) / "work", Path(temp_dir) / "out"
+        work.mkdir()
+        output.mkdir()
+        data = {"aveva_path": temp_dir, "proj_code": "BENCH", "user": "", "password": "", "mdb": "",
+                "output_folder": output.as_posix(), "macro_folder": work.as_posix(), "roamer_path": str(roamer),
+                "scratch_folder": (Path(temp_dir) / "scratch").as_posix(),
+                "areas_file": "", "export_attribute": False, "export_mode": "geometry",
+                "daily_export": False, "export_time": False}
+        generator = PipelinedExport(data, [], parts={part: [f"/BENCH-{part}"] for part in parts})
+        generator.generate(work)
+        Path(generator.work_folder).mkdir(parents=True)  # RunE3D.bat creates the scratch folder
+        start = time.perf_counter()
+        subprocess.run([*tool, "fake-e3d", str(work / "RVM.mac"), "--project", "BENCH", "--export", str(args.export)],
+                       check=True)
+        exported = time.perf_counter() - start
+        waited = subprocess.run([*tool, "wait-converted", generator.work_folder, "--parts", *parts, "--poll", "0.05",
+                                 "--timeout", str(60 + args.parts * args.convert)], stdout=subprocess.DEVNULL)
+        pipelined = time.perf_counter() - start
+        converted = published(output)
+        failed = args.parts - converted + (waited.returncode != 0)
+
+    ideal = args.parts * args.export + args.convert  # only the last conversion is not hidden
+    print(f"[BENCH] sequential: {sequential:6.2f}s  converted={sequential_converted}")
+    print(f"[BENCH] pipelined:  {pipelined:6.2f}s  (export done after {exported:.2f}s, ideal {ideal:.2f}s)  "
+          f"speed-up {sequential / pipelined:4.2f}x  converted={converted} failed={failed}")
+    overlapped = failed == 0 and converted == args.parts and pipelined < sequential - 0.5 * args.convert
+    print(f"[BENCH] {'OK' if overlapped else 'FAIL'}: conversions {'overlap' if overlapped else 'do not overlap'} the export")
+    return 0 if overlapped else 1
+
+
+def _cli_split(args):
+    """Shows how an object list is split into discipline parts."""
+    with open(args.object_list, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    for part, lines in split_by_discipline(objects).items():
+        print(f"{part}: {len(lines)} line(s)")
+        for line in lines:
+            print(f"  {line}")
+    return 0
+
+
+def _cli_split_export(args):
+    """
+    Writes a split export like the GUI's Split by Discipline (or Balanced). --parts
+    regenerates only those parts, whose batches delete themselves after every run.
+    """
+    data = _normalized_settings(args.settings)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+    try:
+        parts = None
+        if args.balanced:
+            objects = resolve_object_patterns(data, objects)
+            costs, _ = object_costs(data["output_folder"], data["proj_code"])
+            parts = plan_shards(objects, args.sessions, costs)
+        generator = PartitionedExport(data, objects, args.sessions, parts=parts)
+        written, _ = generator.generate(data["output_folder"], args.parts)
+    except ValueError as e:
+        print(f"[SPLIT] {e}", file=sys.stderr)
+        return 1
+    print(f"[SPLIT] {' '.join(args.parts or generator.parts)}: {len(written)} file(s) written, "
+          f"run {Path(data['output_folder']) / 'RunE3D.bat'}")
+    return 0
+
+
+def _cli_filter_bench(args):
+    """Times the side panel filter index on a synthetic object list (no GUI needed)."""
+    units = [f"U{100 + i}{chr(65 + j)}" for i in range(40) for j in range(4)]
+    items = [f"/{units[i % len(units)]}:{('PI', 'EL', 'EQ', 'ST', 'IN')[i % 5]}-{i:06d}" for i in range(args.entries)]
+    items += [f"EXCLUDE /{i}-WF-{230000 + i}-D1C-UW" for i in range(args.entries // 10)]
+
+    start = time.perf_counter()
+    index = ObjectFilterIndex(items)
+    print(f"[FILTER] {len(items)} entries indexed in {(time.perf_counter() - start) * 1000:.1f} ms")
+    worst = 0.0
+    for query in args.query or ["u1", "u12", "u123", "u123a:pi", "exclude", "wf-2301", "zz"]:
+        start = time.perf_counter()
+        rows = index.search(query)
+        elapsed = (time.perf_counter() - start) * 1000
+        worst = max(worst, elapsed)
+        print(f"[FILTER] '{query}': {len(rows)} match(es) in {elapsed:.2f} ms")
+
+    start = time.perf_counter()
+    index.remove_range(len(items) // 2, len(items) // 2 + 99)
+    index.search("pi")
+    print(f"[FILTER] remove 100 + search in {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(f"[FILTER] slowest query {worst:.2f} ms (frame budget {FRAME_BUDGET_MS} ms)")
+    return 0 if worst <= FRAME_BUDGET_MS else 1
+
+
+def _cli_projects(args):
+    """Lists (and thereby validates) the project registry."""
+    registry = ProjectRegistry(args.file)
+    projects = registry.projects()
+    if registry.error:
+        print(f"[PROJECTS] {registry.error}", file=sys.stderr)
+        return 1
+    for code, entry in projects.items():
+        print(f"{code:<6} {entry.get('mdb', ''):<24} {len(entry.get('objects', [])):>4} objects  "
+              f"profile={entry.get('attribute_profile', DEFAULT_ATTRIBUTE_PROFILE)}  "
+              f"quality={entry.get('quality_profile', DEFAULT_QUALITY_PROFILE)}  "
+              f"schedule={entry.get('schedule') or '-'}")
+    return 0
+
+
+def _timed_run(command, **kwargs):
+    start = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, timeout=120, **kwargs)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _cli_startup_check(args):
+    """Measures the import time of the tools and the GUI's time to first paint against budgets."""
+    failed = False
+    if not getattr(sys, 'frozen', False):
+        probe = ("import sys, time; start = time.perf_counter(); import cli; "
+                 "print((time.perf_counter() - start) * 1000, 'PyQt6' in sys.modules)")
+        timings = []
+        for _ in range(args.runs):
+            _, result = _timed_run([sys.executable, "-c", probe], cwd=app_dir())
+            elapsed, qt_loaded = result.stdout.split()
+            timings.append(float(elapsed))
+        elapsed = sorted(timings)[len(timings) // 2]
+        ok = elapsed <= IMPORT_BUDGET_MS and qt_loaded == "False"
+        failed |= not ok
+        print(f"[STARTUP] import cli: {elapsed:.0f} ms (budget {IMPORT_BUDGET_MS} ms), "
+              f"PyQt6 imported: {qt_loaded}  {'OK' if ok else 'FAIL'}")
+
+    if args.skip_gui:
+        return 1 if failed else 0
+    timings = []
+    for _ in range(args.runs):
+        elapsed, result = _timed_run([*self_command(), "startup-probe"])
+        if result.returncode != 0:
+            print(f"[STARTUP] GUI probe failed:\n{result.stderr.strip()}", file=sys.stderr)
+            return 1
+        timings.append(elapsed)
+    elapsed = sorted(timings)[len(timings) // 2]
+    ok = elapsed <= FIRST_PAINT_BUDGET_MS
+    failed |= not ok
+    print(f"[STARTUP] first paint: {elapsed:.0f} ms (budget {FIRST_PAINT_BUDGET_MS} ms)  {'OK' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+def _cli_startup_probe(args):
+    """Internal: opens the GUI and exits after the first paint."""
+    from gui import probe_first_paint
+    return probe_first_paint()
+
+
+def _cli_queue_add(args):
+    """Queues an export job (or one job per discipline shard) from a settings.json."""
+    with open(args.settings, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(args.objects, 'r', encoding='utf-8') as f:
+        objects = [line.strip() for line in f if line.strip()]
+
+    queue = JobQueue(args.queue)
+    project = data["proj_code"]
+    if args.shards:
+        shards = plan_shards(objects, args.shards, object_costs(data["output_folder"], project)[0])
+    elif args.split:
+        shards = split_by_discipline(objects)
+    else:
+        job_id = queue.enqueue({"data": data, "objects": objects}, project=project)
+        print(f"[QUEUE] Job {job_id}: {project}")
+        return 0
+
+    group = f"{project}-{time.strftime('%Y%m%d-%H%M%S')}"
+    for shard, shard_objects in shards.items():
+        spec = {"data": data, "objects": shard_objects, "federate_parts": list(shards)}
+        job_id = queue.enqueue(spec, project=project, shard=shard, group=group)
+        print(f"[QUEUE] Job {job_id}: {project} {shard} ({len(shard_objects)} line(s))")
+    return 0
+
+
+def _cli_queue_status(args):
+    """Shows job counts and the newest jobs of a queue."""
+    queue = JobQueue(args.queue)
+    requeued = queue.requeue_expired()
+    if requeued:
+        print(f"[QUEUE] Requeued jobs with expired leases: {requeued}")
+    print("[QUEUE] " + "  ".join(f"{state}: {count}" for state, count in queue.counts().items()))
+    for job in queue.jobs(args.limit):
+        took = f"{job['finished'] - job['started']:.0f}s" if job["finished"] and job["started"] else ""
+        print(f"  {job['id']:>5} {job['state']:<8} {job['project'] or '':<6} {job['shard'] or '':<6} "
+              f"attempts={job['attempts']} {job['worker'] or ''} {took} {job['error'] or ''}".rstrip())
+    for group in queue.groups():
+        print(f"[QUEUE] group {group['grp']}: {group['state']} {group['worker'] or ''} {group['error'] or ''}".rstrip())
+    return 0
+
+
+def _cli_worker(args):
+    """Runs the worker agent: claims jobs from the queue and exports them on this host."""
+    queue = JobQueue(args.queue, lease_seconds=args.lease)
+    if args.fake is not None:
+        runner = FakeRunner(args.fake, fail_rate=args.fail_rate, crash_rate=args.crash_rate)
+    else:
+        runner = E3DRunner(args.work_dir)
+    completed = run_worker(queue, runner, worker=args.name, poll_seconds=args.poll,
+                           exit_when_empty=args.exit_when_empty, max_jobs=args.max_jobs)
+    print(f"[WORKER] {completed} job(s) completed")
+    return 0
+
+
+def _cli_worker_bench(args):
+    """Runs fake jobs through 1..N local worker processes and reports the throughput."""
+    print(f"[BENCH] {args.jobs} fake jobs of {args.seconds}s each")
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            queue_path = Path(temp_dir) / "queue.sqlite"
+            queue = JobQueue(queue_path, lease_seconds=args.lease)
+            for number in range(args.jobs):
+                queue.enqueue({"data": {}, "objects": []}, project="BENCH", shard=str(number))
+
+            start = time.perf_counter()
+            command = [*self_command(), "worker", str(queue_path), "--fake", str(args.seconds),
+                       "--crash-rate", str(args.crash_rate), "--lease", str(args.lease),
+                       "--poll", "0.1", "--exit-when-empty"]
+            processes = [subprocess.Popen(command + ["--name", f"fake-{number}"], stdout=subprocess.DEVNULL)
+                         for number in range(workers)]
+            # Crashed workers are replaced, like a host coming back; their jobs return after the lease
+            while any(queue.counts()[state] for state in ("queued", "running")):
+                for index, process in enumerate(processes):
+                    if process.poll() not in (None, 0):
+                        processes[index] = subprocess.Popen(command + ["--name", f"fake-{index}-r"],
+                                                            stdout=subprocess.DEVNULL)
+                time.sleep(0.1)
+            for process in processes:
+                process.wait()
+            elapsed = time.perf_counter() - start
+
+            counts = queue.counts()
+            baseline = baseline or elapsed
+            print(f"[BENCH] {workers} worker(s): {elapsed:6.2f}s  {args.jobs / elapsed:5.2f} jobs/s  "
+                  f"speed-up {baseline / elapsed:4.2f}x  done={counts['done']} failed={counts['failed']}")
+    return 0
+
+
+def _cli_serve(args):
+    """Serves the local HTTP/JSON control API for a job queue."""
+    from control import run_control_server
+    return run_control_server(args.queue, args.host, args.port)
+
+
+def _cli_warm_submit(args):
+    """Hands a macro to the warm E3D session of its project and MDB (started when needed)."""
+    with open(args.settings, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    session = WarmSession(data.get("warm_session") or DEFAULT_WARM_ROOT, data,
+                          max_jobs=args.max_jobs, max_memory_mb=args.max_memory_mb)
+    try:
+        job = session.submit(args.macro, log_path=args.log)
+    except WarmSessionError as e:
+        print(f"[WARM] {e}")
+        return 1
+    print(f"[WARM] {session.folder.name} picked up {Path(args.macro).name} ({job})")
+    return 0
+
+
+def _cli_warm_status(args):
+    """Shows the warm sessions under a root folder."""
+    sessions = warm_sessions(args.root)
+    if not sessions:
+        print(f"[WARM] No sessions under {args.root}")
+    for session in sessions:
+        status = session.status()
+        memory = f"{status['memory_mb']:.0f} MB" if status["memory_mb"] is not None else "n/a"
+        print(f"  {status['session']:<24} {'alive' if status['alive'] else 'stopped':<8} pid={status['pid']} "
+              f"memory={memory} queued={status['queued']} running={len(status['running'])} "
+              f"done={status['done']} failed={status['failed']}")
+    return 0
+
+
+def _cli_warm_stop(args):
+    """Asks warm sessions to exit after their current job."""
+    code = 0
+    for session in warm_sessions(args.root):
+        if args.project and session.folder.name.split("-", 1)[0] != args.project:
+            continue
+        stopped = session.stop(timeout=args.timeout)
+        print(f"[WARM] {session.folder.name}: {'stopped' if stopped else 'still running'}")
+        code = code if stopped else 1
+    return code
+
+
+def _cli_runlog_follow(args):
+    """Turns the RVM_LOG.txt of a running macro into a structured JSONL run log (started by RunE3D.bat)."""
+    runlog = RunLog(args.output_folder, args.project)
+    writer = runlog.start(args.shard)
+    try:
+        finished = follow_rvm_log(args.log, writer, timeout=args.timeout)
+    finally:
+        writer.close()
+    runlog.enforce(RUNLOG_RETENTION["keep_runs"], RUNLOG_RETENTION["max_total_mb"], RUNLOG_RETENTION["max_age_days"])
+    return 0 if finished else 1
+
+
+def _cli_runlog_tail(args):
+    """Prints the newest events of a project's run logs."""
+    for event in RunLog(args.output_folder, args.project).tail(args.count):
+        if args.json:
+            print(json.dumps(event))
+            continue
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["ts"]))
+        offset = f"+{event['t']:.1f}s" if "t" in event else ""
+        detail = event.get("object") or event.get("message") or event.get("nwd") or ""
+        print(f"{stamp} {event['run']:<17} {offset:>9} {event.get('shard', ''):<5} {event['stage']:<10} {detail}")
+    return 0
+
+
+def run_cli(argv):
+    """Command line entry point used by the generated batch files and automation."""
+    parser = argparse.ArgumentParser(prog="main.py", description="Export E3D to Navisworks tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish = commands.add_parser("publish", help="Copy an NWD to the output folder with checksum verification")
+    publish.add_argument("source", help="NWD file in scratch space")
+    publish.add_argument("dest", help="Destination (output) folder")
+    publish.add_argument("--cleanup", help="Scratch folder to remove after a successful publish")
+    publish.add_argument("--project", help="Register the NWD as this project's latest version")
+    publish.set_defaults(handler=_cli_publish)
+
+    retain = commands.add_parser("retain", help="Compress TEMP.RVM/TEMP.txt into the run archive")
+    retain.add_argument("folder", help="Folder containing the intermediate files")
+    retain.add_argument("archive_root", help="Root folder of the intermediates archive")
+    retain.add_argument("--project", required=True)
+    retain.add_argument("--keep-runs", type=int, default=RETENTION_DEFAULTS["keep_runs"])
+    retain.add_argument("--max-total-mb", type=int, default=RETENTION_DEFAULTS["max_total_mb"])
+    retain.add_argument("--max-age-days", type=int, default=RETENTION_DEFAULTS["max_age_days"])
+    retain.set_defaults(handler=_cli_retain)
+
+    archive_cat = commands.add_parser("archive-cat", help="Stream an archived intermediate file to stdout")
+    archive_cat.add_argument("archive_root")
+    archive_cat.add_argument("--project", required=True)
+    archive_cat.add_argument("--run", help="Run id (default: newest)")
+    archive_cat.add_argument("--name", default="TEMP.txt", help="TEMP.txt, TEMP.RVM or TEMP-<PART>.RVM")
+    archive_cat.set_defaults(handler=_cli_archive_cat)
+
+    diff = commands.add_parser("diff-attributes", help="Report added/removed/changed elements between two dumps")
+    diff.add_argument("old", help="Older TEMP.txt (plain, .gz or .zst)")
+    diff.add_argument("new", help="Newer TEMP.txt (plain, .gz or .zst)")
+    diff.add_argument("--report", help="Write the JSON change report to this file")
+    diff.add_argument("--max-details", type=int, default=1000, help="Element entries kept in the report")
+    diff.add_argument("--ignore-attr", action="append", default=[], help="Attribute to leave out of the comparison")
+    diff.add_argument("--chunk-records", type=int, default=DIFF_CHUNK_RECORDS, help="Elements per sorted run")
+    diff.set_defaults(handler=_cli_diff_attributes)
+
+    profile_report = commands.add_parser("profile-report", help="Compare attribute dump sizes before/after a profile")
+    profile_report.add_argument("before", help="Dump written with the full profile")
+    profile_report.add_argument("after", nargs="?", help="Dump written with the new profile")
+    profile_report.add_argument("--profile", default="navisworks",
+                                help="Project the size under this profile when no AFTER dump is given")
+    profile_report.add_argument("--top", type=int, default=25, help="Attributes listed in the breakdown")
+    profile_report.set_defaults(handler=_cli_profile_report)
+
+    columnar = commands.add_parser("columnar", help="Convert an attribute dump to typed columns (.npy / Parquet)")
+    columnar.add_argument("dump", help="TEMP.txt (plain, .gz or .zst)")
+    columnar.add_argument("target", nargs="?", help=f"Output folder (default: <dump>{COLUMNAR_SUFFIX})")
+    columnar.add_argument("--numeric", nargs="*", help=f"More numeric attributes (always: {', '.join(NUMERIC_ATTRIBUTES)})")
+    columnar.add_argument("--parquet", help="Also write this Parquet file (needs pyarrow)")
+    columnar.set_defaults(handler=_cli_columnar)
+
+    column_summary = commands.add_parser("column-summary", help="Per-type sums of the numeric columns of a converted dump")
+    column_summary.add_argument("folder")
+    column_summary.add_argument("--by", default="_type", help="Group column (default: element type)")
+    column_summary.add_argument("--compare", metavar="DUMP", help="Also time the row-by-row text re-parse of DUMP")
+    column_summary.add_argument("--json", action="store_true")
+    column_summary.set_defaults(handler=_cli_column_summary)
+
+    record_counts = commands.add_parser("record-counts", help="Store the element counts of a finished run")
+    record_counts.add_argument("counts_file", help=f"{TYPE_COUNTS_FILE_NAME} written by attribute.mac")
+    record_counts.add_argument("output_folder")
+    record_counts.add_argument("--project", required=True)
+    record_counts.add_argument("--nwd", help="NWD of the run, for the estimator history")
+    record_counts.add_argument("--prescan", action="store_true", help="Counts of a pre-scan (no export history)")
+    record_counts.add_argument("--mode", choices=list(EXPORT_MODES), default=DEFAULT_EXPORT_MODE,
+                               help="Export mode of the run")
+    record_counts.add_argument("--single-pass", action="store_true", help="The run dumped attributes in single pass")
+    record_counts.set_defaults(handler=_cli_record_counts)
+
+    type_counts = commands.add_parser("type-counts", help="Show element counts per type from the last run")
+    type_counts.add_argument("output_folder")
+    type_counts.add_argument("--project", required=True)
+    type_counts.set_defaults(handler=_cli_type_counts)
+
+    estimate = commands.add_parser("estimate", help="Predict export duration and sizes from the run history")
+    estimate.add_argument("output_folder")
+    estimate.add_argument("--project", required=True, nargs="+")
+    estimate.add_argument("--counts", help=f"{TYPE_COUNTS_FILE_NAME}-style counts of an object list (one project)")
+    estimate.add_argument("--window", help="Check that the projects fit one after another, e.g. 00:00-06:00")
+    estimate.add_argument("--mode", choices=list(EXPORT_MODES), default=DEFAULT_EXPORT_MODE,
+                          help="Estimate runs of this export mode")
+    estimate.add_argument("--json", action="store_true")
+    estimate.set_defaults(handler=_cli_estimate)
+
+    schedule = commands.add_parser("schedule", help="Register the daily tasks of settings.json's per-mode schedules")
+    schedule.add_argument("settings", help="settings.json with 'schedules': {mode: {time, every_hours}}")
+    schedule.add_argument("objects", help="Object list file")
+    schedule.add_argument("--dry-run", action="store_true", help="Only print the schtasks commands")
+    schedule.set_defaults(handler=_cli_schedule)
+
+    run_export = commands.add_parser("run-export", help="Run a scheduled export from its saved spec")
+    run_export.add_argument("spec", help=f"<output>/{SCHEDULES_FOLDER_NAME}/<PROJ>.json written by 'schedule'")
+    run_export.add_argument("--mode", choices=list(EXPORT_MODES), help="Export mode (default: the spec's)")
+    run_export.add_argument("--quality", help="Quality profile, e.g. preview (default: the spec's)")
+    run_export.add_argument("--work-dir", help="Local folder for the job's macros and intermediates")
+    run_export.set_defaults(handler=_cli_run_export)
+
+    plan = commands.add_parser("plan", help="Balance the object list over E3D sessions by measured cost")
+    plan.add_argument("settings", help="settings.json of the export (output folder and project)")
+    plan.add_argument("objects", help="Object list file")
+    plan.add_argument("--sessions", type=int, default=DEFAULT_MAX_SESSIONS)
+    plan.add_argument("--json", action="store_true")
+    plan.set_defaults(handler=_cli_plan)
+
+    tile = commands.add_parser("tile", help="Generate a tiled export: a grid of volume-bounded parts run in parallel")
+    tile.add_argument("settings", help="settings.json of the export")
+    tile.add_argument("objects", help="Object list file (the sites or zones to tile)")
+    tile.add_argument("--extent", type=float, nargs=4, required=True, metavar=("WEST", "SOUTH", "EAST", "NORTH"),
+                      help="Plant extent in mm (world coordinates, west/south negative)")
+    tile.add_argument("--grid", type=_grid, default=(2, 2), help="Columns x rows, e.g. 3x2 (default 2x2)")
+    tile.add_argument("--sessions", type=int, default=DEFAULT_MAX_SESSIONS, help="Tiles exported at the same time")
+    tile.add_argument("--types", nargs="+",
+                      help="Element types exported per tile (default: the settings' tile_types, else "
+                           f"{' '.join(DEFAULT_TILE_TYPES)})")
+    tile.add_argument("--parts", nargs="+", metavar="TILE", help="Regenerate only these tiles, e.g. X2Y1")
+    tile.set_defaults(handler=_cli_tile)
+
+    tile_report_parser = commands.add_parser("tile-report", help="Per-tile timings of the last tiled export")
+    tile_report_parser.add_argument("output_folder")
+    tile_report_parser.add_argument("--project", required=True)
+    tile_report_parser.add_argument("--json", action="store_true")
+    tile_report_parser.set_defaults(handler=_cli_tile_report)
+
+    single_pass = commands.add_parser("single-pass-report", help="Compare run times with and without single pass")
+    single_pass.add_argument("output_folder")
+    single_pass.add_argument("--project", required=True)
+    single_pass.add_argument("--json", action="store_true")
+    single_pass.set_defaults(handler=_cli_single_pass_report)
+
+    prescan = commands.add_parser("prescan", help="Generate a count-only E3D run (CountE3D.bat) for the estimator")
+    prescan.add_argument("settings", help="settings.json of the export")
+    prescan.add_argument("objects", help="Object list file")
+    prescan.set_defaults(handler=_cli_prescan)
+
+    catalog = commands.add_parser("catalog", help="Generate an E3D run (CatalogE3D.bat) caching the site/zone catalog")
+    catalog.add_argument("settings", help="settings.json of the project")
+    catalog.add_argument("--root", default=DEFAULT_CATALOG_ROOT, help="Catalog cache folder")
+    catalog.add_argument("--ttl", type=float, default=24, help="Hours a cached catalog stays fresh")
+    catalog.add_argument("--force", action="store_true", help="Rescan even if the cached catalog is fresh")
+    catalog.set_defaults(handler=_cli_catalog)
+
+    catalog_store = commands.add_parser("catalog-store", help="Internal: cache the catalog written by CATALOG.mac")
+    catalog_store.add_argument("catalog_file")
+    catalog_store.add_argument("--project", required=True)
+    catalog_store.add_argument("--mdb", required=True)
+    catalog_store.add_argument("--root", default=DEFAULT_CATALOG_ROOT)
+    catalog_store.set_defaults(handler=_cli_catalog_store)
+
+    catalog_list = commands.add_parser("catalog-list", help="Show the cached catalog or expand object list patterns")
+    catalog_list.add_argument("project")
+    catalog_list.add_argument("mdb")
+    catalog_list.add_argument("patterns", nargs="*", help="Patterns to expand, e.g. '/U109A:*'")
+    catalog_list.add_argument("--root", default=DEFAULT_CATALOG_ROOT)
+    catalog_list.set_defaults(handler=_cli_catalog_list)
+
+    federate = commands.add_parser("federate", help="Build <PROJ>.nwf from the discipline part NWDs")
+    federate.add_argument("output_folder")
+    federate.add_argument("--project", required=True)
+    federate.add_argument("--parts", nargs="+", required=True, help="Discipline parts to federate")
+    federate.add_argument("--filetools", help=f"Path to Navisworks {FILETOOLS_EXE_NAME}")
+    federate.set_defaults(handler=_cli_federate)
+
+    convert = commands.add_parser("convert", help="Internal: convert and publish one pipelined part (started by RVM.mac)")
+    convert.add_argument("roamer")
+    convert.add_argument("rvm")
+    convert.add_argument("nwd")
+    convert.add_argument("output_folder")
+    convert.add_argument("--project", required=True)
+    convert.add_argument("--shard", required=True)
+    convert.add_argument("--markers", required=True, help="Folder for the <PART>.converted/.failed markers")
+    convert.add_argument("--keep-rvm", action="store_true", help="Keep TEMP-<PART>.RVM for the intermediates archive")
+    convert.set_defaults(handler=_cli_convert)
+
+    wait_converted = commands.add_parser("wait-converted", help="Internal: wait for the pipelined NWD conversions")
+    wait_converted.add_argument("markers", help="Folder of the <PART>.converted/.failed markers")
+    wait_converted.add_argument("--parts", nargs="+", required=True)
+    wait_converted.add_argument("--poll", type=float, default=5.0, help="Seconds between marker checks")
+    wait_converted.add_argument("--timeout", type=float, help="Give up after this many seconds (default: never)")
+    wait_converted.set_defaults(handler=_cli_wait_converted)
+
+    fake_e3d = commands.add_parser("fake-e3d", help="Internal: run a generated RVM.mac without E3D (pipeline-bench)")
+    fake_e3d.add_argument("macro")
+    fake_e3d.add_argument("--project", default="FAKE", help="Value of PROJ CODE in the macro")
+    fake_e3d.add_argument("--export", type=float, default=1.0, help="Seconds per part export")
+    fake_e3d.set_defaults(handler=_cli_fake_e3d)
+
+    pipeline_bench = commands.add_parser("pipeline-bench", help="Show that pipelined NWD conversion overlaps the export")
+    pipeline_bench.add_argument("--parts", type=int, default=6)
+    pipeline_bench.add_argument("--export", type=float, default=1.0, help="Seconds per part export")
+    pipeline_bench.add_argument("--convert", type=float, default=0.8, help="Seconds per part conversion")
+    pipeline_bench.set_defaults(handler=_cli_pipeline_bench)
+
+    split = commands.add_parser("split", help="Show the discipline parts of an object list")
+    split.add_argument("object_list", help="Object list text file (one object per line)")
+    split.set_defaults(handler=_cli_split)
+
+    split_export = commands.add_parser("split-export", help="Generate a split export (RunE3D.bat per part, federated)")
+    split_export.add_argument("settings", help="settings.json of the export")
+    split_export.add_argument("objects", help="Object list file")
+    split_export.add_argument("--sessions", type=int, default=DEFAULT_MAX_SESSIONS, help="Parts run at the same time")
+    split_export.add_argument("--balanced", action="store_true", help="Balanced shards instead of disciplines")
+    split_export.add_argument("--parts", nargs="+", metavar="PART",
+                              help="Regenerate only these parts, e.g. PI; the others keep their last NWD")
+    split_export.set_defaults(handler=_cli_split_export)
+
+    filter_bench = commands.add_parser("filter-bench", help="Time the side panel filter on a large object list")
+    filter_bench.add_argument("--entries", type=int, default=100000)
+    filter_bench.add_argument("--query", action="append", help="Query to time (repeatable)")
+    filter_bench.set_defaults(handler=_cli_filter_bench)
+
+    projects = commands.add_parser("projects", help=f"List and validate the project registry ({PROJECTS_FILE_NAME})")
+    projects.add_argument("--file", help=f"Registry file (default: {PROJECTS_FILE_NAME} next to the application)")
+    projects.set_defaults(handler=_cli_projects)
+
+    startup_check = commands.add_parser("startup-check", help="Check import time and time to first paint budgets")
+    startup_check.add_argument("--runs", type=int, default=3, help="Runs per measurement (median is reported)")
+    startup_check.add_argument("--skip-gui", action="store_true", help="Only check the import budget")
+    startup_check.set_defaults(handler=_cli_startup_check)
+
+    startup_probe = commands.add_parser("startup-probe", help="Internal: open the GUI and exit after the first paint")
+    startup_probe.set_defaults(handler=_cli_startup_probe)
+
+    queue_add = commands.add_parser("queue-add", help="Queue an export job for the worker agents")
+    queue_add.add_argument("queue", help="Queue database (SQLite file, may be on a share)")
+    queue_add.add_argument("settings", help="settings.json with the export fields")
+    queue_add.add_argument("objects", help="Object list text file")
+    queue_add.add_argument("--split", action="store_true", help="One job per discipline shard, federated at the end")
+    queue_add.add_argument("--shards", type=int, help="One job per balanced shard (see 'plan'), federated at the end")
+    queue_add.set_defaults(handler=_cli_queue_add)
+
+    queue_status = commands.add_parser("queue-status", help="Show the jobs of a queue")
+    queue_status.add_argument("queue")
+    queue_status.add_argument("--limit", type=int, default=20)
+    queue_status.set_defaults(handler=_cli_queue_status)
+
+    worker = commands.add_parser("worker", help="Run the worker agent on this host")
+    worker.add_argument("queue")
+    worker.add_argument("--name", help="Worker id (default: <host>-<pid>)")
+    worker.add_argument("--work-dir", help="Local folder for the generated macros")
+    worker.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS, help="Lease length in seconds")
+    worker.add_argument("--poll", type=float, default=WORKER_POLL_SECONDS, help="Idle poll interval in seconds")
+    worker.add_argument("--exit-when-empty", action="store_true")
+    worker.add_argument("--max-jobs", type=int)
+    worker.add_argument("--fake", type=float, metavar="SECONDS", help="Simulate jobs instead of running E3D")
+    worker.add_argument("--fail-rate", type=float, default=0.0, help="Fake jobs: share that fails")
+    worker.add_argument("--crash-rate", type=float, default=0.0, help="Fake jobs: share that kills the worker")
+    worker.set_defaults(handler=_cli_worker)
+
+    worker_bench = commands.add_parser("worker-bench", help="Measure queue throughput with local fake workers")
+    worker_bench.add_argument("--jobs", type=int, default=24)
+    worker_bench.add_argument("--seconds", type=float, default=0.5, help="Duration of one fake job")
+    worker_bench.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    worker_bench.add_argument("--lease", type=float, default=3.0)
+    worker_bench.add_argument("--crash-rate", type=float, default=0.0)
+    worker_bench.set_defaults(handler=_cli_worker_bench)
+
+    serve = commands.add_parser("serve", help="Local HTTP/JSON API to queue exports and follow their progress")
+    serve.add_argument("queue", help="Queue database the workers read")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.set_defaults(handler=_cli_serve)
+
+    warm_submit = commands.add_parser("warm-submit", help="Run a macro in the warm E3D session (RunE3D.bat)")
+    warm_submit.add_argument("settings", help="settings.json of the export (project, MDB, credentials)")
+    warm_submit.add_argument("macro", help="Macro to run, normally RVM.mac")
+    warm_submit.add_argument("--log", help="RVM_LOG.txt of the macro, where the job notes its GETWORK")
+    warm_submit.add_argument("--max-jobs", type=int, default=WARM_MAX_JOBS, help="Jobs per session before a restart")
+    warm_submit.add_argument("--max-memory-mb", type=float, default=WARM_MAX_MEMORY_MB,
+                             help="Recycle an idle session above this memory (needs psutil)")
+    warm_submit.set_defaults(handler=_cli_warm_submit)
+
+    warm_status = commands.add_parser("warm-status", help="Show the warm E3D sessions")
+    warm_status.add_argument("root", nargs="?", default=DEFAULT_WARM_ROOT)
+    warm_status.set_defaults(handler=_cli_warm_status)
+
+    warm_stop = commands.add_parser("warm-stop", help="Stop warm E3D sessions after their current job")
+    warm_stop.add_argument("root", nargs="?", default=DEFAULT_WARM_ROOT)
+    warm_stop.add_argument("--project", help="Only the sessions of this project")
+    warm_stop.add_argument("--timeout", type=float, default=600, help="Seconds to wait for each session")
+    warm_stop.set_defaults(handler=_cli_warm_stop)
+
+    runlog_follow = commands.add_parser("runlog-follow", help="Record RVM_LOG.txt as a structured run log")
+    runlog_follow.add_argument("log", help="RVM_LOG.txt of the running macro")
+    runlog_follow.add_argument("output_folder")
+    runlog_follow.add_argument("--project", required=True)
+    runlog_follow.add_argument("--shard", help="Discipline part of a split export")
+    runlog_follow.add_argument("--timeout", type=float, default=24 * 3600, help="Give up after this many seconds")
+    runlog_follow.set_defaults(handler=_cli_runlog_follow)
+
+    runlog_tail = commands.add_parser("runlog-tail", help="Show the newest run log events of a project")
+    runlog_tail.add_argument("output_folder")
+    runlog_tail.add_argument("--project", required=True)
+    runlog_tail.add_argument("-n", "--count", type=int, default=50)
+    runlog_tail.add_argument("--json", action="store_true", help="Print the raw JSON events")
+    runlog_tail.set_defaults(handler=_cli_runlog_tail)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP/JSON control API for automation (CI, dashboards). Jobs posted here go to the
+worker queue (jobqueue.py); status requests are answered from an in-memory snapshot
+that one background task refreshes, so any number of pollers costs one database read
+per refresh and never blocks the workers or the GUI.
+
+    POST /jobs          {settings.json fields..., "objects": [...], "split": false}
+    GET  /jobs          counts and newest jobs
+    GET  /jobs/<id>     one job with its result
+    GET  /events        server-sent events stream of job changes
+    GET  /health
+"""
+
+import json
+import time
+import asyncio
+from http import HTTPStatus
+
+from core import split_by_discipline
+from jobqueue import JobQueue
+
+
+CONTROL_HOST = "127.0.0.1"     # local only: job specs carry E3D credentials
+CONTROL_PORT = 8765
+SNAPSHOT_INTERVAL = 1.0        # seconds between queue reads
+SNAPSHOT_JOBS = 200            # newest jobs kept in the snapshot
+EVENT_BUFFER = 1000            # events buffered per slow subscriber before it is dropped
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Fields an export job needs, as in settings.json (the GUI requires the same ones)
+REQUIRED_JOB_FIELDS = ("aveva_path", "proj_code", "user", "password", "mdb", "output_folder", "roamer_path")
+JOB_DEFAULTS = {"areas_file": "", "export_attribute": True, "daily_export": False, "export_time": False}
+
+
+class ControlError(Exception):
+    """Request error reported to the client with an HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlServer:
+    """asyncio HTTP server in front of a JobQueue."""
+
+    def __init__(self, queue, host=CONTROL_HOST, port=CONTROL_PORT):
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.snapshot = {"counts": {}, "jobs": [], "updated": None}
+        self._known = {}          # job id -> (state, attempts, worker, progress) of the last snapshot
+        self._subscribers = set()
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        refresher = asyncio.create_task(self._refresh_loop())
+        print(f"[CONTROL] Listening on http://{self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            refresher.cancel()
+
+    # --- snapshot and events -------------------------------------------------------
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:  # a locked or unreachable share must not stop the server
+                print(f"[CONTROL] Queue refresh failed: {e}")
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+    async def refresh(self):
+        """Reads the queue in a thread and publishes the changes as events."""
+        counts, jobs = await asyncio.to_thread(lambda: (self.queue.counts(), self.queue.jobs(SNAPSHOT_JOBS)))
+        self.snapshot = {"counts": counts, "jobs": jobs, "updated": time.time()}
+        for job in reversed(jobs):
+            key = (job["state"], job["attempts"], job["worker"], job["progress"])
+            if self._known.get(job["id"]) != key:
+                self._known[job["id"]] = key
+                self._publish({"event": "job", "job": job})
+        current = {job["id"] for job in jobs}
+        for job_id in [job_id for job_id in self._known if job_id not in current]:
+            del self._known[job_id]
+
+    def _publish(self, event):
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.put_nowait(event)
+            except asyncio.QueueFull:
+                self._subscribers.discard(subscriber)  # too slow; it reconnects and re-reads /jobs
+
+    # --- HTTP ------------------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            method, path, body = await self._read_request(reader)
+            if method == "GET" and path == "/events":
+                await self._stream_events(writer)
+                return
+            status, payload = await self._route(method, path, body)
+        except ControlError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:  # last resort: the client still gets an answer and a closed connection
+            print(f"[CONTROL] Request failed: {e!r}")
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "internal error"}
+        await self._respond(writer, status, payload)
+
+    async def _read_request(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) < 2:
+            raise ControlError(HTTPStatus.BAD_REQUEST, "malformed request")
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode('latin-1').partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise ControlError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length < 0:
+            raise ControlError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ControlError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return request_line[0].upper(), request_line[1].split("?")[0].rstrip("/") or "/", body
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "updated": self.snapshot["updated"]}
+        if path == "/jobs" and method == "GET":
+            return HTTPStatus.OK, self.snapshot
+        if path == "/jobs" and method == "POST":
+            return HTTPStatus.CREATED, await asyncio.to_thread(self.enqueue, self._parse_json(body))
+        if path.startswith("/jobs/") and method == "GET":
+            try:
+                job_id = int(path[len("/jobs/"):])
+            except ValueError:
+                raise ControlError(HTTPStatus.NOT_FOUND, "unknown job")
+            job = await asyncio.to_thread(self.queue.get, job_id)
+            if job is None:
+                raise ControlError(HTTPStatus.NOT_FOUND, "unknown job")
+            return HTTPStatus.OK, job
+        raise ControlError(HTTPStatus.NOT_FOUND, f"no route for {method} {path}")
+
+    @staticmethod
+    def _parse_json(body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError as e:
+            raise ControlError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+        if not isinstance(request, dict):
+            raise ControlError(HTTPStatus.BAD_REQUEST, "the body must be a JSON object")
+        return request
+
+    def enqueue(self, request):
+        """Validates a job request and queues it (one job per discipline shard with split)."""
+        missing = [name for name in REQUIRED_JOB_FIELDS if not request.get(name)]
+        if missing:
+            raise ControlError(HTTPStatus.BAD_REQUEST, f"missing fields: {', '.join(missing)}")
+        objects = request.get("objects", [])
+        if not isinstance(objects, list) or not all(isinstance(line, str) for line in objects):
+            raise ControlError(HTTPStatus.BAD_REQUEST, "objects must be a list of strings")
+        objects = [line.strip() for line in objects if line.strip()]
+        if not objects:
+            raise ControlError(HTTPStatus.BAD_REQUEST, "objects must be a non-empty list")
+
+        data = {**JOB_DEFAULTS, **{k: v for k, v in request.items() if k not in ("objects", "split")}}
+        project = data["proj_code"]
+        if not request.get("split"):
+            return {"ids": [self.queue.enqueue({"data": data, "objects": objects}, project=project)]}
+
+        shards = split_by_discipline(objects)
+        group = f"{project}-{time.strftime('%Y%m%d-%H%M%S')}"
+        ids = [self.queue.enqueue({"data": data, "objects": lines, "federate_parts": list(shards)},
+                                  project=project, shard=shard, group=group)
+               for shard, lines in shards.items()]
+        return {"ids": ids, "group": group}
+
+    async def _respond(self, writer, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _stream_events(self, writer):
+        """Server-sent events: the current snapshot first, then every job change."""
+        subscriber = asyncio.Queue(EVENT_BUFFER)
+        self._subscribers.add(subscriber)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                     b"Connection: close\r\n\r\n")
+        try:
+            writer.write(f"data: {json.dumps({'event': 'snapshot', **self.snapshot})}\n\n".encode('utf-8'))
+            await writer.drain()
+            while subscriber in self._subscribers:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), timeout=15)
+                    writer.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+                except asyncio.TimeoutError:
+                    writer.write(b": keep-alive\n\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            writer.close()
+
+
+def run_control_server(queue_path, host=CONTROL_HOST, port=CONTROL_PORT):
+    """Blocks serving the control API for the given queue."""
+    server = ControlServer(JobQueue(queue_path), host, port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
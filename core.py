@@ -0,0 +1,3268 @@
+# -*- coding: utf-8 -*-
+"""
+Export logic without GUI dependencies: artifact generation, publishing, archives and
+attribute dump tools. Imported by the generated batch files through cli.py, so it must
+stay free of PyQt6 to keep those calls fast.
+"""
+
+import sys
+import os
+import io
+import json
+import gzip
+import time
+import shutil
+import fnmatch
+import subprocess
+import heapq
+import statistics
+import bisect
+import re
+import struct
+import hashlib
+import importlib
+import tempfile
+import itertools
+from array import array
+from pathlib import Path
+
+try:
+    import zstandard  # optional: faster and smaller than gzip for RVM archives
+except ImportError:
+    zstandard = None
+
+FRAME_BUDGET_MS = 16  # side panel filtering should fit in one frame
+
+MANIFEST_FILE_NAME = ".export_manifest.json"
+PUBLISH_CHUNK_SIZE = 8 * 1024 * 1024
+
+NWD_STORE_FOLDER_NAME = "_nwd_store"
+INTERMEDIATES_FOLDER_NAME = "_intermediates"
+INTERMEDIATE_FILES = ("TEMP.RVM", "TEMP.txt", "TEMP-*.RVM")   # glob patterns; TEMP-<PART>.RVM in pipelined runs
+STATS_FOLDER_NAME = "_stats"
+TYPE_COUNTS_FILE_NAME = "TYPE_COUNTS.txt"
+PRESCAN_COUNTS_FILE_NAME = "PRESCAN_COUNTS.txt"
+RUN_HISTORY_SUFFIX = "-runs.jsonl"   # _stats/<project>-runs.jsonl: duration and sizes of every finished run
+
+# Export estimator: y = a + b * elements per target, fitted on the run history
+ESTIMATE_TARGETS = ("duration_s", "rvm_bytes", "attributes_bytes", "nwd_bytes")
+ESTIMATE_MIN_RUNS = 3    # runs a project needs before its own fit replaces the one pooled over all projects
+ESTIMATE_Z = 1.645       # error bars: ~90% band of the leave-one-out relative errors
+
+# Element types collected by attribute.mac unless the project configures its own list
+DEFAULT_COLLECT_TYPES = [
+    "SITE", "ZONE", "PIPE", "BRAN", "ELBOW", "BEND", "TEE", "FLAN", "OLET", "INST", "VALVE", "PCOMP",
+    "FBLIND", "GASK", "TUBI", "REDU", "CAP", "COUP", "PLUG", "UNION", "ATTA", "FTUBE", "FILT",
+    "STRU", "FRMW", "SCTN",
+]
+
+PROJECTS_FILE_NAME = "projects.json"
+PROJECTS_CHECK_INTERVAL = 2.0  # seconds between mtime checks of projects.json
+
+ATTRIBUTE_PROFILES_FILE_NAME = "attribute_profiles.json"
+DEFAULT_ATTRIBUTE_PROFILE = "full"
+
+# Which attributes attribute.mac evaluates, per element type.
+#   types.<TYPE>.include  -> only these attributes (whitelist)
+#   types.<TYPE>.exclude  -> the whole attlist minus these (blacklist)
+#   default               -> rule for every type not listed
+#   branch_extras         -> computed attributes for components owned by a BRAN (not TUBI)
+#   branch_extras_by_type -> additional computed attributes for specific component types
+ATTRIBUTE_PROFILES = {
+    "full": {
+        "description": "Whole attlist for every element (the original dump)",
+        "types": {
+            "TUBI": {"include": ["Itlength", "Lbore", "DTXR", "Spref"]},
+        },
+        "default": {"exclude": ["NAME", "OWNER"]},
+        "branch_extras": ["APOS", "LPOS", "DTXR", "CWEI OF CMPREF OF SPREF",
+                          "AFTER(NAME OF PSPEC OF PIPE, '/')", "P1BOR", "P2BOR"],
+        "branch_extras_by_type": {"TEE": ["P3BOR"], "OLET": ["P3BOR"]},
+    },
+    "navisworks": {
+        "description": "Only the attributes reviewers use in Navisworks property tabs",
+        "types": {
+            "TUBI": {"include": ["Itlength", "Lbore", "DTXR", "Spref"]},
+            "SITE": {"include": ["TYPE", "DESC", "PURP"]},
+            "ZONE": {"include": ["TYPE", "DESC", "PURP"]},
+            "PIPE": {"include": ["TYPE", "DESC", "PSPEC", "ISPEC", "BORE", "TEMP", "PRES", "PURP"]},
+            "BRAN": {"include": ["TYPE", "HBORE", "TBORE", "HREF", "TREF"]},
+            "STRU": {"include": ["TYPE", "DESC", "PURP"]},
+            "FRMW": {"include": ["TYPE", "DESC", "PURP"]},
+            "SCTN": {"include": ["TYPE", "SPREF", "MATREF"]},
+        },
+        "default": {"include": ["TYPE", "DESC", "SPREF"]},
+        "branch_extras": ["DTXR", "CWEI OF CMPREF OF SPREF", "AFTER(NAME OF PSPEC OF PIPE, '/')",
+                          "P1BOR", "P2BOR"],
+        "branch_extras_by_type": {"TEE": ["P3BOR"], "OLET": ["P3BOR"]},
+    },
+}
+
+# Friendly names written to the dump instead of the attribute expressions (applied in order)
+ATTRIBUTE_LABELS = {
+    "Itlength": "Length",
+    "CWEI OF CMPREF OF SPREF": "weight",
+    "DTXR": "Descr.",
+    "P2BOR": "Red. Size",
+    "P3BOR": "Branch Conn. Size",
+    "AFTER(NAME OF PSPEC OF PIPE, '/')": "Pipe Spec",
+    ":ENI_CODE of spco of spref": "ENI Code",
+    ":PNUM of spco of spref": "PUMA Code",
+    "P1BOR": "Main Size",
+    "Lbore": "Pipe Size",
+}
+
+RETENTION_DEFAULTS = {
+    "keep_runs": 5,          # newest runs kept per project
+    "max_total_mb": 20480,   # size quota per project (compressed)
+    "max_age_days": 30,      # older runs are evicted regardless of count
+}
+
+RUNLOG_FOLDER_NAME = "_runlogs"
+RUNLOG_RETENTION = {
+    "keep_runs": 200,        # newest run logs kept per project
+    "max_total_mb": 256,     # size quota per project
+    "max_age_days": 90,
+}
+RUNLOG_POLL_SECONDS = 0.2    # how often the follower checks RVM_LOG.txt for new lines
+
+# RVM_LOG.txt lines written by RVM.mac -> stage names in the structured run log
+RVM_LOG_STAGES = (
+    ("[RVM] Start attribute.mac", "attributes"),
+    ("[RVM] NWD_OUT=", "nwd_path"),
+    ("[RVM] Getwork ", "getwork"),
+    ("[RVM] Exporting RVM file...", "rvm"),
+    ("[RVM] Export ", "export"),
+    ("[RVM] Launching Navisworks...", "roamer"),
+    ("[RVM] Converting ", "convert"),
+    ("[RVM] Tile ", "tile"),
+    ("[RVM] Finished", "finished"),
+)
+
+# PML shared by the generated macros: zero-padded date parts of the run (used in the
+# NWD names) and the per-type element count of the current element.
+PML_RUN_STAMP = """VAR !PROJ PROJ CODE
+!CUDATE = OBJECT DATETIME()
+!DAY = !CUDATE.DATE().STRING()
+IF !DAY.LENGTH().EQ( 1 ) THEN
+  !DAY = '0' + !DAY
+ENDIF
+!MONTH = !CUDATE.MONTH().STRING()
+IF !MONTH.LENGTH().EQ( 1 ) THEN
+  !MONTH = '0' + !MONTH
+ENDIF
+!HOUR = !CUDATE.HOUR().STRING()
+IF !HOUR.LENGTH().EQ( 1 ) THEN
+  !HOUR = '0' + !HOUR
+ENDIF
+!MINUTE = !CUDATE.MINUTE().STRING()
+IF !MINUTE.LENGTH().EQ( 1 ) THEN
+  !MINUTE = '0' + !MINUTE
+ENDIF
+!SECOND = !CUDATE.SECOND().STRING()
+IF !SECOND.LENGTH().EQ( 1 ) THEN
+  !SECOND = '0' + !SECOND
+ENDIF
+"""
+PML_COUNT_TYPE = """$* Count element type
+var !ETYPE TYPE
+!TIDX = !SEEN.FindFirst(!ETYPE)
+if (UNSET(!TIDX)) then
+!SEEN.Append(!ETYPE)
+!TCOUNT.Append(1)
+else
+!TCOUNT[!TIDX] = !TCOUNT[!TIDX] + 1
+endif
+"""
+
+QUALITY_PROFILES_FILE_NAME = "quality_profiles.json"
+DEFAULT_QUALITY_PROFILE = "full"
+
+# RVM export options per quality profile (what RVM.mac sets before its EXPORT commands).
+#   export  -> autocolour, repr (representation), holes, implied_tube (tube as separate primitives)
+#   objects -> patterns of the object lines exported (others are skipped), empty = all
+#   label   -> name part of the NWD and its statistics, e.g. <PROJ>-PREVIEW-latest.nwd,
+#              so a preview never replaces the full model nor skews its estimates
+QUALITY_PROFILES = {
+    "full": {
+        "description": "Colours, representation, holes and implied tube (the original export)",
+        "export": {"autocolour": True, "repr": True, "holes": True, "implied_tube": True},
+        "objects": [],
+        "label": "",
+    },
+    "preview": {
+        "description": "Fast coordination preview: no holes, no representation, tube inside its branch",
+        "export": {"autocolour": True, "repr": False, "holes": False, "implied_tube": False},
+        "objects": [],
+        "label": "PREVIEW",
+    },
+}
+
+# Export modes: what a run produces. Geometry-only runs skip attribute.mac (no TEMP.txt,
+# NWD without properties); attribute-only runs skip the RVM/NWD and publish the dump.
+EXPORT_MODES = {"both": "Geometry + Attributes", "geometry": "Geometry only", "attributes": "Attributes only"}
+DEFAULT_EXPORT_MODE = "both"
+ATTRIBUTES_DUMP_SUFFIX = "-attributes.txt"   # <output>/<PROJ>-attributes.txt of attribute-only runs
+
+# Scheduled runs: one Windows task per project and mode, running 'run-export' on a saved spec
+SCHEDULES_FOLDER_NAME = "_schedules"
+SCHEDULE_TASK_FOLDER = "E3D Export"
+
+# Warm sessions (warm.py): one long-lived E3D session per project and MDB on this machine
+DEFAULT_WARM_ROOT = os.path.join(tempfile.gettempdir(), "e3d_warm")
+
+# Site/zone catalog: CATALOG.mac dumps the MDB hierarchy once into a local index that the
+# side panel completes from and object list patterns (/U109A:*) are expanded against
+CATALOG_FILE_NAME = "CATALOG.txt"
+DEFAULT_CATALOG_ROOT = os.path.join(tempfile.gettempdir(), "e3d_catalog")
+CATALOG_TTL = 24 * 3600   # seconds before a catalog is reported as stale
+OBJECT_PATTERN_CHARS = "*?["
+
+# Spatial tiling: a grid over the plant, one part per tile collected by volume. An element
+# belongs to the tile holding the minimum corner of its box, so straddling elements export once.
+# Other types are not exported by a tiled run: set the project's 'tile_types' and check the
+# attribute dump with uncovered_elements().
+DEFAULT_TILE_TYPES = ["EQUI", "BRAN", "FRMW", "HVAC"]   # exported one by one; must not contain each other
+TILE_CONTAINER_TYPES = ("WORL", "SITE", "ZONE")   # hold tiled elements but no geometry of their own
+TILE_UNBOUNDED = 10000000   # mm, how far the outer tiles reach beyond the grid extent
+TILES_FILE_SUFFIX = "-tiles.json"   # <output>/<PROJ>-tiles.json: the grid of the last tiled export
+TILE_IMBALANCE_WARN = 1.5   # slowest tile over the mean tile time that the report flags
+
+PLAN_HISTORY_RUNS = 20    # newest run logs per project read for per-object export timings
+SHARD_PREFIX = "S"        # balanced shards are named S1, S2, ...
+
+DISCIPLINE_RULES_FILE_NAME = "discipline_rules.json"
+PART_DONE_FILE_NAME = "PART_DONE"
+CONVERTED_SUFFIX = ".converted"   # marker of a pipelined part whose NWD is published
+CONVERT_FAILED_SUFFIX = ".failed"   # marker of a pipelined part whose conversion failed
+DEFAULT_MAX_SESSIONS = 3
+FILETOOLS_EXE_NAME = "FileToolsTaskRunner.exe"
+OTHER_DISCIPLINE = "OTHER"
+
+# Object paths are matched (case-insensitive, first match wins) to split an export
+# into one RVM/NWD per discipline. Unmatched objects go to OTHER.
+DISCIPLINE_RULES = [
+    ["SU", ["*SUPP*", "*SUP-*", "*:SU", "*:SU(*"]],
+    ["EL", ["*:EL", "*:EL(*"]],
+    ["EQ", ["*:EQ", "*:EQ(*", "*_EQ"]],
+    ["PI", ["*:PI", "*:PI(*", "*:PI-*"]],
+    ["ST", ["*:ST", "*:ST(*", "*FOUNDATION*"]],
+    ["IN", ["*:IN", "*:IN(*"]],
+]
+
+
+def atomic_write_text(path, content, retries=5):
+    """
+    Writes text to a temp file next to `path` and renames it into place, so readers
+    (e.g. a running RunE3D.bat) only ever see the old or the complete new file.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # On Windows the rename fails while another process holds the target open
+    for attempt in range(retries):
+        try:
+            os.replace(temp_path, path)
+            return
+        except PermissionError:
+            if attempt == retries - 1:
+                temp_path.unlink(missing_ok=True)
+                raise
+            time.sleep(0.2 * (attempt + 1))
+
+
+def app_dir():
+    """Folder of the script or frozen executable, where user configuration files live."""
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).resolve().parent
+    return Path(__file__).resolve().parent
+
+
+def load_quality_profiles():
+    """Built-in quality profiles, overridden/extended by quality_profiles.json if present."""
+    profiles = dict(QUALITY_PROFILES)
+    user_file = app_dir() / QUALITY_PROFILES_FILE_NAME
+    if user_file.exists():
+        with open(user_file, 'r', encoding='utf-8') as f:
+            profiles.update(json.load(f))
+    return profiles
+
+
+def quality_profile(data):
+    """Quality profile selected in a settings dict."""
+    name = data.get("quality_profile") or DEFAULT_QUALITY_PROFILE
+    profiles = load_quality_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown quality profile '{name}' (expected one of: {', '.join(profiles)})")
+    return profiles[name]
+
+
+def quality_project(data):
+    """Project name the outputs of a run are filed under: <PROJ>, or <PROJ>-<label> for a labelled quality."""
+    label = quality_profile(data).get("label")
+    return f"{data['proj_code']}-{label}" if label else data["proj_code"]
+
+
+def pml_export_options(profile):
+    """EXPORT settings of RVM.mac for a quality profile."""
+    options = {**QUALITY_PROFILES[DEFAULT_QUALITY_PROFILE]["export"], **profile.get("export", {})}
+    lines = (["EXPORT AUTOCOLOUR DISPLAYEXPORT ON", "EXPORT AUTOCOLOUR ON"] if options["autocolour"]
+             else ["EXPORT AUTOCOLOUR OFF"])
+    lines.append(f"EXPORT REPR {'ON' if options['repr'] else 'OFF'}")
+    lines.append(f"EXPORT HOLES {'ON' if options['holes'] else 'OFF'}")
+    if options["implied_tube"]:
+        lines.append("EXPORT IMPLIED TUBE INTO SEPARATE")
+    return "\n".join(lines) + "\n"
+
+
+def quality_objects(objects, profile):
+    """
+    Object lines a quality profile exports: the lines matching its 'objects' patterns
+    (EXCLUDE lines are always kept), or all of them without patterns.
+    """
+    patterns = [pattern.upper() for pattern in profile.get("objects") or []]
+    if not patterns:
+        return objects
+    kept = [line for line in objects if line.strip().upper().startswith("EXCLUDE ")
+            or any(fnmatch.fnmatchcase(_object_key(line), pattern) for pattern in patterns)]
+    if objects and all(line.strip().upper().startswith("EXCLUDE ") for line in kept):
+        raise ValueError(f"The quality profile keeps none of the objects ({', '.join(profile['objects'])})")
+    return kept
+
+
+def load_attribute_profiles():
+    """Built-in attribute profiles, overridden/extended by attribute_profiles.json if present."""
+    profiles = dict(ATTRIBUTE_PROFILES)
+    user_file = app_dir() / ATTRIBUTE_PROFILES_FILE_NAME
+    if user_file.exists():
+        with open(user_file, 'r', encoding='utf-8') as f:
+            profiles.update(json.load(f))
+    return profiles
+
+
+class ProjectRegistry:
+    """
+    Project codes with their MDB, default objects, attribute and quality profiles and schedule, read
+    from projects.json. The file is parsed once and re-read only when its mtime changes
+    (checked at most every PROJECTS_CHECK_INTERVAL seconds), so lookups are dict reads.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else app_dir() / PROJECTS_FILE_NAME
+        self.error = None
+        self._projects = {}
+        self._mtime = None
+        self._checked = 0.0
+
+    def projects(self):
+        """Ordered dict {code: entry}."""
+        now = time.monotonic()
+        if self._mtime is None or now - self._checked >= PROJECTS_CHECK_INTERVAL:
+            self._checked = now
+            self._reload_if_changed()
+        return self._projects
+
+    def get(self, code):
+        return self.projects().get(code)
+
+    def default_objects(self, code):
+        entry = self.get(code)
+        return list(entry.get("objects", [])) if entry else []
+
+    def _reload_if_changed(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            self.error = f"{self.path} not found"
+            self._mtime = -1
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._projects = json.load(f)["projects"]
+            self.error = None
+        except (OSError, ValueError, KeyError) as e:
+            # Keep the last good registry while the file is being edited
+            self.error = f"{self.path}: {e}"
+        self._mtime = mtime
+
+
+def load_discipline_rules():
+    """Built-in discipline rules, replaced by discipline_rules.json if present."""
+    user_file = app_dir() / DISCIPLINE_RULES_FILE_NAME
+    if user_file.exists():
+        with open(user_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return DISCIPLINE_RULES
+
+
+def _object_key(line):
+    """Upper-case object name of an object list line, without the 'T ' prefix (for matching and costs)."""
+    upper = line.strip().upper()
+    return upper[2:].strip() if upper.startswith("T ") else upper
+
+
+def split_by_discipline(objects, rules=None):
+    """
+    Groups object list lines by discipline, keeping their order. EXCLUDE lines apply
+    to every group; the 'T ' prefix of an object line is kept with the object.
+    Returns an ordered dict {discipline: [lines]} without empty groups.
+    """
+    rules = rules if rules is not None else load_discipline_rules()
+    groups = {name: [] for name, _ in rules}
+    groups[OTHER_DISCIPLINE] = []
+    excludes = []
+    for line in objects:
+        if line.strip().upper().startswith("EXCLUDE "):
+            excludes.append(line)
+            continue
+        path = _object_key(line)
+        name = next((name for name, patterns in rules
+                     if any(fnmatch.fnmatchcase(path, pattern.upper()) for pattern in patterns)),
+                    OTHER_DISCIPLINE)
+        groups[name].append(line)
+    return {name: lines + excludes for name, lines in groups.items() if lines}
+
+
+def _line_costs(lines, costs):
+    """Cost of each line; objects without a known cost get the median known cost."""
+    default = statistics.median(costs.values()) if costs else 1.0
+    return [costs.get(_object_key(line), default) for line in lines]
+
+
+def plan_shards(objects, sessions, costs=None):
+    """
+    Packs the object lines into `sessions` shards, longest processing time first: the
+    costliest remaining object always goes to the least loaded shard. EXCLUDE lines
+    apply to every shard (as in split_by_discipline) and each shard keeps list order.
+    Returns an ordered dict {"S1": [lines], ...} without empty shards.
+    """
+    costs = costs or {}
+    includes = [line for line in objects if not line.strip().upper().startswith("EXCLUDE ")]
+    excludes = [line for line in objects if line.strip().upper().startswith("EXCLUDE ")]
+    weights = _line_costs(includes, costs)
+
+    heap = [(0.0, shard) for shard in range(max(1, sessions))]
+    assigned = [[] for _ in heap]
+    for index in sorted(range(len(includes)), key=lambda index: -weights[index]):
+        load, shard = heapq.heappop(heap)
+        assigned[shard].append(index)
+        heapq.heappush(heap, (load + weights[index], shard))
+    return {f"{SHARD_PREFIX}{number}": [includes[index] for index in sorted(indices)] + excludes
+            for number, indices in enumerate([indices for indices in assigned if indices], 1)}
+
+
+def naive_shards(objects, sessions):
+    """Equal numbers of consecutive object lines per shard, for comparison with plan_shards."""
+    includes = [line for line in objects if not line.strip().upper().startswith("EXCLUDE ")]
+    excludes = [line for line in objects if line.strip().upper().startswith("EXCLUDE ")]
+    size = -(-len(includes) // max(1, sessions))
+    return {f"{SHARD_PREFIX}{number}": includes[start:start + size] + excludes
+            for number, start in enumerate(range(0, len(includes), size), 1)} if includes else {}
+
+
+def shard_loads(parts, costs=None):
+    """Predicted cost of every shard: {name: load}. The makespan is the largest load."""
+    costs = costs or {}
+    return {name: sum(_line_costs([line for line in lines if not line.strip().upper().startswith("EXCLUDE ")], costs))
+            for name, lines in parts.items()}
+
+
+def plan_report(objects, sessions, costs=None):
+    """
+    Balanced shards of the object list with their predicted makespan, next to the naive
+    split and the lower bound max(total / sessions, costliest object).
+    """
+    costs = costs or {}
+    planned = plan_shards(objects, sessions, costs)
+    loads, naive_loads = shard_loads(planned, costs), shard_loads(naive_shards(objects, sessions), costs)
+    includes = [line for line in objects if not line.strip().upper().startswith("EXCLUDE ")]
+    weights = _line_costs(includes, costs)
+    return {
+        "shards": planned,
+        "loads": loads,
+        "naive_loads": naive_loads,
+        "makespan": max(loads.values(), default=0.0),
+        "naive_makespan": max(naive_loads.values(), default=0.0),
+        "lower_bound": max(sum(weights) / max(1, sessions), max(weights, default=0.0)),
+        "known": sum(_object_key(line) in costs for line in includes),
+    }
+
+
+def self_command():
+    """Returns the command line that re-invokes this tool (script or frozen executable)."""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable]
+    return [sys.executable, str(app_dir() / "main.py")]
+
+
+def _tool_command():
+    """self_command() quoted for a batch file."""
+    return " ".join(f'"{part}"' for part in self_command())
+
+
+def _mon_launch(data, macro_path):
+    """Batch lines that start E3D (mon.exe) in the background on a macro."""
+    aveva_path_bat = data["aveva_path"].replace("/", "\\")
+    return f"""start "" /b "{os.path.join(aveva_path_bat, "mon.exe")}" ^
+          PROD E3D init "{os.path.join(aveva_path_bat, "launch.init")}" ^
+          GRAPHICS {data["proj_code"]} {data["user"]}/{data["password"]} /{data["mdb"]} ^
+          $M{macro_path}"""
+
+
+def export_mode(data):
+    """Export mode of a settings dict; older settings only have 'export_attribute'."""
+    mode = data.get("export_mode") or (DEFAULT_EXPORT_MODE if data.get("export_attribute", True) else "geometry")
+    if mode not in EXPORT_MODES:
+        raise ValueError(f"Unknown export mode '{mode}' (expected one of: {', '.join(EXPORT_MODES)})")
+    return mode
+
+
+def save_schedule_spec(data, objects):
+    """Stores what the scheduled runs of a project export in <output>/_schedules/<PROJ>.json."""
+    folder = Path(data["output_folder"]) / SCHEDULES_FOLDER_NAME
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{data['proj_code']}.json"
+    atomic_write_text(path, json.dumps({"data": data, "objects": list(objects)}, indent=4))
+    return path
+
+
+def schedule_commands(spec_path, project, schedules):
+    """
+    schtasks command lines for a project's schedules ({mode: {"time": "HH:MM", "every_hours": n,
+    "quality": profile}}): a daily task per scheduled mode, repeated every n hours when n > 0
+    and run with its own quality profile if set, and a delete for the tasks of the other modes.
+    """
+    tool_command = _tool_command()
+    commands = []
+    for mode in EXPORT_MODES:
+        task = f"{SCHEDULE_TASK_FOLDER}\\{project} {mode}"
+        schedule = schedules.get(mode)
+        if not schedule or not schedule.get("time"):
+            commands.append(["schtasks", "/Delete", "/F", "/TN", task])
+            continue
+        quality = f" --quality {schedule['quality']}" if schedule.get("quality") else ""
+        command = ["schtasks", "/Create", "/F", "/SC", "DAILY", "/ST", schedule["time"], "/TN", task,
+                   "/TR", f'{tool_command} run-export "{spec_path}" --mode {mode}{quality}']
+        if schedule.get("every_hours"):
+            command += ["/RI", str(int(schedule["every_hours"]) * 60), "/DU", "24:00"]
+        commands.append(command)
+    return commands
+
+
+def register_schedules(data, objects):
+    """
+    Saves the export spec and (re)creates the Windows tasks of data["schedules"].
+    Returns [(mode, ok, message)] for the scheduled modes.
+    """
+    schedules = data.get("schedules") or {}
+    spec_path = save_schedule_spec(data, objects)
+    results = []
+    for mode, command in zip(EXPORT_MODES, schedule_commands(spec_path, data["proj_code"], schedules)):
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if command[1] == "/Create":
+            message = (completed.stdout or completed.stderr).strip()
+            results.append((mode, completed.returncode == 0, message))
+    return results
+
+
+def file_sha256(path, chunk_size=PUBLISH_CHUNK_SIZE):
+    """Streams a file through SHA-256 and returns the hex digest."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def publish_file(source, dest_dir, attempts=3):
+    """
+    Copies `source` into `dest_dir` as <name>.partial, verifies the copy against the
+    source checksum and renames it into place, so nobody can open a half-copied file.
+    Returns (published path, SHA-256 digest).
+    """
+    source = Path(source)
+    target = Path(dest_dir) / source.name
+    if target.exists() and os.path.samefile(source, target):
+        return target, file_sha256(source)  # direct mode: the NWD was built in place
+    partial = target.with_name(target.name + ".partial")
+
+    for attempt in range(1, attempts + 1):
+        source_digest = hashlib.sha256()
+        with open(source, 'rb') as fin, open(partial, 'wb') as fout:
+            while chunk := fin.read(PUBLISH_CHUNK_SIZE):
+                source_digest.update(chunk)
+                fout.write(chunk)
+            fout.flush()
+            os.fsync(fout.fileno())
+
+        # Re-read what actually landed on the share
+        if file_sha256(partial) == source_digest.hexdigest():
+            os.replace(partial, target)
+            return target, source_digest.hexdigest()
+
+        partial.unlink(missing_ok=True)
+        print(f"[PUBLISH] Checksum mismatch for {target} (attempt {attempt}/{attempts})", file=sys.stderr)
+
+    raise IOError(f"Could not publish {source} to {dest_dir}: checksum mismatch")
+
+
+def record_type_counts(counts_file, output_dir, project, kind="type-counts"):
+    """
+    Stores the element counts per type of the last run as _stats/<project>-type-counts.json
+    (kind 'prescan-counts' for a count pre-scan without export).
+    """
+    counts, objects = {}, {}
+    with open(counts_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2:
+                counts[parts[0]] = counts.get(parts[0], 0) + int(float(parts[1]))
+            elif len(parts) == 3 and parts[0] == "OBJECT":  # pre-scan: elements per object line
+                objects[parts[1]] = int(float(parts[2]))
+
+    record = {
+        "project": project,
+        "recorded": time.time(),
+        "total": sum(counts.values()),
+        "counts": dict(sorted(counts.items(), key=lambda item: -item[1])),
+    }
+    if objects:
+        record["objects"] = objects
+    stats_dir = Path(output_dir) / STATS_FOLDER_NAME
+    stats_dir.mkdir(exist_ok=True)
+    atomic_write_text(stats_dir / f"{project}-{kind}.json", json.dumps(record, indent=4))
+    return record
+
+
+def load_type_counts(output_dir, project, kind="type-counts"):
+    """Element counts per type from the project's last run, or None if never recorded."""
+    try:
+        with open(Path(output_dir) / STATS_FOLDER_NAME / f"{project}-{kind}.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def catalog_path(project, mdb, root=DEFAULT_CATALOG_ROOT):
+    """<root>/<PROJ>-<MDB>.json, the cached catalog of one project and MDB."""
+    mdb = re.sub(r"[^A-Za-z0-9_-]+", "_", mdb).strip("_") or "MDB"
+    return Path(root) / f"{project}-{mdb}.json"
+
+
+def record_catalog(catalog_file, project, mdb, root=DEFAULT_CATALOG_ROOT):
+    """
+    Stores the 'SITE|ZONE <name> <owner> <elements>' lines written by CATALOG.mac as the
+    cached catalog of the project and MDB.
+    """
+    entries = []
+    with open(catalog_file, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 4 and parts[0] in ("SITE", "ZONE"):
+                entries.append({"type": parts[0], "name": parts[1], "owner": parts[2],
+                                "elements": int(float(parts[3]))})
+
+    record = {"project": project, "mdb": mdb, "recorded": time.time(), "entries": entries}
+    path = catalog_path(project, mdb, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, json.dumps(record, indent=1))
+    return record
+
+
+def load_catalog(project, mdb, root=DEFAULT_CATALOG_ROOT):
+    """The cached catalog of the project and MDB, or None if never scanned."""
+    try:
+        with open(catalog_path(project, mdb, root), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def catalog_is_stale(catalog, ttl=CATALOG_TTL):
+    return catalog is None or time.time() - catalog.get("recorded", 0) > ttl
+
+
+def is_object_pattern(line):
+    return any(char in line for char in OBJECT_PATTERN_CHARS)
+
+
+def expand_object_patterns(objects, catalog):
+    """
+    Replaces every glob line (/U109A:*, 'T /U1*', 'EXCLUDE /U109A:Z9*') by the catalog
+    names it matches, keeping its prefix. A zone whose site matched the same pattern is
+    left out, the site already exports it. Returns (lines, patterns that matched nothing).
+    """
+    entries = catalog.get("entries", []) if catalog else []
+    lines, unmatched, seen = [], [], set()
+    for line in objects:
+        line = line.strip()
+        if not is_object_pattern(line):
+            seen.add(line)
+            lines.append(line)
+            continue
+        prefix = ""
+        for candidate in ("EXCLUDE ", "T "):
+            if line.upper().startswith(candidate):
+                prefix, line = candidate, line[len(candidate):].strip()
+                break
+        pattern = line.upper()
+        matched = set()
+        for entry in entries:
+            name = entry["name"].upper()
+            if fnmatch.fnmatchcase(name, pattern) and entry["owner"].upper() not in matched:
+                matched.add(name)
+                expanded = f"{prefix}{entry['name']}"
+                if expanded not in seen:
+                    seen.add(expanded)
+                    lines.append(expanded)
+        if not matched:
+            unmatched.append(f"{prefix}{line}")
+    return lines, unmatched
+
+
+def catalog_needs_scan(data, objects, root=DEFAULT_CATALOG_ROOT, ttl=CATALOG_TTL):
+    """True when the object list has patterns and the project's catalog is missing or stale."""
+    if not any(is_object_pattern(line) for line in objects):
+        return False
+    catalog = load_catalog(data["proj_code"], data["mdb"], root)
+    return catalog is None or catalog_is_stale(catalog, ttl)
+
+
+def resolve_object_patterns(data, objects, root=DEFAULT_CATALOG_ROOT, ttl=CATALOG_TTL):
+    """
+    Object list with its patterns expanded against the cached catalog (unchanged without
+    patterns). A missing or stale catalog is refused, so a pattern never silently misses
+    the sites and zones added since the scan.
+    """
+    if not any(is_object_pattern(line) for line in objects):
+        return objects
+    catalog = load_catalog(data["proj_code"], data["mdb"], root)
+    if catalog is None:
+        raise ValueError(f"The object list has patterns but {data['proj_code']} {data['mdb']} has no catalog "
+                         f"yet: run 'main.py catalog' first")
+    if catalog_is_stale(catalog, ttl):
+        hours = (time.time() - catalog["recorded"]) / 3600
+        raise ValueError(f"The catalog of {data['proj_code']} {data['mdb']} is {hours:.0f} h old: "
+                         f"rescan it with 'main.py catalog' before expanding patterns")
+    lines, unmatched = expand_object_patterns(objects, catalog)
+    if unmatched:
+        raise ValueError(f"No catalog entry matches: {', '.join(unmatched)}")
+    return lines
+
+
+def _replace_with_link(source, link_path):
+    """Atomically makes `link_path` a hard link to `source` (link to a temp name, then rename)."""
+    temp_path = link_path.with_name(f".{link_path.name}.{os.getpid()}.link")
+    temp_path.unlink(missing_ok=True)
+    os.link(source, temp_path)
+    os.replace(temp_path, link_path)
+
+
+def register_nwd_version(nwd_path, output_dir, project, digest=None):
+    """
+    Deduplicates a run-scoped NWD through a content-addressed store of hard links
+    (<output>/_nwd_store/<sha256>.nwd) and moves the stable <project>-latest.nwd pointer to it.
+    Byte-identical runs therefore share one copy on disk. Returns the history record.
+    """
+    nwd_path = Path(nwd_path)
+    output_dir = Path(output_dir)
+    digest = digest or file_sha256(nwd_path)
+    store = output_dir / NWD_STORE_FOLDER_NAME
+    store.mkdir(exist_ok=True)
+    stored = store / f"{digest}.nwd"
+    latest = output_dir / f"{project}-latest.nwd"
+
+    record = {
+        "run": nwd_path.name,
+        "sha256": digest,
+        "size": nwd_path.stat().st_size,
+        "published": time.time(),
+        "deduplicated": False,
+    }
+    try:
+        if not stored.exists():
+            os.link(nwd_path, stored)
+        elif not os.path.samefile(stored, nwd_path):
+            _replace_with_link(stored, nwd_path)
+            record["deduplicated"] = True
+        _replace_with_link(stored, latest)
+    except OSError as e:
+        # Shares without hard-link support still get a (copied) latest pointer
+        print(f"[PUBLISH] Hard links unavailable ({e}), copying latest NWD instead", file=sys.stderr)
+        partial = latest.with_name(latest.name + ".partial")
+        shutil.copyfile(nwd_path, partial)
+        os.replace(partial, latest)
+
+    atomic_write_text(output_dir / f"{project}-latest.json", json.dumps(record, indent=4))
+    with open(store / f"{project}-history.jsonl", 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+    prune_nwd_store(output_dir)
+    return record
+
+
+def prune_nwd_store(output_dir):
+    """Removes stored NWDs no run file or latest pointer links to any more."""
+    store = Path(output_dir) / NWD_STORE_FOLDER_NAME
+    removed = []
+    for stored in store.glob("*.nwd"):
+        try:
+            if stored.stat().st_nlink <= 1:
+                stored.unlink()
+                removed.append(stored.name)
+        except OSError:
+            continue
+    return removed
+
+
+class IntermediateArchive:
+    """
+    Compressed per-project history of TEMP.RVM / TEMP.txt, one folder per run:
+    <root>/<project>/<run_id>/TEMP.RVM.zst (or .gz) plus run.json.
+    Files are compressed and read back as streams, never fully in memory or on disk.
+    """
+
+    def __init__(self, root, project):
+        self.folder = Path(root) / project
+        self.project = project
+
+    @staticmethod
+    def codec():
+        """zstd when the optional package is installed, otherwise fast gzip."""
+        return "zst" if zstandard is not None else "gz"
+
+    def _compress(self, source, target):
+        with open(source, 'rb') as fin, open(target, 'wb') as fout:
+            if target.suffix == ".zst":
+                compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+                compressor.copy_stream(fin, fout, read_size=PUBLISH_CHUNK_SIZE)
+            else:
+                with gzip.GzipFile(fileobj=fout, mode='wb', compresslevel=1, mtime=0) as gz:
+                    shutil.copyfileobj(fin, gz, PUBLISH_CHUNK_SIZE)
+
+    def archive_run(self, files, run_id=None):
+        """
+        Compresses the given files into a new run folder and returns its run id.
+        The folder only appears under its final name once every file is complete.
+        """
+        run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        base_id, counter = run_id, 1
+        while (self.folder / run_id).exists():
+            counter += 1
+            run_id = f"{base_id}-{counter}"
+        partial = self.folder / f"{run_id}.partial"
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+        codec = self.codec()
+        meta = {"run_id": run_id, "project": self.project, "created": time.time(), "files": {}}
+        for source in map(Path, files):
+            if not source.exists():
+                continue
+            target = partial / f"{source.name}.{codec}"
+            self._compress(source, target)
+            meta["files"][source.name] = {
+                "codec": codec,
+                "original_size": source.stat().st_size,
+                "compressed_size": target.stat().st_size,
+            }
+        with open(partial / "run.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=4)
+
+        os.replace(partial, self.folder / run_id)
+        return run_id
+
+    def runs(self):
+        """Returns the metadata of all archived runs, newest first."""
+        result = []
+        if not self.folder.is_dir():
+            return result
+        for run_dir in self.folder.iterdir():
+            meta_path = run_dir / "run.json"
+            if run_dir.is_dir() and meta_path.exists():
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta["size"] = sum(info["compressed_size"] for info in meta["files"].values())
+                result.append(meta)
+        return sorted(result, key=lambda meta: meta["run_id"], reverse=True)
+
+    def enforce(self, keep_runs, max_total_mb, max_age_days, now=None):
+        """
+        Evicts runs beyond the count, age and size limits (the newest run is always kept).
+        Returns the evicted run ids.
+        """
+        now = now or time.time()
+        runs = self.runs()
+        evicted = []
+        total = 0
+        for index, meta in enumerate(runs):
+            too_old = (now - meta["created"]) > max_age_days * 86400
+            over_quota = total + meta["size"] > max_total_mb * 1024 * 1024
+            if index > 0 and (index >= keep_runs or too_old or over_quota):
+                evicted.append(meta["run_id"])
+            else:
+                total += meta["size"]
+
+        for run_id in evicted:
+            shutil.rmtree(self.folder / run_id, ignore_errors=True)
+        return evicted
+
+    def open(self, run_id, name, text=False):
+        """Opens an archived file as a decompressing stream (binary, or text if requested)."""
+        run_dir = self.folder / run_id
+        with open(run_dir / "run.json", 'r', encoding='utf-8') as f:
+            info = json.load(f)["files"][name]
+
+        path = run_dir / f"{name}.{info['codec']}"
+        if info["codec"] == "zst":
+            if zstandard is None:
+                raise RuntimeError("Archive was written with zstd; install the 'zstandard' package to read it")
+            stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        else:
+            stream = gzip.open(path, 'rb')
+        return io.TextIOWrapper(stream, encoding='utf-8', errors='replace') if text else stream
+
+
+def _reverse_lines(path, block_size=64 * 1024):
+    """Yields the lines of a file from last to first, reading it backwards in blocks."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        tail = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines.pop(0)  # may continue in the previous block
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', 'replace')
+        if tail.strip():
+            yield tail.decode('utf-8', 'replace')
+
+
+class RunLog:
+    """
+    Structured per-run event log: <output>/_runlogs/<project>/<run_id>.jsonl, one JSON
+    event per line with wall time (ts), seconds since the run started on a monotonic
+    clock (t), stage, object and shard. Old runs are rotated out by count, age and size.
+    """
+
+    def __init__(self, output_dir, project):
+        self.project = project
+        self.folder = Path(output_dir) / RUNLOG_FOLDER_NAME / project
+
+    def runs(self):
+        """Run log files, newest first."""
+        if not self.folder.exists():
+            return []
+        def order(path):
+            date, clock, *suffix = path.stem.split("-")
+            return date, clock, int(suffix[0]) if suffix else 1
+        return sorted(self.folder.glob("*.jsonl"), key=order, reverse=True)
+
+    def start(self, shard=None):
+        """Creates the log of a new run and returns a writer for it."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        run_id = time.strftime("%Y%m%d-%H%M%S")
+        path = self.folder / f"{run_id}.jsonl"
+        suffix = 2
+        while path.exists():
+            path = self.folder / f"{run_id}-{suffix}.jsonl"
+            suffix += 1
+        return RunLogWriter(path, path.stem, shard)
+
+    def append(self, stage, **fields):
+        """Adds an event to the newest run (e.g. 'published' from the publish step)."""
+        runs = self.runs()
+        if not runs:
+            return
+        event = {"ts": time.time(), "run": runs[0].stem, "stage": stage, **fields}
+        with open(runs[0], 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + "\n")
+
+    def enforce(self, keep_runs, max_total_mb, max_age_days, now=None):
+        """Deletes run logs beyond the count, age and size limits (the newest is kept). Returns their names."""
+        now = now or time.time()
+        evicted, total = [], 0
+        for index, path in enumerate(self.runs()):
+            stat = path.stat()
+            too_old = (now - stat.st_mtime) > max_age_days * 86400
+            over_quota = total + stat.st_size > max_total_mb * 1024 * 1024
+            if index > 0 and (index >= keep_runs or too_old or over_quota):
+                path.unlink(missing_ok=True)
+                evicted.append(path.stem)
+            else:
+                total += stat.st_size
+        return evicted
+
+    def tail(self, count):
+        """The newest `count` events across runs, oldest first. Memory is bounded by `count`."""
+        events = []
+        for path in self.runs():
+            for line in _reverse_lines(path):
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    continue  # a line being written right now
+                if len(events) >= count:
+                    return events[::-1]
+        return events[::-1]
+
+
+class RunLogWriter:
+    """Appends events to one run log; each event is flushed so readers see it immediately."""
+
+    def __init__(self, path, run_id, shard=None):
+        self.path = path
+        self.run_id = run_id
+        self.shard = shard
+        self._start = time.monotonic()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def event(self, stage, obj=None, message=None, **fields):
+        event = {"ts": round(time.time(), 3), "t": round(time.monotonic() - self._start, 3),
+                 "run": self.run_id, "stage": stage}
+        if self.shard:
+            event["shard"] = self.shard
+        if obj:
+            event["object"] = obj
+        if message:
+            event["message"] = message
+        event.update(fields)
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()
+        return event
+
+    def close(self):
+        self._file.close()
+
+
+def parse_rvm_log_line(line):
+    """Maps an RVM_LOG.txt line to (stage, object, message)."""
+    line = line.strip()
+    for prefix, stage in RVM_LOG_STAGES:
+        if line.startswith(prefix):
+            value = line[len(prefix):].strip()
+            if stage in ("export", "convert"):
+                return stage, value, None
+            return stage, None, value or None
+    return "log", None, line
+
+
+def follow_rvm_log(log_path, writer, timeout=24 * 3600, appear_timeout=600, poll=RUNLOG_POLL_SECONDS):
+    """
+    Tails RVM_LOG.txt while the macro runs and writes every line as a structured event,
+    timestamped when it appears. Returns when '[RVM] Finished' is read or on timeout.
+    """
+    log_path = Path(log_path)
+    deadline = time.monotonic() + appear_timeout
+    while not log_path.exists():
+        if time.monotonic() > deadline:
+            writer.event("error", message=f"{log_path.name} did not appear")
+            return False
+        time.sleep(poll)
+
+    writer.event("started", message=str(log_path))
+    deadline = time.monotonic() + timeout
+    position, pending = 0, b""
+    while time.monotonic() < deadline:
+        try:
+            with open(log_path, 'rb') as f:
+                f.seek(position)
+                chunk = f.read()
+        except OSError:
+            chunk = b""  # locked by the writer for a moment
+        if chunk:
+            position += len(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for raw in lines:
+                if not raw.strip():
+                    continue
+                stage, obj, message = parse_rvm_log_line(raw.decode('utf-8', 'replace'))
+                writer.event(stage, obj, message)
+                if stage == "finished":
+                    return True
+        else:
+            time.sleep(poll)
+    writer.event("error", message="timed out waiting for the macro to finish")
+    return False
+
+
+def measured_object_costs(output_dir, project, runs=PLAN_HISTORY_RUNS):
+    """
+    Export seconds per object from the run logs: the time from an object's 'export'
+    event to the next event of the run, median over the newest runs. Runs of split
+    exports (<project>-<part>) count as well. Returns {object name: seconds}.
+    """
+    root = Path(output_dir) / RUNLOG_FOLDER_NAME
+    if not root.is_dir():
+        return {}
+    samples = {}
+    for folder in root.iterdir():
+        if folder.name != project and not folder.name.startswith(f"{project}-"):
+            continue
+        for path in RunLog(output_dir, folder.name).runs()[:runs]:
+            previous = None
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "t" not in event:
+                        continue
+                    if previous:
+                        samples.setdefault(previous[0], []).append(event["t"] - previous[1])
+                    previous = None
+                    if event["stage"] == "export" and event.get("object"):
+                        previous = (_object_key(event["object"]), event["t"])
+    return {key: statistics.median(values) for key, values in samples.items()}
+
+
+def object_costs(output_dir, project):
+    """
+    Cost of each object for the shard planner. Measured timings win; objects only known
+    from a pre-scan are converted to seconds with the seconds per element of the objects
+    that have both. Returns (costs, unit); unit is 'elements' when nothing was timed yet.
+    """
+    timings = measured_object_costs(output_dir, project)
+    prescan = load_type_counts(output_dir, project, "prescan-counts") or {}
+    counts = {_object_key(name): count for name, count in prescan.get("objects", {}).items()}
+    if not timings:
+        return counts, "elements"
+    both = [key for key in counts if key in timings and counts[key]]
+    if both:
+        rate = sum(timings[key] for key in both) / sum(counts[key] for key in both)
+        for key, count in counts.items():
+            timings.setdefault(key, count * rate)
+    return timings, "s"
+
+
+def record_run_stats(output_dir, project, elements, work_folder, nwd_path=None, mode=DEFAULT_EXPORT_MODE,
+                     single_pass=False):
+    """
+    Appends the duration and file sizes of a finished run to _stats/<project>-runs.jsonl,
+    the history the ExportEstimator is fitted on. Called by record-counts while the
+    intermediates still exist; the duration comes from the run log's 'finished' event.
+    """
+    work_folder = Path(work_folder)
+
+    def size(*patterns):
+        paths = [path for pattern in patterns for path in work_folder.glob(pattern)]
+        return sum(path.stat().st_size for path in paths) if paths else None
+
+    runlog = RunLog(output_dir, project)
+    runs = runlog.runs()
+    finished = [event for event in runlog.tail(50)
+                if event["stage"] == "finished" and runs and event["run"] == runs[0].stem]
+    record = {
+        "recorded": time.time(),
+        "project": project,
+        "mode": mode,
+        "elements": elements,
+        "duration_s": round(finished[-1]["t"], 1) if finished and "t" in finished[-1] else None,
+        "rvm_bytes": size("TEMP.RVM", "TEMP-*.RVM"),
+        "attributes_bytes": size("TEMP.txt"),
+        "nwd_bytes": Path(nwd_path).stat().st_size if nwd_path and Path(nwd_path).exists() else None,
+    }
+    if single_pass:
+        record["single_pass"] = True
+    stats_dir = Path(output_dir) / STATS_FOLDER_NAME
+    stats_dir.mkdir(exist_ok=True)
+    with open(stats_dir / f"{project}{RUN_HISTORY_SUFFIX}", 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+    return record
+
+
+# Parsed run history files by path: ((mtime_ns, size), records). The GUI estimates on
+# every project change; unchanged files are not parsed again.
+_run_history_cache = {}
+
+
+def _read_run_history(path):
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _run_history_cache.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # a line cut short by a crash
+    _run_history_cache[path] = (version, records)
+    return records
+
+
+def load_run_history(output_dir):
+    """All recorded runs of all projects in the output folder, oldest first."""
+    history = []
+    for path in (Path(output_dir) / STATS_FOLDER_NAME).glob(f"*{RUN_HISTORY_SUFFIX}"):
+        try:
+            history += _read_run_history(path)
+        except OSError:
+            continue
+    return sorted(history, key=lambda record: record.get("recorded", 0))
+
+
+def single_pass_report(output_dir, project):
+    """
+    Compares the recorded 'both' runs of a project with and without single pass: run
+    count and median seconds per 1000 elements of each, and the single-pass speed-up.
+    """
+    history = [record for record in load_run_history(output_dir)
+               if record.get("project") == project and record.get("mode", DEFAULT_EXPORT_MODE) == "both"
+               and record.get("duration_s") and record.get("elements")]
+    report = {"project": project}
+    for key, single_pass in (("two_pass", False), ("single_pass", True)):
+        rates = [record["duration_s"] * 1000 / record["elements"] for record in history
+                 if bool(record.get("single_pass")) == single_pass]
+        report[key] = {"runs": len(rates), "s_per_1000": round(statistics.median(rates), 2) if rates else None}
+    two, one = report["two_pass"]["s_per_1000"], report["single_pass"]["s_per_1000"]
+    report["speedup"] = round(two / one, 2) if two and one else None
+    return report
+
+
+def _fit_line(points):
+    """
+    Least-squares y = a + b * x; a ratio through the origin when the x values do not
+    vary (or the slope comes out negative). Returns (a, b) or None without data.
+    """
+    if not points:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x > 0:
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+        if slope >= 0:
+            return mean_y - slope * mean_x, slope
+    return (0.0, mean_y / mean_x) if mean_x > 0 else (mean_y, 0.0)
+
+
+class ExportEstimator:
+    """
+    Predicts export duration, RVM size, attribute dump size and NWD size from an element
+    count. Each target is fitted on the project's own runs once it has ESTIMATE_MIN_RUNS,
+    otherwise on the runs of every project in the output folder. The error bars are the
+    spread of the leave-one-out relative errors over those runs, i.e. how wrong the same
+    fit would have been on each past run.
+    """
+
+    def __init__(self, output_dir, history=None):
+        self.output_dir = Path(output_dir)
+        self.history = load_run_history(output_dir) if history is None else history
+
+    def elements(self, project):
+        """Element count to predict with: the newest of the pre-scan and the last run counts."""
+        records = [load_type_counts(self.output_dir, project, kind) for kind in ("prescan-counts", "type-counts")]
+        records = [record for record in records if record]
+        return max(records, key=lambda record: record["recorded"])["total"] if records else None
+
+    def estimate(self, project, elements=None, mode=DEFAULT_EXPORT_MODE):
+        """
+        Returns {"project", "elements", "targets": {target: {"value", "low", "high", "runs", "basis"}}}.
+        low/high are None until at least two runs are known; missing targets have no history.
+        Only runs of the same export mode are used (runs recorded before modes count as 'both').
+        """
+        if elements is None:
+            elements = self.elements(project)
+        result = {"project": project, "mode": mode, "elements": elements, "targets": {}}
+        if elements is None:
+            return result
+
+        history = [r for r in self.history if r.get("mode", DEFAULT_EXPORT_MODE) == mode]
+        for target in ESTIMATE_TARGETS:
+            basis = "project"
+            points = [(r["elements"], r[target]) for r in history
+                      if r.get("project") == project and r.get(target) is not None and r.get("elements")]
+            if len(points) < ESTIMATE_MIN_RUNS:
+                basis = "pooled"
+                points = [(r["elements"], r[target]) for r in history
+                          if r.get(target) is not None and r.get("elements")]
+            fit = _fit_line(points)
+            if fit is None:
+                continue
+            value = max(0.0, fit[0] + fit[1] * elements)
+            low = high = None
+            errors = []
+            for index, (x, y) in enumerate(points):
+                others = _fit_line(points[:index] + points[index + 1:])
+                predicted = others[0] + others[1] * x if others else 0
+                if predicted > 0:
+                    errors.append((y - predicted) / predicted)
+            if errors:
+                spread = ESTIMATE_Z * (sum(error * error for error in errors) / len(errors)) ** 0.5
+                low, high = value * max(0.0, 1 - spread), value * (1 + spread)
+            result["targets"][target] = {"value": value, "low": low, "high": high,
+                                         "runs": len(points), "basis": basis}
+        return result
+
+
+def fit_in_window(estimates, window_seconds):
+    """
+    Checks whether sequential exports fit in a time window. Error bars of independent
+    runs add in quadrature. Returns (total, high, verdict) with verdict 'fits',
+    'tight' (only the estimate fits) or 'too long'; total is None without history.
+    """
+    durations = [estimate["targets"].get("duration_s") for estimate in estimates]
+    if not durations or None in durations:
+        return None, None, "unknown"
+    total = sum(duration["value"] for duration in durations)
+    high = total + sum(((duration["high"] or duration["value"]) - duration["value"]) ** 2
+                       for duration in durations) ** 0.5
+    if high <= window_seconds:
+        return total, high, "fits"
+    return total, high, "tight" if total <= window_seconds else "too long"
+
+
+class ArtifactManifest:
+    """
+    Remembers the hash of every generated artifact in the output folder.
+    The artifacts are rendered purely from the export inputs (settings, object list
+    and templates), so an unchanged hash means unchanged inputs and the write is skipped.
+    The hash is taken over the rendered text on purpose rather than over the inputs:
+    rendering is cheap next to an E3D run, and a template changed by a new tool
+    version then counts as a change, which a hash of the inputs alone would miss.
+    """
+
+    def __init__(self, output_dir):
+        self.path = Path(output_dir) / MANIFEST_FILE_NAME
+        self.entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("artifacts", {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, name, digest):
+        """True if the artifact on disk was written from the same inputs."""
+        entry = self.entries.get(name)
+        if not entry or entry.get("sha256") != digest:
+            return False
+        # The batch file deletes its artifacts after a successful run
+        try:
+            return (self.path.parent / name).stat().st_size == entry.get("size")
+        except OSError:
+            return False
+
+    def write_if_changed(self, name, content):
+        """Writes the artifact atomically unless it is up to date. Returns True if written."""
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if self.is_current(name, digest):
+            return False
+
+        target = self.path.parent / name
+        atomic_write_text(target, content)
+        self.entries[name] = {"sha256": digest, "size": target.stat().st_size}
+        self._dirty = True
+        return True
+
+    def discard(self, name):
+        """Removes an artifact the current inputs no longer produce. Returns True if anything was removed."""
+        removed = self.entries.pop(name, None) is not None
+        try:
+            (self.path.parent / name).unlink()
+            removed = True
+        except OSError:
+            pass
+        self._dirty = self._dirty or removed
+        return removed
+
+    def save(self):
+        """Persists the manifest if any artifact was rewritten."""
+        if self._dirty:
+            atomic_write_text(self.path, json.dumps({"version": 1, "artifacts": self.entries}, indent=4))
+            self._dirty = False
+
+
+class ExportGenerator:
+    """
+    Builds the export artifacts (settings.json, RVM.mac, attribute.mac, RunE3D.bat)
+    for one project. It has no GUI dependencies so it can be reused outside AppGUI.
+    """
+
+    def __init__(self, data, objects):
+        self.data = data
+        self.quality = quality_profile(data)
+        self.objects = quality_objects(resolve_object_patterns(data, objects), self.quality)
+        self.part = data.get("part")
+
+    @property
+    def project_name(self):
+        """<PROJ>, or <PROJ>-<label> for a labelled quality profile (e.g. PREVIEW)."""
+        return quality_project(self.data)
+
+    @property
+    def run_project(self):
+        """Name the NWD, its latest pointer and the run statistics are filed under."""
+        return f"{self.project_name}-{self.part}" if self.part else self.project_name
+
+    @property
+    def nwd_prefix(self):
+        """PML start of the NWD names: the run project with E3D's own project code."""
+        return "$!PROJ" + self.run_project[len(self.data["proj_code"]):] + "-"
+
+    @property
+    def macro_folder(self):
+        """Folder holding the generated macros: the output folder, or its part subfolder."""
+        if self.data.get("macro_folder"):
+            return self.data["macro_folder"]  # e.g. a worker's local job folder
+        return f"{self.data['output_folder']}/{self.part}" if self.part else self.data["output_folder"]
+
+    @property
+    def work_folder(self):
+        """Folder for TEMP.RVM, TEMP.txt, the log and the NWD: local scratch when staging."""
+        scratch = self.data.get("scratch_folder")
+        if scratch:
+            folder = f"{scratch.rstrip('/')}/{self.data['proj_code']}"
+        else:
+            folder = self.data["output_folder"]
+        return f"{folder}/{self.part}" if self.part else folder
+
+    @property
+    def mode(self):
+        """What the run produces: 'both', 'geometry' (no attribute dump) or 'attributes' (no RVM/NWD)."""
+        return export_mode(self.data)
+
+    @property
+    def single_pass(self):
+        """Attributes are dumped during the geometry export instead of by attribute.mac first."""
+        return bool(self.data.get("single_pass")) and self.mode == "both"
+
+    @property
+    def warm(self):
+        """Runs in a warm session (warm.py) instead of its own E3D; parts keep their parallel sessions."""
+        return bool(self.data.get("warm_session")) and not self.part
+
+    def _launch_block(self, rvm_mac_path, log_file_path):
+        """Batch lines that start E3D on RVM.mac, or hand it to the warm session."""
+        data = self.data
+        if self.warm:
+            tool_command = _tool_command()
+            settings_json_path = os.path.join(os.path.dirname(rvm_mac_path), "settings.json")
+            return f"""echo [INFO] Submitting RVM.mac to the warm E3D session...
+    {tool_command} warm-submit "{settings_json_path}" "{rvm_mac_path}" --log "{log_file_path}"
+    if errorlevel 1 (
+        echo [ERROR] Could not submit to the warm E3D session
+        exit /b 1
+    )"""
+        return _mon_launch(data, rvm_mac_path)
+
+    @property
+    def nwd_folder(self):
+        """Folder Roamer writes the NWD to; without staging parts write straight to the output folder."""
+        return self.work_folder if self.data.get("scratch_folder") else self.data["output_folder"]
+
+    def generate(self, output_dir):
+        """
+        Writes every artifact whose inputs changed since the last generation.
+        Returns (written, unchanged) lists of artifact names.
+        """
+        manifest = ArtifactManifest(output_dir)
+        artifacts = {
+            "settings.json": self._generate_settings_json(),
+            "RVM.mac": self._generate_rvm_mac(),
+            "attribute.mac": self._generate_attribute_mac(),
+            "RunE3D.bat": self._generate_run_bat(),
+        }
+        if self.single_pass or self.mode == "geometry":
+            # A stale attribute.mac from an earlier mode would otherwise linger in the folder
+            del artifacts["attribute.mac"]
+            manifest.discard("attribute.mac")
+
+        written, unchanged = [], []
+        for name, content in artifacts.items():
+            if manifest.write_if_changed(name, content):
+                written.append(name)
+            else:
+                unchanged.append(name)
+        manifest.save()
+        return written, unchanged
+
+    def _generate_settings_json(self):
+        """Generates the settings.json content."""
+        data = self.data
+        # Create a dictionary with only the keys needed for the JSON file
+        json_data = {
+            "aveva_path": data["aveva_path"],
+            "proj_code": data["proj_code"],
+            "user": data["user"],
+            "password": data["password"],
+            "mdb": data["mdb"],
+            "output_folder": data["output_folder"],
+            "scratch_folder": data.get("scratch_folder", ""),
+            "warm_session": data.get("warm_session", ""),
+            "roamer_path": data["roamer_path"],
+            "areas_file": data["areas_file"],
+            "export_attribute": data["export_attribute"],
+            "export_mode": export_mode(data),
+            "schedules": data.get("schedules", {}),
+            "attribute_profile": data.get("attribute_profile", DEFAULT_ATTRIBUTE_PROFILE),
+            "quality_profile": data.get("quality_profile", DEFAULT_QUALITY_PROFILE),
+            "collect_types": data.get("collect_types") or DEFAULT_COLLECT_TYPES,
+            "tile_types": data.get("tile_types") or DEFAULT_TILE_TYPES,
+            "keep_intermediates": data.get("keep_intermediates", False),
+            "single_pass": data.get("single_pass", False),
+            "retention": data.get("retention", RETENTION_DEFAULTS),
+            "daily_export": data["daily_export"],
+            "export_time": data["export_time"],
+        }
+        return json.dumps(json_data, indent=4)
+
+    def _generate_rvm_mac(self):
+        """Generates the RVM.mac content."""
+        data = self.data
+        work_folder = self.work_folder
+        log_file_path = f"{work_folder}/RVM_LOG.txt".replace("/", "\\")
+        attribute_mac_path = f"{self.macro_folder}/attribute.mac"
+        nwd_folder = self.nwd_folder
+        nwd_prefix = self.nwd_prefix
+        temp_rvm_path = f"{work_folder}/TEMP.RVM"
+
+        export_commands = self._export_commands(log_file_path)
+        attributes_start = f"""SYSCOM |echo [RVM] Start attribute.mac >> {log_file_path}|
+$M {attribute_mac_path}
+"""
+        attributes_end = ""
+        if self.single_pass:
+            attributes_start, export_commands, attributes_end = self._single_pass_blocks(log_file_path)
+        elif self.mode == "geometry":
+            attributes_start = ""
+
+        # A warm session is already in DESIGN and must stay open after the job
+        design, finish = ("", "") if self.warm else ("DESIGN\n", "FINISH\n")
+
+        if self.mode == "attributes":
+            return f"""
+{design}
+{attributes_start}
+SYSCOM |echo [RVM] Finished >> {log_file_path}|
+{finish}"""
+
+        content = f"""
+{design}
+{attributes_start}
+{PML_RUN_STAMP}
+$* Run-scoped name, so a second run on the same day does not overwrite the first
+!FILNAME = '{nwd_folder}/' + '{nwd_prefix}' + !CUDATE.YEAR().STRING()+ '-' + !MONTH + '-' + !DAY + '-' + !HOUR + !MINUTE + !SECOND + '.nwd'
+SYSCOM |echo [RVM] NWD_OUT=$!FILNAME >> {log_file_path}|
+
+SYSCOM |echo [RVM] Exporting RVM file... >> {log_file_path}|
+EXPORT FILE /{temp_rvm_path} OVER
+{pml_export_options(self.quality)}{export_commands}
+EXPORT FINISH
+{attributes_end}
+SYSCOM |echo [RVM] Launching Navisworks... >> {log_file_path}|
+SYSCOM |""{data['roamer_path']}" -nwd $!FILNAME "{temp_rvm_path}"|
+
+SYSCOM |echo [RVM] Finished >> {log_file_path}|
+{finish}"""
+        return content
+
+    def _export_commands(self, log_file_path):
+        """The EXPORT commands of RVM.mac, one per object line."""
+        return "\n".join(
+            f"SYSCOM |echo [RVM] Export {obj} >> {log_file_path}|\nEXPORT {obj}" for obj in self.objects
+        )
+
+    def _single_pass_blocks(self, log_file_path):
+        """
+        RVM.mac pieces that dump the attributes inside the geometry export: attribute.mac's
+        dump (the same single COLLECT over the object list, walked in the same order, so
+        TEMP.txt is identical) runs inline right before EXPORT FILE, and the export then
+        reads the parts of the MDB the walk has just loaded.
+        """
+        start = f"""SYSCOM |echo [RVM] Start single pass >> {log_file_path}|
+{self._attribute_dump().strip()}
+!!fmsys.setProgress( 0 )
+"""
+        return start, self._export_commands(log_file_path), ""
+
+    def attribute_profile(self):
+        """Returns the attribute profile selected for this export."""
+        name = self.data.get("attribute_profile") or DEFAULT_ATTRIBUTE_PROFILE
+        profiles = load_attribute_profiles()
+        if name not in profiles:
+            raise ValueError(f"Unknown attribute profile '{name}'")
+        return profiles[name]
+
+    @staticmethod
+    def _ignore_string(names):
+        """PML match string for a blacklist, e.g. ',NAME,OWNER,'."""
+        return "," + "".join(f"{name.upper()}," for name in names)
+
+    @staticmethod
+    def _append_lines(names):
+        return "\n".join(f"var !ATTL append |{name}|" for name in names)
+
+    def _attribute_list_block(self, profile, default_ignore):
+        """PML IF/ELSEIF chain filling !ATTL with each element type's attributes."""
+        types = profile.get("types", {})
+        # Per-type blacklists swap the ignore string, so every attlist branch must set it
+        set_ignore = any("exclude" in rule for rule in types.values())
+
+        def rule_lines(rule, ignore):
+            if rule.get("include") is not None:
+                return self._append_lines(rule["include"])
+            lines = "var !ATTL attlist"
+            if set_ignore:
+                lines += f"\nvar !IGNORE |{ignore}|"
+            return lines
+
+        branches = []
+        for index, (element_type, rule) in enumerate(types.items()):
+            keyword = "IF" if index == 0 else "ELSEIF"
+            ignore = self._ignore_string(rule.get("exclude", [])) if "exclude" in rule else default_ignore
+            branches.append(f"{keyword} (TYPE eq |{element_type}|) THEN\n{rule_lines(rule, ignore)}")
+
+        default_lines = rule_lines(profile.get("default", {}), default_ignore)
+        if not branches:
+            return default_lines
+        return "\n".join(branches) + f"\nELSE\n{default_lines}\nENDIF"
+
+    def _branch_extras_block(self, profile):
+        """PML block adding computed attributes to components owned by a branch."""
+        extras = profile.get("branch_extras", [])
+        by_type = profile.get("branch_extras_by_type", {})
+        if not extras and not by_type:
+            return "$* No branch component extras in this profile"
+
+        # Types sharing the same extras are tested together
+        groups = {}
+        for element_type, names in by_type.items():
+            groups.setdefault(tuple(names), []).append(element_type)
+        type_blocks = []
+        for names, element_types in groups.items():
+            condition = " or ".join(f"(type eq |{element_type}|)" for element_type in element_types)
+            type_blocks.append(f"if{condition}then\n{self._append_lines(names)}\nendif")
+
+        body = "\n".join(filter(None, [self._append_lines(extras)] + type_blocks))
+        return f"""$* Check it item is owned by a branch
+if(TYPE neq |WORL|) then
+if(TYPE of OWNER eq |BRAN| and NOT BADREF(SPREF)) then
+if (TYPE neq |TUBI|) then
+{body}
+endif
+endif
+endif"""
+
+    def _attribute_walk(self):
+        """
+        PML pieces of the attribute dump: (setup, element, closing). 'element' writes the
+        current element !COLL[!INDX] to TEMP.txt; the setup opens the file and the closing
+        writes the last ENDs and the type counts.
+        """
+        data = self.data
+        temp_txt_path = f"{self.work_folder}/TEMP.txt"
+        counts_path = f"{self.work_folder}/{TYPE_COUNTS_FILE_NAME}"
+        collect_types = " ".join(data.get("collect_types") or DEFAULT_COLLECT_TYPES)
+
+        # Only the attributes selected by the project's profile are evaluated
+        profile = self.attribute_profile()
+        default_ignore = self._ignore_string(profile.get("default", {}).get("exclude", []))
+        attribute_list_block = self._attribute_list_block(profile, default_ignore)
+        branch_extras_block = self._branch_extras_block(profile)
+        label_block = "\n".join(
+            f"var !new REPLACE (|{'$!ATTR$n' if index == 0 else '$!new$n'}|,|{source}|,|{label}|)"
+            for index, (source, label) in enumerate(ATTRIBUTE_LABELS.items()))
+
+        setup = f"""onerror continue
+$:debug$:
+$* modificato 12-04-2022
+$* Initialise Variables
+var !FILE |{temp_txt_path}|
+var !DILM |:=|
+var !SEPR |&end&|
+var !IGNORE |{default_ignore}|
+var !AIGNORE |,unset,=0/0,nulref,|
+var !ODEPTH DDEPTH
+var !PDEPTH -99
+var !REFE REFE
+var !count 1
+
+$* Open file
+openfile /$!FILE write !FUNIT
+handle ANY
+openfile /$!FILE overwrite !FUNIT
+endhandle
+
+$* Write Header
+var !DATE clock date
+var !TIME clock time
+writefile $!FUNIT |CADC_Attributes_File v1.0 , start: NEW , end: END , name_end: $!DILM , sep: $!SEPR|
+writefile $!FUNIT |NEW Header Information|
+
+var !DPRT compose | Source$!DILM PDMS Data $!SEPR Date$!DILM $!DATE$n $!SEPR Time$!DILM $!TIME|
+writefile $!FUNIT |$!DPRT[1]|
+var !MDB MDB
+var !PROJECT PROJECT CODE
+var !NAME (FULLNAME)
+var !DPRT compose | Project$!DILM $!PROJECT $!SEPR MDB$!DILM $!MDB $!SEPR |
+writefile $!FUNIT |$!DPRT[1]|
+writefile $!FUNIT |END|
+
+!list = '{collect_types}'
+
+$* Element counts per type, written to {TYPE_COUNTS_FILE_NAME} after the loop
+!SEEN = ARRAY()
+!TCOUNT = ARRAY()
+"""
+        element = f"""$!COLL[$!INDX]
+
+$* Hierarchy level
+var !DEPTH DDEPTH
+var !TAB $!DEPTH * 2 - $!ODEPTH * 2
+var !ITAB $!TAB + 2
+
+$* End(s)
+if($!DEPTH eq $!PDEPTH and $!PDEPTH neq -99) then
+var !DPRT compose space $!TAB |END|
+writefile $!FUNIT |$!DPRT[1]|
+elseif ($!DEPTH lt $!PDEPTH) then
+
+do !INDXA from $!PDEPTH to $!DEPTH by -1
+var !DPRT compose space $!INDXA |END|
+writefile $!FUNIT |$!DPRT[1]|
+enddo
+endif
+
+var !PDEPTH $!DEPTH
+
+{PML_COUNT_TYPE}
+$* Attributes of element  (this is new)
+var !ATTL delete
+{attribute_list_block}
+
+-- initialise progress and interrupt system
+!progress = 0
+!progStep = 5 $* % progress report step
+$*!this.enableInterrupt()
+
+$*onerror golabel /interrupted
+{branch_extras_block}
+
+$* Get name
+var !NAME (FULLNAME)
+if (TYPE eq |TUBI|) then
+var !nametube coll all tubi for owne
+!countTubi = !nametube.FindFirst(!COLL[$!INDX])
+var !NAME NAME OF BRANCH
+var !DPRT compose space $!TAB |NEW TUBE $!countTubi of BRANCH $!NAME|
+else
+var !DPRT compose space $!TAB |NEW $!NAME|
+endif
+writefile $!FUNIT |$!DPRT[1]|
+var !ASIZE (arraywidth(!ATTL)) + 3
+
+$* Loop through attribute array
+do !ATTR values !ATTL
+
+skip if(match(|$!IGNORE|,|,$!ATTR$n,|) gt 0)
+var !ATTRIB (ATTRIB $!ATTR)
+handle ANY
+
+var !ATTRIB $!ATTR
+$* replased text to have the best readible in Navis (this is new)
+endhandle
+var !ATTRIB (trim(|$!ATTRIB|))
+if(|$!ATTRIB| neq || and match(|$!AIGNORE|,|,$!ATTRIB$n,|) eq 0) then
+{label_block}
+if(|$!new$n| eq |Length|)then
+var !ATTRIB $!ATTRIB
+var !ATTRIB STRING ( $!ATTRIB, 'D2' )
+var !ATTRIB |$!ATTRIB mm.|
+endif
+
+var !DPRT compose space $!ITAB |$!new$!DILM| width $!ASIZE R space 2 |$!ATTRIB|
+
+!size = !COLL.size()
+-- Update progress if required
+!percentDone = int( (!INDX * 100 ) / $!size )
+--$P index = $!indx, %done is $!percentDone, step $!progStep%
+if( !percentDone - !progress ge !progStep ) then
+!progress = !percentDone
+--$P $!progress%
+!!fmsys.setProgress( !progress )
+endif
+
+writefile $!FUNIT |$!DPRT[1]|
+endif
+enddo
+"""
+        closing = f"""if($!DEPTH gt $!ODEPTH) then
+do !INDXA from $!DEPTH to $!ODEPTH by -1
+var !TAB $!INDXA * 2 - $!ODEPTH * 2
+var !DPRT compose space $!TAB |END|
+writefile $!FUNIT |$!DPRT[1]|
+enddo
+endif
+
+$!REFE
+
+closefile $!FUNIT
+
+$* Write element counts per type
+var !CFILE |{counts_path}|
+openfile /$!CFILE overwrite !CUNIT
+do !TIDX indices !SEEN
+var !CLINE (!SEEN[!TIDX] & ' ' & !TCOUNT[!TIDX].String())
+writefile $!CUNIT |$!CLINE|
+enddo
+closefile $!CUNIT
+"""
+        return setup, element, closing
+
+    def _attribute_dump(self):
+        """The attribute dump: one COLLECT over the object list, walked in order into TEMP.txt."""
+        setup, element, closing = self._attribute_walk()
+
+        # Join the object list into a space-separated string for the 'collect all' command
+        objects_string = " ".join(self.objects)
+
+        return f"""
+{setup}
+$* Get element
+Var !COLL collect all ($!list) for {objects_string}
+
+$* Loop through the list of elements
+do !INDX indices !COLL
+
+{element}
+enddo
+
+{closing}"""
+
+    def _generate_attribute_mac(self):
+        """Generates the attribute.mac content."""
+        content = f"""{self._attribute_dump()}
+$* Hide the from
+$* hide _CDXATTDUMP
+!!fmsys.setProgress( 0 )
+$P finish
+return $* >>>>>>>>>> End of Code DesignReview <<<<<<<<<<
+$.
+"""
+        return content.strip()
+
+    def _generate_run_bat(self):
+        """
+        Generates the RunE3D.bat content using the user-provided advanced template.
+        This version tracks macro progress and waits for the NWD file.
+        After successful completion, it deletes all generated files permanently (except RVM_LOG.txt).
+        In staging mode the NWD is then published from scratch to the output folder in the background.
+        """
+        data = self.data
+
+        # Ensure paths are correctly formatted for the batch script (using backslashes)
+        output_folder_bat = data["output_folder"].replace("/", "\\")
+        work_folder_bat = self.work_folder.replace("/", "\\")
+        macro_folder_bat = self.macro_folder.replace("/", "\\")
+        run_project = self.run_project
+
+        log_file_path = os.path.join(work_folder_bat, "RVM_LOG.txt")
+        rvm_mac_path = os.path.join(macro_folder_bat, "RVM.mac")
+
+        # Paths for the files to be deleted after completion (in reverse order)
+        settings_json_path = os.path.join(macro_folder_bat, "settings.json")
+        rvm_mac_delete_path = rvm_mac_path
+        attribute_mac_path = os.path.join(macro_folder_bat, "attribute.mac")
+        temp_txt_path = os.path.join(work_folder_bat, "TEMP.txt")
+        temp_rvm_path = os.path.join(work_folder_bat, "TEMP.RVM")
+
+        tool_command = _tool_command()
+        counts_path = os.path.join(work_folder_bat, TYPE_COUNTS_FILE_NAME)
+        shard_option = f" --shard {self.part}" if self.part else ""
+        mode = self.mode
+        mode_option = f" --mode {mode}" if mode != DEFAULT_EXPORT_MODE else ""
+        mode_option += " --single-pass" if self.single_pass else ""
+
+        # Intermediates are either deleted or compressed into the per-project archive
+        if mode == "attributes":
+            # The dump is the product of an attribute-only run
+            dump_path = os.path.join(output_folder_bat, f"{run_project}{ATTRIBUTES_DUMP_SUFFIX}")
+            intermediates_block = f"""    echo [INFO] Publishing the attribute dump...
+    move /y "{temp_txt_path}" "{dump_path}" >nul
+    echo [INFO] Attributes: {dump_path}"""
+        elif data.get("keep_intermediates"):
+            retention = data.get("retention") or RETENTION_DEFAULTS
+            archive_root = os.path.join(output_folder_bat, INTERMEDIATES_FOLDER_NAME)
+            intermediates_block = f"""    echo [INFO] Archiving TEMP.RVM and TEMP.txt...
+    {tool_command} retain "{work_folder_bat}" "{archive_root}" --project {run_project} ^
+          --keep-runs {retention["keep_runs"]} --max-total-mb {retention["max_total_mb"]} ^
+          --max-age-days {retention["max_age_days"]}"""
+        else:
+            intermediates_block = f"""    if exist "{temp_txt_path}" (
+        del /f /q "{temp_txt_path}"
+        echo [INFO] Deleted: TEMP.txt
+    )
+    if exist "{temp_rvm_path}" (
+        del /f /q "{temp_rvm_path}"
+        echo [INFO] Deleted: TEMP.RVM
+    )"""
+
+        # A part of a split export publishes in the foreground and then tells the
+        # orchestrating batch it is finished, so federation only sees complete NWDs.
+        # Worker-driven runs (foreground_publish) also wait, so the job's result is
+        # this run's record and the next job does not start while cleanup runs.
+        launch, background = 'start "" /b ', " in the background"
+        part_done_block = ""
+        if self.part or data.get("foreground_publish"):
+            launch, background = "", ""
+        if self.part:
+            done_marker = os.path.join(macro_folder_bat, PART_DONE_FILE_NAME)
+            part_done_block = f"""
+    echo done > "{done_marker}\""""
+
+        # Staging: scratch must exist before E3D starts, and only the NWD goes to the share.
+        # Publishing also deduplicates the run's NWD and moves the <PROJ>-latest.nwd pointer.
+        prepare_block = ""
+        publish_block = f"""
+
+    echo [INFO] Registering NWD version{background}...
+    {launch}{tool_command} publish "!NWD_PATH!" "{output_folder_bat}" --project {run_project}"""
+        if data.get("scratch_folder"):
+            prepare_block = f'if not exist "{work_folder_bat}" mkdir "{work_folder_bat}"\n    '
+            publish_block = f"""
+
+    echo [INFO] Publishing NWD to {output_folder_bat}{background}...
+    copy /y "{log_file_path}" "{os.path.join(macro_folder_bat, "RVM_LOG.txt")}" >nul
+    {launch}{tool_command} publish "!NWD_PATH!" "{output_folder_bat}" --project {run_project} ^
+          --cleanup "{work_folder_bat}\""""
+
+        # Without geometry there is no NWD to wait for or publish
+        finished_block = f"""echo [INFO] Macro has finished. Checking for NWD file path...
+         for /f "usebackq tokens=1,* delims==" %%A in (`findstr /c:"[RVM] NWD_OUT=" "{log_file_path}"`) do (
+            set "NWD_PATH=%%B"
+         )
+         if defined NWD_PATH (
+            echo [INFO] NWD path found: !NWD_PATH!
+            if exist "!NWD_PATH!" goto done
+            echo [WARN] NWD file does not exist yet, waiting...
+         )"""
+        ready_message = "NWD file is ready at: !NWD_PATH!"
+        if mode == "attributes":
+            finished_block = """echo [INFO] Macro has finished.
+         goto done"""
+            ready_message = "Attribute dump is ready."
+            publish_block = ""
+            if data.get("scratch_folder"):
+                publish_block = f"""
+    copy /y "{log_file_path}" "{os.path.join(macro_folder_bat, "RVM_LOG.txt")}" >nul
+    rmdir /s /q "{work_folder_bat}\""""
+
+        # This content is the user's template, with dynamic values injected.
+        content = f"""
+    @echo off
+    setlocal ENABLEDELAYEDEXPANSION
+    echo [INFO] Starting AVEVA E3D with macro RVM.mac...
+    echo -----------------------------------------
+
+    {prepare_block}if exist "{log_file_path}" del "{log_file_path}"
+    start "" /b {tool_command} runlog-follow "{log_file_path}" "{output_folder_bat}" --project {run_project}{shard_option}
+
+    {self._launch_block(rvm_mac_path, log_file_path)}
+
+    echo [INFO] Tracking macro progress...
+    set "NWD_PATH="
+    :loop
+    if exist "{log_file_path}" (
+      rem The 'type' command can sometimes lock the file, so we'll be careful.
+      rem Instead of constantly typing, we just check for the final string.
+      findstr /c:"[RVM] Finished" "{log_file_path}" >nul
+      if not errorlevel 1 (
+         {finished_block}
+      )
+    )
+    echo [INFO] Waiting for macro to complete... (checking again in 5s)
+    timeout /t 5 >nul
+    goto loop
+
+    :done
+    echo.
+    echo [SUCCESS] Process finished. {ready_message}
+    echo -----------------------------------------
+
+    rem Wait a moment to ensure all file handles are released
+    timeout /t 2 >nul
+
+    echo [INFO] Cleaning up generated files...
+    rem Delete files in reverse order: attribute.mac, RVM.mac, settings.json, TEMP.txt, TEMP.RVM
+    if exist "{attribute_mac_path}" (
+        del /f /q "{attribute_mac_path}"
+        echo [INFO] Deleted: attribute.mac
+    )
+    if exist "{rvm_mac_delete_path}" (
+        del /f /q "{rvm_mac_delete_path}"
+        echo [INFO] Deleted: RVM.mac
+    )
+    if exist "{settings_json_path}" (
+        del /f /q "{settings_json_path}"
+        echo [INFO] Deleted: settings.json
+    )
+    echo [INFO] Recording element counts per type...
+    {tool_command} record-counts "{counts_path}" "{output_folder_bat}" --project {run_project} --nwd "!NWD_PATH!"{mode_option}
+{intermediates_block}{publish_block}{part_done_block}
+
+    echo [INFO] Cleanup complete. This batch file will now self-destruct...
+    rem Self-delete this batch file (RunE3D.bat)
+    (goto) 2>nul & del /f /q "%~f0"
+    """
+        return content.strip()
+
+
+class PartitionedExport:
+    """
+    Splits one project export into discipline parts, each exported by its own E3D
+    session into <PROJ>-<PART>-latest.nwd, and federates the parts through <PROJ>.nwf.
+    Each part lives in <output>/<PART>/ with its own macros, manifest and log.
+    `parts` replaces the discipline split, e.g. with the balanced shards of plan_shards.
+    """
+
+    def __init__(self, data, objects, max_sessions=DEFAULT_MAX_SESSIONS, rules=None, parts=None):
+        if export_mode(data) == "attributes":
+            raise ValueError("A split export needs geometry; attribute-only runs dump the whole list at once")
+        self.data = data
+        if parts is None:
+            parts = split_by_discipline(quality_objects(resolve_object_patterns(data, objects), quality_profile(data)), rules)
+        self.parts = parts
+        self.max_sessions = max(1, max_sessions)
+
+    def generate(self, output_dir, selected=None):
+        """
+        Writes the artifacts of every part and the orchestrating RunE3D.bat.
+        `selected` limits both to the given parts, e.g. ["PI"] rebuilds only the piping NWD
+        and federates it with the NWDs of the other parts from earlier runs.
+        Returns (written, unchanged) lists of artifact names, prefixed with the part.
+        """
+        selected = list(self.parts) if selected is None else selected
+        unknown = [part for part in selected if part not in self.parts]
+        if unknown:
+            raise ValueError(f"Unknown part(s) {' '.join(unknown)}; the export has {' '.join(self.parts)}")
+
+        output_dir = Path(output_dir)
+        written, unchanged = [], []
+        for part in selected:
+            (output_dir / part).mkdir(exist_ok=True)
+            generator = self._part_generator(part, self.parts[part])
+            part_written, part_unchanged = generator.generate(output_dir / part)
+            written += [f"{part}/{name}" for name in part_written]
+            unchanged += [f"{part}/{name}" for name in part_unchanged]
+
+        manifest = ArtifactManifest(output_dir)
+        if manifest.write_if_changed("RunE3D.bat", self._generate_run_bat(selected)):
+            written.append("RunE3D.bat")
+        else:
+            unchanged.append("RunE3D.bat")
+        manifest.save()
+        return written, unchanged
+
+    def _part_generator(self, part, objects):
+        return ExportGenerator({**self.data, "part": part}, objects)
+
+    def _generate_run_bat(self, selected):
+        """
+        Starts the batches of the selected parts with at most max_sessions E3D sessions at a
+        time, waits for their PART_DONE markers and federates the NWDs of all parts.
+        Arguments narrow the selection further, e.g. 'RunE3D.bat PI'. The part batches and
+        this one delete themselves after the run, so a later rebuild regenerates them
+        ('main.py split-export ... --parts PI').
+        """
+        data = self.data
+        output_folder_bat = data["output_folder"].replace("/", "\\")
+        tool_command = _tool_command()
+        filetools_path = os.path.join(os.path.dirname(data["roamer_path"]), FILETOOLS_EXE_NAME).replace("/", "\\")
+        parts = " ".join(self.parts)
+        selected = " ".join(selected)
+
+        content = f"""
+    @echo off
+    setlocal ENABLEDELAYEDEXPANSION
+    echo [INFO] Discipline export of {data["proj_code"]}: {selected}
+    echo -----------------------------------------
+
+    set "SELECTED=%*"
+    if "!SELECTED!"=="" set "SELECTED={selected}"
+    set "STARTED="
+    for %%P in (!SELECTED!) do (
+        if exist "{output_folder_bat}\\%%P\\{PART_DONE_FILE_NAME}" del /f /q "{output_folder_bat}\\%%P\\{PART_DONE_FILE_NAME}"
+    )
+    for %%P in (!SELECTED!) do call :launch %%P
+
+    :wait_all
+    call :count_running
+    if !RUNNING! GTR 0 (
+        echo [INFO] Waiting for !RUNNING! running part^(s^), checking again in 10s...
+        timeout /t 10 >nul
+        goto wait_all
+    )
+
+    echo [INFO] All parts finished. Federating NWDs...
+    {tool_command} federate "{output_folder_bat}" --project {quality_project(data)} ^
+          --parts {parts} --filetools "{filetools_path}"
+
+    echo [INFO] Cleanup complete. This batch file will now self-destruct...
+    (goto) 2>nul & del /f /q "%~f0"
+
+    :launch
+    if not exist "{output_folder_bat}\\%1\\RunE3D.bat" (
+        echo [WARN] No batch for part %1, skipped
+        goto :eof
+    )
+    :throttle
+    call :count_running
+    if !RUNNING! GEQ {self.max_sessions} (
+        timeout /t 10 >nul
+        goto throttle
+    )
+    echo [INFO] Starting part %1...
+    set "STARTED=!STARTED! %1"
+    start "E3D %1" cmd /c "{output_folder_bat}\\%1\\RunE3D.bat"
+    goto :eof
+
+    :count_running
+    set /a RUNNING=0
+    for %%Q in (!STARTED!) do (
+        if not exist "{output_folder_bat}\\%%Q\\{PART_DONE_FILE_NAME}" set /a RUNNING+=1
+    )
+    goto :eof
+    """
+        return content.strip()
+
+
+def plan_tiles(extent, columns, rows):
+    """
+    Grid of columns x rows tiles over the plant extent (west, south, east, north in mm):
+    {"X<column>Y<row>": [west, south, east, north]}. The outer edges of the grid are None
+    (unbounded), so elements beyond the extent still land in a border tile.
+    """
+    west, south, east, north = extent
+    if east <= west or north <= south or columns < 1 or rows < 1:
+        raise ValueError(f"Invalid tile grid {columns}x{rows} over {extent}")
+    xs = [round(west + (east - west) * column / columns) for column in range(columns + 1)]
+    ys = [round(south + (north - south) * row / rows) for row in range(rows + 1)]
+    tiles = {}
+    for row in range(rows):
+        for column in range(columns):
+            tiles[f"X{column + 1}Y{row + 1}"] = [
+                xs[column] if column > 0 else None, ys[row] if row > 0 else None,
+                xs[column + 1] if column < columns - 1 else None, ys[row + 1] if row < rows - 1 else None,
+            ]
+    return tiles
+
+
+def _pml_volume(west, south, east, north):
+    """PML volume 'within E .. N .. U .. to E .. N .. U ..', None edges reaching TILE_UNBOUNDED."""
+    def position(east, north, up):
+        return " ".join(f"{positive if value >= 0 else negative} {abs(value)}"
+                        for value, positive, negative in ((east, "E", "W"), (north, "N", "S"), (up, "U", "D")))
+
+    low = position(-TILE_UNBOUNDED if west is None else west, -TILE_UNBOUNDED if south is None else south,
+                   -TILE_UNBOUNDED)
+    high = position(TILE_UNBOUNDED if east is None else east, TILE_UNBOUNDED if north is None else north,
+                    TILE_UNBOUNDED)
+    return f"within {low} to {high}"
+
+
+class TileExport(ExportGenerator):
+    """
+    One tile of a TiledExport: RVM.mac collects the tile types of the object list within
+    the tile's volume and exports each element whose box does not reach into the area west
+    or south of the tile, i.e. whose minimum corner lies in this tile.
+    """
+
+    def _export_commands(self, log_file_path):
+        west, south, east, north = self.data["tile"]
+        types = " ".join(self.data.get("tile_types") or DEFAULT_TILE_TYPES)
+        names = [line.strip()[2:].strip() if line.strip().upper().startswith("T ") else line.strip()
+                 for line in self.objects if not line.strip().upper().startswith("EXCLUDE ")]
+        excludes = "".join(f" {line}" for line in self.objects if line.strip().upper().startswith("EXCLUDE "))
+        scope = f"for {' '.join(names)}{excludes}"
+
+        lines = [f"!TTYPES = '{types}'",
+                 f"Var !TILE collect all ($!TTYPES) {_pml_volume(west, south, east, north)} {scope}"]
+        if west is not None:
+            lines += [f"Var !WEST collect all ($!TTYPES) {_pml_volume(None, None, west, None)} {scope}",
+                      "!TILE = !TILE.Difference(!WEST)"]
+        if south is not None:
+            lines += [f"Var !SOUTH collect all ($!TTYPES) {_pml_volume(None, None, None, south)} {scope}",
+                      "!TILE = !TILE.Difference(!SOUTH)"]
+        lines += ["!TSIZE = !TILE.Size().String()",
+                  f"SYSCOM |echo [RVM] Tile {self.part} elements $!TSIZE >> {log_file_path}|",
+                  "do !TIDX indices !TILE",
+                  "$!TILE[$!TIDX]",
+                  "EXPORT CE",
+                  "enddo"]
+        return "\n".join(lines)
+
+
+class TiledExport(PartitionedExport):
+    """
+    Splits the plant into a grid of volume-bounded tiles exported by parallel E3D sessions
+    (at most max_sessions at a time) and federated through <PROJ>.nwf, like a discipline
+    split. Tiles are geometry only; the attribute dump is an Attributes only run.
+    """
+
+    def __init__(self, data, objects, tiles, max_sessions=DEFAULT_MAX_SESSIONS):
+        if export_mode(data) != "geometry":
+            raise ValueError("A tiled export is geometry only; dump the attributes with an Attributes only run")
+        objects = quality_objects(resolve_object_patterns(data, objects), quality_profile(data))
+        super().__init__(data, objects, max_sessions, parts={name: objects for name in tiles})
+        self.tiles = tiles
+
+    def _part_generator(self, part, objects):
+        return TileExport({**self.data, "part": part, "tile": self.tiles[part]}, objects)
+
+    def generate(self, output_dir, selected=None):
+        written, unchanged = super().generate(output_dir, selected)
+        # The grid beside the NWDs, for 'tile-report'
+        name = f"{quality_project(self.data)}{TILES_FILE_SUFFIX}"
+        manifest = ArtifactManifest(output_dir)
+        content = json.dumps({"types": self.data.get("tile_types") or DEFAULT_TILE_TYPES, "tiles": self.tiles},
+                             indent=4)
+        (written if manifest.write_if_changed(name, content) else unchanged).append(name)
+        manifest.save()
+        return written, unchanged
+
+
+def _run_events(path):
+    events = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def tile_report(output_dir, project):
+    """
+    Timings of the newest run of every tile from the run logs, for tuning the grid:
+    elements, export seconds (RVM), conversion seconds (Roamer) and total per tile, plus
+    the slowest tile and its ratio to the mean tile time.
+    """
+    try:
+        with open(Path(output_dir) / f"{project}{TILES_FILE_SUFFIX}", 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+    except (OSError, ValueError):
+        raise FileNotFoundError(f"No tiled export of {project} in {output_dir}")
+
+    rows = []
+    for name, bounds in grid["tiles"].items():
+        row = {"tile": name, "bounds": bounds}
+        runs = RunLog(output_dir, f"{project}-{name}").runs()
+        if runs:
+            stages = {}
+            for event in _run_events(runs[0]):
+                if "t" in event:
+                    stages.setdefault(event["stage"], event)
+            row["run"] = runs[0].stem
+            if "tile" in stages:
+                row["elements"] = int(stages["tile"].get("message", "0").split()[-1])
+            if "rvm" in stages and "roamer" in stages:
+                row["export_s"] = round(stages["roamer"]["t"] - stages["rvm"]["t"], 3)
+            if "roamer" in stages and "finished" in stages:
+                row["convert_s"] = round(stages["finished"]["t"] - stages["roamer"]["t"], 3)
+            if "finished" in stages:
+                row["total_s"] = stages["finished"]["t"]
+        rows.append(row)
+
+    totals = [row["total_s"] for row in rows if "total_s" in row]
+    report = {"project": project, "types": grid.get("types"), "tiles": rows, "makespan": max(totals, default=None)}
+    dump_path = Path(output_dir) / f"{project}{ATTRIBUTES_DUMP_SUFFIX}"
+    if dump_path.exists():
+        report["uncovered"] = uncovered_elements(dump_path, grid.get("types"))
+    if totals:
+        slowest = max((row for row in rows if "total_s" in row), key=lambda row: row["total_s"])
+        report["slowest"] = slowest["tile"]
+        report["imbalance"] = round(slowest["total_s"] / statistics.mean(totals), 2) if statistics.mean(totals) else None
+    return report
+
+
+def uncovered_elements(dump_path, tile_types=None):
+    """
+    Elements of an attribute dump that a tiled export leaves out, as {type: count}: those
+    neither of a tile type nor inside one, and not holding one either (a STRU holding
+    FRMWs is covered through them). Sites and zones are never counted.
+    """
+    tile_types = {name.upper() for name in (tile_types or DEFAULT_TILE_TYPES)}
+    counts = {}
+    stack = []   # per open element: [type, covered, holds a covered element]
+    with open_attribute_dump(dump_path) as f:
+        for line in f:
+            text = line.strip()
+            if text.startswith("NEW "):
+                name = text[4:].strip()
+                element_type = "TUBI" if name.startswith("TUBE ") else ""
+                if name == CADC_HEADER_NAME:
+                    element_type = CADC_HEADER_NAME
+                stack.append([element_type, bool(stack) and stack[-1][1], False])
+            elif text == "END":
+                if not stack:
+                    continue
+                element_type, covered, holds = stack.pop()
+                if not (covered or holds or element_type in TILE_CONTAINER_TYPES or element_type == CADC_HEADER_NAME):
+                    counts[element_type or "?"] = counts.get(element_type or "?", 0) + 1
+                if stack:
+                    stack[-1][2] = stack[-1][2] or covered or holds
+            elif stack and not stack[-1][0] and CADC_NAME_END in text:
+                key, _, value = text.partition(CADC_NAME_END)
+                if key.strip().upper() == "TYPE":
+                    stack[-1][0] = value.strip().upper()
+                    stack[-1][1] = stack[-1][1] or stack[-1][0] in tile_types
+    return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+
+class PipelinedExport(ExportGenerator):
+    """
+    Exports the discipline parts one after another in a single E3D session and hands
+    each finished TEMP-<PART>.RVM to a background 'convert' process, so Roamer builds
+    the NWD of part k while part k+1 is still exporting. The batch then only waits for
+    the last conversions and federates the part NWDs through <PROJ>.nwf.
+    """
+
+    def __init__(self, data, objects, rules=None, parts=None):
+        if export_mode(data) == "attributes":
+            raise ValueError("A pipelined export needs geometry; attribute-only runs dump the whole list at once")
+        super().__init__(data, objects)
+        self.parts = split_by_discipline(self.objects, rules) if parts is None else parts
+
+    @property
+    def single_pass(self):
+        return False  # the parts are exported in turn; attribute.mac still dumps the whole list once
+
+    def _generate_rvm_mac(self):
+        """RVM.mac with one EXPORT FILE ... EXPORT FINISH block per part, each followed by an asynchronous conversion."""
+        data = self.data
+        work_folder = self.work_folder
+        log_file_path = f"{work_folder}/RVM_LOG.txt".replace("/", "\\")
+        attribute_mac_path = f"{self.macro_folder}/attribute.mac"
+        tool_command = _tool_command()
+        output_folder = data["output_folder"].replace("/", "\\")
+        markers_folder = work_folder.replace("/", "\\")
+        keep_rvm = " --keep-rvm" if data.get("keep_intermediates") else ""
+
+        blocks = []
+        for number, (part, objects) in enumerate(self.parts.items(), 1):
+            temp_rvm_path = f"{work_folder}/TEMP-{part}.RVM"
+            export_commands = "\n".join(
+                f"SYSCOM |echo [RVM] Export {obj} >> {log_file_path}|\nEXPORT {obj}" for obj in objects
+            )
+            blocks.append(f"""
+$* Part {part}: exported here, converted by a background process while the next part exports
+!NWD{number} = '{self.nwd_folder}/' + '{self.nwd_prefix}{part}-' + !STAMP + '.nwd'
+SYSCOM |echo [RVM] NWD_OUT=$!NWD{number} >> {log_file_path}|
+EXPORT FILE /{temp_rvm_path} OVER
+{pml_export_options(self.quality)}{export_commands}
+EXPORT FINISH
+SYSCOM |echo [RVM] Converting {part} >> {log_file_path}|
+SYSCOM |start "" /b {tool_command} convert "{data['roamer_path']}" "{temp_rvm_path}" "$!NWD{number}" "{output_folder}" --project {self.project_name} --shard {part} --markers "{markers_folder}"{keep_rvm}|
+""")
+
+        # A warm session is already in DESIGN and must stay open after the job
+        design, finish = ("", "") if self.warm else ("DESIGN\n", "FINISH\n")
+
+        attributes_start = "" if self.mode == "geometry" else f"""SYSCOM |echo [RVM] Start attribute.mac >> {log_file_path}|
+$M {attribute_mac_path}
+"""
+
+        content = f"""
+{design}
+{attributes_start}
+{PML_RUN_STAMP}
+!STAMP = !CUDATE.YEAR().STRING()+ '-' + !MONTH + '-' + !DAY + '-' + !HOUR + !MINUTE + !SECOND
+
+SYSCOM |echo [RVM] Exporting RVM file... >> {log_file_path}|
+{"".join(blocks)}
+SYSCOM |echo [RVM] Finished >> {log_file_path}|
+{finish}"""
+        return content
+
+    def _generate_run_bat(self):
+        """
+        Starts E3D, waits for the macro and for every <PART>.converted marker, cleans up
+        and federates the part NWDs. Conversions publish their own NWDs, so the tail of
+        the run is only the last part's conversion plus the NWF.
+        """
+        data = self.data
+        output_folder_bat = data["output_folder"].replace("/", "\\")
+        work_folder_bat = self.work_folder.replace("/", "\\")
+        macro_folder_bat = self.macro_folder.replace("/", "\\")
+        run_project = self.run_project
+        parts = " ".join(self.parts)
+
+        log_file_path = os.path.join(work_folder_bat, "RVM_LOG.txt")
+        rvm_mac_path = os.path.join(macro_folder_bat, "RVM.mac")
+        tool_command = _tool_command()
+        counts_path = os.path.join(work_folder_bat, TYPE_COUNTS_FILE_NAME)
+        mode_option = f" --mode {self.mode}" if self.mode != DEFAULT_EXPORT_MODE else ""
+        filetools_path = os.path.join(os.path.dirname(data["roamer_path"]), FILETOOLS_EXE_NAME).replace("/", "\\")
+        marker = os.path.join(work_folder_bat, f"%%P{CONVERTED_SUFFIX}")
+        failed = os.path.join(work_folder_bat, f"%%P{CONVERT_FAILED_SUFFIX}")
+
+        cleanup_lines = []
+        for name in ("attribute.mac", "RVM.mac", "settings.json"):
+            path = os.path.join(macro_folder_bat, name)
+            cleanup_lines.append(f'    if exist "{path}" del /f /q "{path}"')
+        cleanup_block = "\n".join(cleanup_lines)
+
+        if data.get("keep_intermediates"):
+            retention = data.get("retention") or RETENTION_DEFAULTS
+            archive_root = os.path.join(output_folder_bat, INTERMEDIATES_FOLDER_NAME)
+            intermediates_block = f"""    echo [INFO] Archiving TEMP-*.RVM and TEMP.txt...
+    {tool_command} retain "{work_folder_bat}" "{archive_root}" --project {run_project} ^
+          --keep-runs {retention["keep_runs"]} --max-total-mb {retention["max_total_mb"]} ^
+          --max-age-days {retention["max_age_days"]}"""
+        else:
+            intermediates_block = f"""    if exist "{os.path.join(work_folder_bat, "TEMP.txt")}" del /f /q "{os.path.join(work_folder_bat, "TEMP.txt")}"
+    del /f /q "{os.path.join(work_folder_bat, "TEMP-*.RVM")}" 2>nul"""
+
+        prepare_block = ""
+        scratch_block = ""
+        if data.get("scratch_folder"):
+            prepare_block = f'if not exist "{work_folder_bat}" mkdir "{work_folder_bat}"\n    '
+            scratch_block = f"""
+    copy /y "{log_file_path}" "{os.path.join(macro_folder_bat, "RVM_LOG.txt")}" >nul
+    rmdir /s /q "{work_folder_bat}\""""
+
+        content = f"""
+    @echo off
+    setlocal ENABLEDELAYEDEXPANSION
+    echo [INFO] Pipelined export of {data["proj_code"]}: {parts}
+    echo -----------------------------------------
+
+    {prepare_block}if exist "{log_file_path}" del "{log_file_path}"
+    for %%P in ({parts}) do (
+        if exist "{marker}" del /f /q "{marker}"
+        if exist "{failed}" del /f /q "{failed}"
+    )
+    start "" /b {tool_command} runlog-follow "{log_file_path}" "{output_folder_bat}" --project {run_project}
+
+    {self._launch_block(rvm_mac_path, log_file_path)}
+
+    echo [INFO] Tracking macro progress...
+    :loop
+    if exist "{log_file_path}" (
+      findstr /c:"[RVM] Finished" "{log_file_path}" >nul
+      if not errorlevel 1 goto converting
+    )
+    echo [INFO] Waiting for macro to complete... (checking again in 5s)
+    timeout /t 5 >nul
+    goto loop
+
+    :converting
+    {tool_command} wait-converted "{work_folder_bat}" --parts {parts}
+
+    echo [INFO] Cleaning up generated files...
+{cleanup_block}
+    echo [INFO] Recording element counts per type...
+    {tool_command} record-counts "{counts_path}" "{output_folder_bat}" --project {run_project}{mode_option}
+{intermediates_block}{scratch_block}
+
+    echo [INFO] Federating NWDs...
+    {tool_command} federate "{output_folder_bat}" --project {self.project_name} ^
+          --parts {parts} --filetools "{filetools_path}"
+
+    echo [INFO] Cleanup complete. This batch file will now self-destruct...
+    (goto) 2>nul & del /f /q "%~f0"
+    """
+        return content.strip()
+
+
+class CountScan(ExportGenerator):
+    """
+    Cheap pre-scan for the estimator: COUNT.mac only collects the elements of the object
+    list and counts them per type (no RVM, no attribute dump); CountE3D.bat runs it and
+    stores the counts as _stats/<project>-prescan-counts.json.
+    """
+
+    def generate(self, output_dir):
+        manifest = ArtifactManifest(output_dir)
+        written, unchanged = [], []
+        for name, content in (("COUNT.mac", self._generate_count_mac()), ("CountE3D.bat", self._generate_count_bat())):
+            (written if manifest.write_if_changed(name, content) else unchanged).append(name)
+        manifest.save()
+        return written, unchanged
+
+    def _generate_count_mac(self):
+        counts_path = f"{self.work_folder}/{PRESCAN_COUNTS_FILE_NAME}"
+        counts_path_bat = counts_path.replace("/", "\\")
+        collect_types = " ".join(self.data.get("collect_types") or DEFAULT_COLLECT_TYPES)
+        objects_string = " ".join(self.objects)
+        names = [line.strip()[2:].strip() if line.strip().upper().startswith("T ") else line.strip()
+                 for line in self.objects if not line.strip().upper().startswith("EXCLUDE ")]
+        object_counts = "\n".join(
+            f"Var !COLL collect all ($!list) for {name}\n!OBJCOUNT.Append('OBJECT {name} ' & !COLL.Size().String())"
+            for name in names)
+        content = f"""
+DESIGN
+onerror continue
+!list = '{collect_types}'
+!SEEN = ARRAY()
+!TCOUNT = ARRAY()
+
+Var !COLL collect all ($!list) for {objects_string}
+do !INDX indices !COLL
+$!COLL[$!INDX]
+{PML_COUNT_TYPE}enddo
+
+$* Elements per object line, for the shard planner
+!OBJCOUNT = ARRAY()
+{object_counts}
+
+$* Written under a temporary name and renamed, so the batch never reads a partial file
+var !CFILE |{counts_path}.tmp|
+openfile /$!CFILE overwrite !CUNIT
+do !TIDX indices !SEEN
+var !CLINE (!SEEN[!TIDX] & ' ' & !TCOUNT[!TIDX].String())
+writefile $!CUNIT |$!CLINE|
+enddo
+do !OIDX indices !OBJCOUNT
+var !CLINE (!OBJCOUNT[!OIDX])
+writefile $!CUNIT |$!CLINE|
+enddo
+closefile $!CUNIT
+SYSCOM |move /y "{counts_path_bat}.tmp" "{counts_path_bat}"|
+FINISH
+"""
+        return content
+
+    def _generate_count_bat(self):
+        data = self.data
+        output_folder_bat = data["output_folder"].replace("/", "\\")
+        work_folder_bat = self.work_folder.replace("/", "\\")
+        macro_folder_bat = self.macro_folder.replace("/", "\\")
+        counts_path = os.path.join(work_folder_bat, PRESCAN_COUNTS_FILE_NAME)
+        count_mac_path = os.path.join(macro_folder_bat, "COUNT.mac")
+        tool_command = _tool_command()
+        prepare_block = f'if not exist "{work_folder_bat}" mkdir "{work_folder_bat}"\n    ' if data.get("scratch_folder") else ""
+
+        content = f"""
+    @echo off
+    echo [INFO] Counting the elements of {self.run_project} (pre-scan, nothing is exported)...
+    {prepare_block}if exist "{counts_path}" del "{counts_path}"
+
+    {_mon_launch(data, count_mac_path)}
+
+    :loop
+    if exist "{counts_path}" goto done
+    timeout /t 5 >nul
+    goto loop
+
+    :done
+    {tool_command} record-counts "{counts_path}" "{output_folder_bat}" --project {self.run_project} --prescan
+    {tool_command} estimate "{output_folder_bat}" --project {self.run_project}
+    if exist "{count_mac_path}" del /f /q "{count_mac_path}"
+    (goto) 2>nul & del /f /q "%~f0"
+    """
+        return content.strip()
+
+
+class CatalogScan(ExportGenerator):
+    """
+    Catalog scan: CATALOG.mac lists every SITE and its ZONEs with their element counts
+    (nothing is exported); CatalogE3D.bat runs it and caches the result with 'catalog-store'
+    for the side panel completion and the object list patterns.
+    """
+
+    def __init__(self, data, root=DEFAULT_CATALOG_ROOT):
+        super().__init__(data, [])
+        self.root = root
+
+    def generate(self, output_dir):
+        manifest = ArtifactManifest(output_dir)
+        written, unchanged = [], []
+        for name, content in (("CATALOG.mac", self._generate_catalog_mac()),
+                              ("CatalogE3D.bat", self._generate_catalog_bat())):
+            (written if manifest.write_if_changed(name, content) else unchanged).append(name)
+        manifest.save()
+        return written, unchanged
+
+    def _generate_catalog_mac(self):
+        catalog_file = f"{self.work_folder}/{CATALOG_FILE_NAME}"
+        catalog_file_bat = catalog_file.replace("/", "\\")
+        collect_types = " ".join(self.data.get("collect_types") or DEFAULT_COLLECT_TYPES)
+        content = f"""
+DESIGN
+onerror continue
+!list = '{collect_types}'
+
+$* One line per SITE and ZONE: type, name, owner and element count
+var !CFILE |{catalog_file}.tmp|
+openfile /$!CFILE overwrite !CUNIT
+Var !SITES collect all SITE for /*
+do !SIDX indices !SITES
+$!SITES[$!SIDX]
+var !SNAME (FULLNAME)
+Var !COLL collect all ($!list) for $!SNAME
+var !CLINE ('SITE ' & !SNAME & ' /* ' & !COLL.Size().String())
+writefile $!CUNIT |$!CLINE|
+Var !ZONES collect all ZONE for $!SNAME
+do !ZIDX indices !ZONES
+$!ZONES[$!ZIDX]
+var !ZNAME (FULLNAME)
+Var !COLL collect all ($!list) for $!ZNAME
+var !CLINE ('ZONE ' & !ZNAME & ' ' & !SNAME & ' ' & !COLL.Size().String())
+writefile $!CUNIT |$!CLINE|
+enddo
+enddo
+closefile $!CUNIT
+SYSCOM |move /y "{catalog_file_bat}.tmp" "{catalog_file_bat}"|
+FINISH
+"""
+        return content
+
+    def _generate_catalog_bat(self):
+        data = self.data
+        work_folder_bat = self.work_folder.replace("/", "\\")
+        macro_folder_bat = self.macro_folder.replace("/", "\\")
+        catalog_file = os.path.join(work_folder_bat, CATALOG_FILE_NAME)
+        catalog_mac_path = os.path.join(macro_folder_bat, "CATALOG.mac")
+        tool_command = _tool_command()
+        prepare_block = f'if not exist "{work_folder_bat}" mkdir "{work_folder_bat}"\n    ' if data.get("scratch_folder") else ""
+
+        content = f"""
+    @echo off
+    echo [INFO] Cataloging the sites and zones of {data["proj_code"]} {data["mdb"]} (nothing is exported)...
+    {prepare_block}if exist "{catalog_file}" del "{catalog_file}"
+
+    {_mon_launch(data, catalog_mac_path)}
+
+    :loop
+    if exist "{catalog_file}" goto done
+    timeout /t 5 >nul
+    goto loop
+
+    :done
+    {tool_command} catalog-store "{catalog_file}" --project {data["proj_code"]} --mdb "{data["mdb"]}" ^
+          --root "{self.root}"
+    del /f /q "{catalog_file}" "{catalog_mac_path}"
+    (goto) 2>nul & del /f /q "%~f0"
+    """
+        return content.strip()
+
+
+def convert_part(roamer_command, rvm_path, nwd_path):
+    """
+    Runs Roamer on one part's RVM file and returns the conversion time in seconds.
+    `roamer_command` is the Roamer executable as an argument list.
+    """
+    start = time.monotonic()
+    subprocess.run([*roamer_command, "-nwd", str(nwd_path), str(rvm_path)], check=True)
+    if not Path(nwd_path).exists():
+        raise FileNotFoundError(f"Roamer did not write {nwd_path}")
+    return time.monotonic() - start
+
+
+def federate_parts(output_dir, project, parts, filetools=None):
+    """
+    Writes the list of part NWDs and builds <PROJ>.nwf from it with the Navisworks
+    File Tools runner. The NWF references the stable <PROJ>-<PART>-latest.nwd names,
+    so it is only rebuilt when the set of parts changes.
+    Returns (nwf_path, rebuilt).
+    """
+    output_dir = Path(output_dir).resolve()
+    nwd_files = [output_dir / f"{project}-{part}-latest.nwd" for part in parts]
+    nwd_files = [path for path in nwd_files if path.exists()]
+    if not nwd_files:
+        raise FileNotFoundError(f"No part NWDs found for {project} in {output_dir}")
+
+    list_path = output_dir / f"{project}-parts.txt"
+    nwf_path = output_dir / f"{project}.nwf"
+    listing = "\n".join(str(path) for path in nwd_files) + "\n"
+    try:
+        current = list_path.read_text(encoding='utf-8') == listing
+    except OSError:
+        current = False
+    if current and nwf_path.exists():
+        return nwf_path, False
+
+    atomic_write_text(list_path, listing)
+    if not filetools or not Path(filetools).exists():
+        raise FileNotFoundError(f"{FILETOOLS_EXE_NAME} not found: {filetools}")
+    subprocess.run([str(filetools), "/i", str(list_path), "/of", str(nwf_path), "/over"], check=True)
+    return nwf_path, True
+
+
+CADC_NAME_END = ":="
+CADC_HEADER_NAME = "Header Information"
+DIFF_CHUNK_RECORDS = 200000
+
+# Columnar attribute dumps: <dump>.columns/ with meta.json, one .npy per numeric column
+# and Arrow-style string columns (int64 offsets .npy + UTF-8 data). Written without numpy.
+COLUMNAR_SUFFIX = ".columns"
+COLUMNAR_META_FILE_NAME = "meta.json"
+COLUMNAR_FLUSH_ROWS = 65536
+NPY_HEADER_BYTES = 128       # fixed header size, rewritten with the row count at the end
+NUMERIC_ATTRIBUTES = ("Length", "Main Size", "Red. Size", "Branch Conn. Size", "Pipe Size", "weight")
+NUMBER_PATTERN = re.compile(r"([-+]?(?:\d+\s+\d+/\d+|\d+/\d+|\d*\.?\d+(?:[eE][-+]?\d+)?))\s*([A-Za-z%]*)")
+
+
+def open_attribute_dump(path):
+    """Opens a CADC attribute dump as text, including archived .gz / .zst copies."""
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("Reading .zst dumps needs the 'zstandard' package")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def iter_cadc_elements(path):
+    """
+    Streams (element name, {attribute: value}) pairs from a dump written by attribute.mac.
+    An element's attributes directly follow its NEW line, so each element is complete
+    at the next NEW or END line and only one element is held in memory.
+    """
+    name, attributes = None, {}
+    with open_attribute_dump(path) as f:
+        for line in f:
+            text = line.strip()
+            if text.startswith("NEW "):
+                if name is not None:
+                    yield name, attributes
+                name, attributes = text[4:].strip(), {}
+                if name == CADC_HEADER_NAME:
+                    name = None
+            elif text == "END":
+                if name is not None:
+                    yield name, attributes
+                name, attributes = None, {}
+            elif name is not None and CADC_NAME_END in text:
+                key, _, value = text.partition(CADC_NAME_END)
+                attributes[key.strip()] = value.strip()
+        if name is not None:
+            yield name, attributes
+
+
+def _sorted_elements(path, temp_dir, chunk_records=DIFF_CHUNK_RECORDS, ignore=()):
+    """
+    External merge sort of a dump by element name: sorted runs of `chunk_records`
+    elements are spilled to temp files and lazily merged, so memory stays bounded.
+    """
+    runs = []
+    chunk = []
+
+    def spill():
+        chunk.sort(key=lambda record: record[0])
+        run_path = Path(temp_dir) / f"run-{len(runs)}.jsonl"
+        with open(run_path, 'w', encoding='utf-8') as f:
+            for record in chunk:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        runs.append(run_path)
+        chunk.clear()
+
+    for name, attributes in iter_cadc_elements(path):
+        for key in ignore:
+            attributes.pop(key, None)
+        chunk.append((name, attributes))
+        if len(chunk) >= chunk_records:
+            spill()
+    if chunk:
+        spill()
+
+    def read_run(run_path):
+        with open(run_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield tuple(json.loads(line))
+
+    return heapq.merge(*(read_run(run_path) for run_path in runs), key=lambda record: record[0])
+
+
+def _group_by_name(records):
+    """Groups consecutive records with the same element name (names repeat rarely)."""
+    for name, group in itertools.groupby(records, key=lambda record: record[0]):
+        yield name, [attributes for _, attributes in group]
+
+
+def attribute_size_stats(path, profile=None):
+    """
+    Streams a dump and sums the bytes per attribute. With a profile, only the attributes
+    that profile would evaluate are counted, projecting the slimmer dump without re-exporting.
+    """
+    stats = {"path": str(path), "bytes": 0, "elements": 0, "attribute_lines": 0, "by_attribute": {}}
+    sources = {label.upper(): source.upper() for source, label in ATTRIBUTE_LABELS.items()}
+    extras = set()
+    if profile:
+        extras = {name.upper() for name in profile.get("branch_extras", [])}
+        for names in profile.get("branch_extras_by_type", {}).values():
+            extras.update(name.upper() for name in names)
+
+    def keeps(element_type, key):
+        if not profile:
+            return True
+        source = sources.get(key.upper(), key.upper())
+        if source in extras:
+            return True
+        rule = profile.get("types", {}).get(element_type, profile.get("default", {}))
+        if rule.get("include") is not None:
+            return source in {name.upper() for name in rule["include"]}
+        return source not in {name.upper() for name in rule.get("exclude", [])}
+
+    def flush(name, lines):
+        if name is None:
+            return
+        element_type = "TUBI" if name.startswith("TUBE ") else next(
+            (value for key, value, _ in lines if key.upper() == "TYPE"), "")
+        stats["elements"] += 1
+        for key, _, size in lines:
+            if keeps(element_type.upper(), key):
+                stats["bytes"] += size
+                stats["attribute_lines"] += 1
+                stats["by_attribute"][key] = stats["by_attribute"].get(key, 0) + size
+
+    name, lines = None, []
+    with open_attribute_dump(path) as f:
+        for line in f:
+            size = len(line.encode('utf-8'))
+            text = line.strip()
+            if text.startswith("NEW ") or text == "END":
+                flush(name, lines)
+                name, lines = (text[4:].strip(), []) if text.startswith("NEW ") else (None, [])
+                if name == CADC_HEADER_NAME:
+                    name = None
+                stats["bytes"] += size  # structure lines are always written
+            elif name is not None and CADC_NAME_END in text:
+                key, _, value = text.partition(CADC_NAME_END)
+                lines.append((key.strip(), value.strip(), size))
+            else:
+                stats["bytes"] += size
+        flush(name, lines)
+    return stats
+
+
+def diff_attribute_dumps(old_path, new_path, max_details=1000, ignore=(), chunk_records=DIFF_CHUNK_RECORDS):
+    """
+    Compares two attribute dumps with a streaming merge-join over name-sorted runs.
+    Returns a compact report: totals, per-attribute change counts and at most
+    `max_details` element-level entries.
+    """
+    report = {
+        "old": str(old_path),
+        "new": str(new_path),
+        "summary": {"added": 0, "removed": 0, "changed": 0, "unchanged": 0},
+        "attributes": {},
+        "details": [],
+        "details_truncated": False,
+    }
+
+    def note(name, status, changes=None):
+        report["summary"][status] += 1
+        if status == "unchanged":
+            return
+        if len(report["details"]) < max_details:
+            entry = {"element": name, "status": status}
+            if changes:
+                entry["changes"] = changes
+            report["details"].append(entry)
+        else:
+            report["details_truncated"] = True
+
+    with tempfile.TemporaryDirectory(prefix="cadc-diff-") as temp_dir:
+        old_dir = Path(temp_dir) / "old"
+        new_dir = Path(temp_dir) / "new"
+        old_dir.mkdir()
+        new_dir.mkdir()
+        old_groups = _group_by_name(_sorted_elements(old_path, old_dir, chunk_records, ignore))
+        new_groups = _group_by_name(_sorted_elements(new_path, new_dir, chunk_records, ignore))
+
+        old_item = next(old_groups, None)
+        new_item = next(new_groups, None)
+        while old_item is not None or new_item is not None:
+            if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+                for _ in old_item[1]:
+                    note(old_item[0], "removed")
+                old_item = next(old_groups, None)
+                continue
+            if old_item is None or new_item[0] < old_item[0]:
+                for _ in new_item[1]:
+                    note(new_item[0], "added")
+                new_item = next(new_groups, None)
+                continue
+
+            name = old_item[0]
+            old_versions, new_versions = old_item[1], new_item[1]
+            for index in range(max(len(old_versions), len(new_versions))):
+                if index >= len(old_versions):
+                    note(name, "added")
+                    continue
+                if index >= len(new_versions):
+                    note(name, "removed")
+                    continue
+                old_attrs, new_attrs = old_versions[index], new_versions[index]
+                changes = {}
+                for key in sorted(old_attrs.keys() | new_attrs.keys()):
+                    if old_attrs.get(key) != new_attrs.get(key):
+                        changes[key] = [old_attrs.get(key), new_attrs.get(key)]
+                        report["attributes"][key] = report["attributes"].get(key, 0) + 1
+                note(name, "changed" if changes else "unchanged", changes)
+            old_item = next(old_groups, None)
+            new_item = next(new_groups, None)
+
+    return report
+
+
+def parse_number(text):
+    """
+    Leading number of an attribute value ('150mm', '12.5 kg', '1 1/2in') and its unit.
+    Returns (nan, '') for unset values such as '=0/0'.
+    """
+    match = NUMBER_PATTERN.search(text or "")
+    if not match:
+        return float("nan"), ""
+    number, unit = match.group(1), match.group(2)
+    if "/" in number:
+        whole, _, fraction = number.rpartition(" ")
+        numerator, _, denominator = fraction.partition("/")
+        if float(denominator) == 0:
+            return float("nan"), ""
+        return float(whole or 0) + float(numerator) / float(denominator), unit
+    return float(number), unit
+
+
+def _npy_header(descr, rows):
+    """A .npy version 1.0 header padded to NPY_HEADER_BYTES, so it can be rewritten in place."""
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({rows},), }}"
+    header = header.ljust(NPY_HEADER_BYTES - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode('latin-1')
+
+
+class _NpyWriter:
+    """Appends values of one array typecode to a .npy file; the header gets the count on close."""
+
+    DESCR = {"d": "f8", "q": "i8"}
+
+    def __init__(self, path, typecode):
+        self.path = path
+        self.typecode = typecode
+        self.count = 0
+        self.buffer = array(typecode)
+        self.file = open(path, 'wb')
+        self.file.write(_npy_header(self._descr(), 0))
+
+    def _descr(self):
+        return ("<" if sys.byteorder == "little" else ">") + self.DESCR[self.typecode]
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= COLUMNAR_FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.file)
+        self.count += len(self.buffer)
+        self.buffer = array(self.typecode)
+
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self.file.write(_npy_header(self._descr(), self.count))
+        self.file.close()
+
+
+class _ColumnWriter:
+    """One column of a columnar dump: float64 for numeric attributes, offsets + UTF-8 data otherwise."""
+
+    def __init__(self, folder, index, numeric, missing_rows):
+        self.numeric = numeric
+        self.units = {}
+        if numeric:
+            self.file_name = f"c{index}.npy"
+            self.values = _NpyWriter(folder / self.file_name, "d")
+            for _ in range(missing_rows):
+                self.values.append(float("nan"))
+        else:
+            self.file_name = f"c{index}"
+            self.offsets = _NpyWriter(folder / f"{self.file_name}.offsets.npy", "q")
+            self.data = open(folder / f"{self.file_name}.data", 'wb')
+            self.position = 0
+            for _ in range(missing_rows + 1):
+                self.offsets.append(0)
+
+    def append(self, value):
+        if self.numeric:
+            number, unit = parse_number(value)
+            if unit:
+                self.units[unit] = self.units.get(unit, 0) + 1
+            self.values.append(number)
+        else:
+            if value:
+                encoded = value.encode('utf-8')
+                self.data.write(encoded)
+                self.position += len(encoded)
+            self.offsets.append(self.position)
+
+    def close(self):
+        if self.numeric:
+            self.values.close()
+        else:
+            self.offsets.close()
+            self.data.close()
+
+    def describe(self):
+        if self.numeric:
+            unit = max(self.units, key=self.units.get) if self.units else ""
+            return {"kind": "float64", "file": self.file_name, "unit": unit}
+        return {"kind": "string", "file": self.file_name}
+
+
+def convert_attribute_dump(path, target=None, numeric=NUMERIC_ATTRIBUTES):
+    """
+    Streams a CADC dump (plain, .gz or .zst) into the columnar layout: one row per element
+    with '_name', '_type' and one column per attribute. Numeric attributes become float64
+    (NaN when unset), everything else UTF-8 strings ('' when missing). Only one element
+    and a small buffer per column are held in memory. Returns the metadata.
+    """
+    path = Path(path)
+    target = Path(target) if target else path.with_name(path.name.split(".")[0] + COLUMNAR_SUFFIX)
+    partial = target.with_name(target.name + ".partial")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.mkdir(parents=True)
+
+    numeric = {name.upper() for name in numeric}
+    columns, rows = {}, 0
+    try:
+        for name, attributes in iter_cadc_elements(path):
+            element_type = "TUBI" if name.startswith("TUBE ") else next(
+                (value for key, value in attributes.items() if key.upper() == "TYPE"), "")
+            values = {"_name": name, "_type": element_type.upper(), **attributes}
+            for key in values:
+                if key not in columns:
+                    columns[key] = _ColumnWriter(partial, len(columns), key.upper() in numeric, rows)
+            for key, column in columns.items():
+                column.append(values.get(key))
+            rows += 1
+    finally:
+        for column in columns.values():
+            column.close()
+
+    meta = {
+        "source": str(path),
+        "created": time.time(),
+        "rows": rows,
+        "columns": {key: column.describe() for key, column in columns.items()},
+    }
+    atomic_write_text(partial / COLUMNAR_META_FILE_NAME, json.dumps(meta, indent=4))
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(partial, target)
+    return meta
+
+
+def _optional_module(name):
+    """
+    Imports an optional heavy package (numpy, pyarrow) on first use, so the batch
+    callbacks do not pay for it at startup. Returns None when it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _read_npy_raw(path):
+    """Raw little/big endian payload of a .npy written by _NpyWriter (no numpy needed)."""
+    with open(path, 'rb') as f:
+        f.seek(NPY_HEADER_BYTES)
+        return f.read()
+
+
+class ColumnarDump:
+    """
+    Reader of a converted dump for QA and MTO scripts. With numpy installed numeric
+    columns are memory-mapped float64 arrays; without it they are array('d').
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        with open(self.folder / COLUMNAR_META_FILE_NAME, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+
+    @property
+    def columns(self):
+        return list(self.meta["columns"])
+
+    @property
+    def engine(self):
+        """What summarize() runs on: 'numpy' or 'pure Python'."""
+        return "numpy" if _optional_module("numpy") is not None else "pure Python"
+
+    def numeric(self, name):
+        info = self.meta["columns"][name]
+        if info["kind"] != "float64":
+            raise ValueError(f"Column {name} is not numeric")
+        numpy = _optional_module("numpy")
+        if numpy is not None:
+            return numpy.load(self.folder / info["file"], mmap_mode='r')
+        values = array('d')
+        values.frombytes(_read_npy_raw(self.folder / info["file"]))
+        return values
+
+    def strings(self, name):
+        info = self.meta["columns"][name]
+        if info["kind"] != "string":
+            raise ValueError(f"Column {name} is not a string column")
+        offsets = array('q')
+        offsets.frombytes(_read_npy_raw(self.folder / f"{info['file']}.offsets.npy"))
+        data = (self.folder / f"{info['file']}.data").read_bytes()
+        return [data[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+    def summarize(self, by="_type", columns=None):
+        """
+        Count, sum, min and max of every numeric column per group (e.g. per element type),
+        with numpy.bincount when available. Returns {group: {"count": n, column: {...}}}.
+        """
+        columns = columns or [name for name, info in self.meta["columns"].items() if info["kind"] == "float64"]
+        keys = self.strings(by)
+        numpy = _optional_module("numpy")
+        if numpy is not None:
+            index = {}  # dictionary-encode the group column (cheaper than numpy.unique on objects)
+            codes = numpy.fromiter((index.setdefault(key, len(index)) for key in keys), numpy.int64, len(keys))
+            groups, size = list(index), len(index)
+            summary = {group: {"count": int(count)}
+                       for group, count in zip(groups, numpy.bincount(codes, minlength=size))}
+            for name in columns:
+                values = numpy.asarray(self.numeric(name))
+                valid = ~numpy.isnan(values)
+                valid_codes, valid_values = codes[valid], values[valid]
+                counts = numpy.bincount(valid_codes, minlength=size)
+                sums = numpy.bincount(valid_codes, weights=valid_values, minlength=size)
+                minimum = numpy.full(size, numpy.inf)
+                maximum = numpy.full(size, -numpy.inf)
+                numpy.minimum.at(minimum, valid_codes, valid_values)
+                numpy.maximum.at(maximum, valid_codes, valid_values)
+                for index, group in enumerate(groups):
+                    if counts[index]:
+                        summary[group][name] = {"n": int(counts[index]), "sum": float(sums[index]),
+                                                "min": float(minimum[index]), "max": float(maximum[index])}
+            return summary
+
+        summary = {}
+        for key in keys:
+            summary.setdefault(key, {"count": 0})["count"] += 1
+        for name in columns:
+            for key, value in zip(keys, self.numeric(name)):
+                if value != value:  # NaN
+                    continue
+                stats = summary[key].setdefault(name, {"n": 0, "sum": 0.0, "min": value, "max": value})
+                stats["n"] += 1
+                stats["sum"] += value
+                stats["min"] = min(stats["min"], value)
+                stats["max"] = max(stats["max"], value)
+        return summary
+
+    def to_parquet(self, target):
+        """Writes the columns as one Parquet file (needs pyarrow; strings are passed zero-copy)."""
+        pyarrow = _optional_module("pyarrow")
+        if pyarrow is None or _optional_module("pyarrow.parquet") is None:
+            raise RuntimeError("Writing Parquet needs the 'pyarrow' package")
+        arrays = []
+        for name, info in self.meta["columns"].items():
+            if info["kind"] == "float64":
+                buffer = pyarrow.py_buffer(_read_npy_raw(self.folder / info["file"]))
+                arrays.append(pyarrow.Array.from_buffers(pyarrow.float64(), self.rows, [None, buffer]))
+            else:
+                offsets = pyarrow.py_buffer(_read_npy_raw(self.folder / f"{info['file']}.offsets.npy"))
+                data = pyarrow.py_buffer((self.folder / f"{info['file']}.data").read_bytes())
+                arrays.append(pyarrow.LargeStringArray.from_buffers(self.rows, offsets, data))
+        table = pyarrow.Table.from_arrays(arrays, names=list(self.meta["columns"]))
+        pyarrow.parquet.write_table(table, target)
+        return Path(target)
+
+
+class ObjectFilterIndex:
+    """
+    Case-insensitive substring index over the panel entries. Entries are grouped in
+    blocks whose lowercase text is joined into one string, so a query is a few str.find
+    calls per block rather than a Python loop over every entry. Edits only invalidate
+    the blocks at and after the edit; they are rebuilt lazily by the next search.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, items=()):
+        self.reset(items)
+
+    def reset(self, items):
+        self._lower = [item.lower() for item in items]
+        self._blocks = {}     # block number -> (joined text, line start offsets)
+        self._last = None     # (query, rows) of the last search, narrowed while typing
+        for block in range((len(self._lower) + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE):
+            self._block(block)
+
+    def append(self, items):
+        first = len(self._lower)
+        self._lower.extend(item.lower() for item in items)
+        self._invalidate(first)
+
+    def remove_range(self, first, last):
+        del self._lower[first:last + 1]
+        self._invalidate(first)
+
+    def replace(self, row, item):
+        self._lower[row] = item.lower()
+        self._blocks.pop(row // self.BLOCK_SIZE, None)
+        self._last = None
+
+    def _invalidate(self, row):
+        first_block = row // self.BLOCK_SIZE
+        for block in [block for block in self._blocks if block >= first_block]:
+            del self._blocks[block]
+        self._last = None
+
+    def _block(self, block):
+        if block not in self._blocks:
+            texts = self._lower[block * self.BLOCK_SIZE:(block + 1) * self.BLOCK_SIZE]
+            starts = [0, *itertools.accumulate(len(text) + 1 for text in texts)]
+            self._blocks[block] = ("\n".join(texts), starts)
+        return self._blocks[block]
+
+    def search(self, query):
+        """Rows containing `query` in order, or None for an empty query (everything)."""
+        query = query.strip().lower()
+        if not query:
+            self._last = None
+            return None
+
+        if self._last and query.startswith(self._last[0]):
+            rows = [row for row in self._last[1] if query in self._lower[row]]
+        else:
+            rows = []
+            for block in range((len(self._lower) + self.BLOCK_SIZE - 1) // self.BLOCK_SIZE):
+                text, starts = self._block(block)
+                base = block * self.BLOCK_SIZE
+                if text.count(query) > len(starts) // 8:
+                    # Dense hits: testing every entry is cheaper than hopping between them
+                    lower = self._lower[base:base + self.BLOCK_SIZE]
+                    rows.extend(base + line for line, entry in enumerate(lower) if query in entry)
+                    continue
+                pos = text.find(query)
+                while pos != -1:
+                    line = bisect.bisect_right(starts, pos) - 1
+                    rows.append(base + line)
+                    pos = text.find(query, starts[line + 1])
+        self._last = (query, rows)
+        return rows
+
+
+def toggle_exclude(line):
+    """Switches an object list line between include and 'EXCLUDE <path>'."""
+    if line.upper().startswith("EXCLUDE "):
+        return line[len("EXCLUDE "):].strip()
+    return f"EXCLUDE {line}"
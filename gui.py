@@ -0,0 +1,1652 @@
+# -*- coding: utf-8 -*-
+"""Qt user interface. Imported only when the tool starts without command line arguments."""
+
+import sys
+import os
+import time
+from pathlib import Path
+
+# Import necessary components from PyQt6
+from PyQt6.QtGui import QFont, QDesktopServices
+from PyQt6.QtCore import (
+    Qt, QSettings, QUrl, QTime, QPropertyAnimation, QRect, QTimer, QObject, QEvent,
+    QAbstractListModel, QModelIndex, pyqtSignal
+)
+from PyQt6.QtWidgets import (
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QGridLayout,
+    QLabel, QLineEdit, QPushButton, QComboBox, QCheckBox,
+    QFileDialog, QMessageBox, QHBoxLayout, QGroupBox, QStatusBar,
+    QDialog, QTextBrowser, QTimeEdit, QListView, QSpinBox
+)
+
+from core import (
+    ATTRIBUTE_PROFILES_FILE_NAME, DEFAULT_ATTRIBUTE_PROFILE, DEFAULT_COLLECT_TYPES, DEFAULT_MAX_SESSIONS,
+    DEFAULT_TILE_TYPES,
+    DEFAULT_EXPORT_MODE, DEFAULT_QUALITY_PROFILE, DEFAULT_WARM_ROOT, EXPORT_MODES, QUALITY_PROFILES_FILE_NAME,
+    DISCIPLINE_RULES_FILE_NAME, INTERMEDIATES_FOLDER_NAME, RETENTION_DEFAULTS,
+    ExportEstimator, ExportGenerator, PartitionedExport, PipelinedExport, ProjectRegistry, ObjectFilterIndex,
+    load_attribute_profiles, load_type_counts, object_costs, plan_shards, register_schedules, toggle_exclude,
+    catalog_is_stale, load_catalog, load_quality_profiles, quality_project, resolve_object_patterns,
+)
+
+
+WINDOW_WIDTH = 700
+WINDOW_HEIGHT = 1010
+PANEL_WIDTH = 300
+PANEL_SAVE_DELAY_MS = 500  # edits within this window are persisted with one QSettings write
+RUN_INFO_DELAY_MS = 300    # typing a project code re-reads its run history once, after the last key
+
+
+DARK_STYLESHEET = """
+QMainWindow {
+    background-color: #1E1E2E;
+}
+QWidget {
+    background-color: #1E1E2E;
+    color: #CDD6F4;
+    font-family: 'Segoe UI', Arial;
+    font-size: 10pt;
+}
+QLabel {
+    color: #CDD6F4;
+    font-weight: 500;
+}
+QLineEdit {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    border-radius: 6px;
+    padding: 8px;
+    color: #CDD6F4;
+    selection-background-color: #89B4FA;
+}
+QLineEdit:focus {
+    border: 2px solid #89B4FA;
+}
+QComboBox {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    border-radius: 6px;
+    padding: 8px;
+    color: #CDD6F4;
+}
+QComboBox:hover {
+    border: 2px solid #89B4FA;
+}
+QComboBox::drop-down {
+    border: none;
+    width: 30px;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #CDD6F4;
+    margin-right: 10px;
+}
+QComboBox QAbstractItemView {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    selection-background-color: #89B4FA;
+    color: #CDD6F4;
+}
+QPushButton {
+    background-color: #89B4FA;
+    color: #1E1E2E;
+    border: none;
+    border-radius: 6px;
+    padding: 10px 20px;
+    font-weight: bold;
+    min-width: 80px;
+}
+QPushButton:hover {
+    background-color: #74C7EC;
+}
+QPushButton:pressed {
+    background-color: #89DCEB;
+}
+QPushButton#browse {
+    background-color: #585B70;
+    color: #CDD6F4;
+    min-width: 60px;
+    padding: 8px 15px;
+}
+QPushButton#browse:hover {
+    background-color: #6C7086;
+}
+QCheckBox {
+    color: #CDD6F4;
+    spacing: 8px;
+}
+QCheckBox::indicator {
+    width: 20px;
+    height: 20px;
+    border: 2px solid #45475A;
+    border-radius: 4px;
+    background-color: #313244;
+}
+QCheckBox::indicator:checked {
+    background-color: #89B4FA;
+    border-color: #89B4FA;
+}
+QCheckBox::indicator:checked::after {
+    content: "✓";
+    color: #1E1E2E;
+}
+        QTimeEdit {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    border-radius: 6px;
+    padding: 8px;
+    color: #CDD6F4;
+}
+        QComboBox {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    border-radius: 6px;
+    padding: 8px;
+    color: #CDD6F4;
+}
+QComboBox:hover {
+    border: 2px solid #89B4FA;
+}
+QComboBox:focus {
+    border: 2px solid #89B4FA;
+}
+QComboBox::drop-down {
+    border: none;
+    padding-right: 10px;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #CDD6F4;
+    margin-right: 5px;
+}
+QComboBox QAbstractItemView {
+    background-color: #313244;
+    border: 2px solid #45475A;
+    selection-background-color: #89B4FA;
+    selection-color: #1E1E2E;
+    color: #CDD6F4;
+}
+
+QTimeEdit:focus {
+    border: 2px solid #89B4FA;
+}
+QTimeEdit::up-button, QTimeEdit::down-button {
+    background-color: #585B70;
+    border-radius: 3px;
+    width: 16px;
+}
+QTimeEdit::up-button:hover, QTimeEdit::down-button:hover {
+    background-color: #6C7086;
+}
+QTimeEdit:disabled {
+    background-color: #1E1E2E;
+    color: #6C7086;
+}
+
+QMessageBox {
+    background-color: #1E1E2E;
+}
+QMessageBox QLabel {
+    color: #CDD6F4;
+}
+QMessageBox QPushButton {
+    min-width: 70px;
+}
+"""
+
+LIGHT_STYLESHEET = """
+QMainWindow {
+    background-color: #FFFFFF;
+}
+QWidget {
+    background-color: #FFFFFF;
+    color: #2E3440;
+    font-family: 'Segoe UI', Arial;
+    font-size: 10pt;
+}
+QLabel {
+    color: #2E3440;
+    font-weight: 500;
+}
+QLineEdit {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    border-radius: 6px;
+    padding: 8px;
+    color: #2E3440;
+    selection-background-color: #5E81AC;
+}
+QLineEdit:focus {
+    border: 2px solid #5E81AC;
+}
+QComboBox {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    border-radius: 6px;
+    padding: 8px;
+    color: #2E3440;
+}
+QComboBox:hover {
+    border: 2px solid #5E81AC;
+}
+QComboBox::drop-down {
+    border: none;
+    width: 30px;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #2E3440;
+    margin-right: 10px;
+}
+QComboBox QAbstractItemView {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    selection-background-color: #5E81AC;
+    selection-color: #FFFFFF;
+    color: #2E3440;
+}
+QPushButton {
+    background-color: #5E81AC;
+    color: #FFFFFF;
+    border: none;
+    border-radius: 6px;
+    padding: 10px 20px;
+    font-weight: bold;
+    min-width: 80px;
+}
+QPushButton:hover {
+    background-color: #81A1C1;
+}
+QPushButton:pressed {
+    background-color: #4C566A;
+}
+QPushButton#browse {
+    background-color: #E5E9F0;
+    color: #2E3440;
+    border: 1px solid #D8DEE9;
+    min-width: 60px;
+    padding: 8px 15px;
+}
+QPushButton#browse:hover {
+    background-color: #D8DEE9;
+}
+QCheckBox {
+    color: #2E3440;
+    spacing: 8px;
+}
+QCheckBox::indicator {
+    width: 20px;
+    height: 20px;
+    border: 2px solid #D8DEE9;
+    border-radius: 4px;
+    background-color: #FFFFFF;
+}
+QCheckBox::indicator:checked {
+    background-color: #5E81AC;
+    border-color: #5E81AC;
+}
+QCheckBox::indicator:checked::after {
+    content: "✓";
+    color: #FFFFFF;
+}
+        QTimeEdit {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    border-radius: 6px;
+    padding: 8px;
+    color: #2E3440;
+}
+        QComboBox {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    border-radius: 6px;
+    padding: 8px;
+    color: #2E3440;
+}
+QComboBox:hover {
+    border: 2px solid #5E81AC;
+}
+QComboBox:focus {
+    border: 2px solid #5E81AC;
+}
+QComboBox::drop-down {
+    border: none;
+    padding-right: 10px;
+}
+QComboBox::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid #2E3440;
+    margin-right: 5px;
+}
+QComboBox QAbstractItemView {
+    background-color: #FFFFFF;
+    border: 2px solid #D8DEE9;
+    selection-background-color: #5E81AC;
+    selection-color: #FFFFFF;
+    color: #2E3440;
+}
+
+QTimeEdit:focus {
+    border: 2px solid #5E81AC;
+}
+QTimeEdit::up-button, QTimeEdit::down-button {
+    background-color: #E5E9F0;
+    border-radius: 3px;
+    width: 16px;
+}
+QTimeEdit::up-button:hover, QTimeEdit::down-button:hover {
+    background-color: #D8DEE9;
+}
+QTimeEdit:disabled {
+    background-color: #F5F5F5;
+    color: #A0A0A0;
+}
+
+QMessageBox {
+    background-color: #FFFFFF;
+}
+QMessageBox QLabel {
+    color: #2E3440;
+}
+QMessageBox QPushButton {
+    min-width: 70px;
+}
+"""
+
+THEME_STYLESHEETS = {"Dark": DARK_STYLESHEET, "Light": LIGHT_STYLESHEET}
+
+
+class ObjectListModel(QAbstractListModel):
+    """
+    Flat list of object paths with an optional filter. Bulk operations emit one
+    reset/insert/remove per contiguous block instead of one signal per row, so 50k
+    entries load instantly. Rows passed in and out are view rows (filtered).
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._index = ObjectFilterIndex()
+        self._filter = ""
+        self._visible = None  # source rows matching the filter, None = all
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._items) if self._visible is None else len(self._visible)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self._items[self.source_row(index.row())]
+        return None
+
+    def source_row(self, row):
+        return row if self._visible is None else self._visible[row]
+
+    def total_count(self):
+        return len(self._items)
+
+    def items(self):
+        """Copy of all entries in order (ignoring the filter)."""
+        return list(self._items)
+
+    def set_filter(self, text):
+        """Shows only entries containing `text` (case-insensitive)."""
+        self.beginResetModel()
+        self._filter = text
+        self._visible = self._index.search(text)
+        self.endResetModel()
+
+    def set_items(self, items):
+        """Replaces the whole list with one model reset."""
+        self.beginResetModel()
+        self._items = [item.strip() for item in items if item.strip()]
+        self._index.reset(self._items)
+        self._visible = self._index.search(self._filter)
+        self.endResetModel()
+
+    def add_items(self, items):
+        """Appends entries with one insert signal."""
+        items = [item.strip() for item in items if item.strip()]
+        if not items:
+            return
+        if self._visible is not None:
+            self.beginResetModel()
+            self._items.extend(items)
+            self._index.append(items)
+            self._visible = self._index.search(self._filter)
+            self.endResetModel()
+            return
+        first = len(self._items)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self._items.extend(items)
+        self._index.append(items)
+        self.endInsertRows()
+
+    def remove_rows(self, rows):
+        """Removes the given rows, one remove signal per contiguous block (bottom-up)."""
+        rows = sorted({self.source_row(row) for row in rows}, reverse=True)
+        filtered = self._visible is not None
+        if filtered:
+            self.beginResetModel()
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            if not filtered:
+                self.beginRemoveRows(QModelIndex(), first, last)
+            del self._items[first:last + 1]
+            self._index.remove_range(first, last)
+            if not filtered:
+                self.endRemoveRows()
+        if filtered:
+            self._visible = self._index.search(self._filter)
+            self.endResetModel()
+
+    def toggle_exclude(self, rows):
+        """Switches the given rows between include and EXCLUDE."""
+        for row in rows:
+            source = self.source_row(row)
+            self._items[source] = toggle_exclude(self._items[source])
+            self._index.replace(source, self._items[source])
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+
+class SidePanel(QWidget):
+    """
+    Side panel widget for managing default object lists per project.
+    """
+
+    # Emitted on user edits only (not on set_items), so loading a project never saves it
+    items_changed = pyqtSignal()
+
+    def __init__(self, model, parent=None, catalog=None):
+        super().__init__(parent)
+        self.model = model
+        self.catalog = catalog  # callable returning the cached site/zone catalog, or None
+        self.setFixedWidth(PANEL_WIDTH)
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Initialize the side panel UI."""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(10)
+
+        # Header
+        header = QLabel("📋 Default Object List")
+        header.setStyleSheet("font-weight: bold; font-size: 14px;")
+        layout.addWidget(header)
+
+        # Info label
+        info = QLabel("Objects used when SITE.txt is not specified:")
+        info.setWordWrap(True)
+        info.setStyleSheet("font-size: 11px; color: gray;")
+        layout.addWidget(info)
+
+        self.catalog_label = QLabel("")
+        self.catalog_label.setWordWrap(True)
+        self.catalog_label.setStyleSheet("font-size: 11px; color: gray;")
+        self.catalog_label.setToolTip("Sites and zones offered when adding objects. Patterns such as "
+                                      "/U109A:* are expanded against this catalog when the files are generated.")
+        layout.addWidget(self.catalog_label)
+
+        # Filter box
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("🔍 Filter objects...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter_edit)
+
+        # List view (rows are created lazily by the view, only for visible entries)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setAlternatingRowColors(True)
+        self.list_view.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        layout.addWidget(self.list_view)
+
+        self.count_label = QLabel("")
+        self.count_label.setStyleSheet("font-size: 11px; color: gray;")
+        layout.addWidget(self.count_label)
+        for signal in (self.model.modelReset, self.model.rowsInserted, self.model.rowsRemoved):
+            signal.connect(self._update_count)
+        self._update_count()
+
+        # Button layout
+        btn_layout = QHBoxLayout()
+
+        self.btn_add = QPushButton("➕ Add")
+        self.btn_add.clicked.connect(self.add_item)
+        btn_layout.addWidget(self.btn_add)
+
+        self.btn_remove = QPushButton("➖ Remove")
+        self.btn_remove.setToolTip("Remove the selected objects")
+        self.btn_remove.clicked.connect(self.remove_item)
+        btn_layout.addWidget(self.btn_remove)
+
+        self.btn_exclude = QPushButton("🚫 Excl.")
+        self.btn_exclude.setToolTip("Toggle include / EXCLUDE for the selected objects")
+        self.btn_exclude.clicked.connect(self.toggle_exclude)
+        btn_layout.addWidget(self.btn_exclude)
+
+        self.btn_clear = QPushButton("🗑️ Clear")
+        self.btn_clear.clicked.connect(self.clear_all)
+        btn_layout.addWidget(self.btn_clear)
+
+        layout.addLayout(btn_layout)
+
+    def add_item(self):
+        """Add a new item to the list, completing site and zone names from the catalog."""
+        from PyQt6.QtWidgets import QInputDialog, QCompleter
+        dialog = QInputDialog(self)
+        dialog.setWindowTitle("Add Object")
+        dialog.setLabelText("Enter object path or pattern (e.g. /U109A:*):")
+        dialog.setInputMode(QInputDialog.InputMode.TextInput)
+        catalog = self.catalog() if self.catalog else None
+        if catalog:
+            completer = QCompleter([entry["name"] for entry in catalog["entries"]], dialog)
+            completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+            completer.setFilterMode(Qt.MatchFlag.MatchContains)
+            dialog.findChild(QLineEdit).setCompleter(completer)
+        if dialog.exec() and dialog.textValue().strip():
+            self.model.add_items([dialog.textValue()])
+            self.items_changed.emit()
+
+    def update_catalog_status(self):
+        """Shows the size and age of the catalog used for completion and patterns."""
+        catalog = self.catalog() if self.catalog else None
+        if catalog is None:
+            self.catalog_label.setText("🗂️ No catalog yet: 'main.py catalog settings.json' caches the sites and zones")
+            return
+        hours = (time.time() - catalog["recorded"]) / 3600
+        stale = " (stale, rescan with 'main.py catalog')" if catalog_is_stale(catalog) else ""
+        self.catalog_label.setText(f"🗂️ Catalog: {len(catalog['entries'])} sites/zones, {hours:.0f} h old{stale}")
+
+    def selected_rows(self):
+        """View rows of the selection, or of the current item if nothing is selected."""
+        rows = [index.row() for index in self.list_view.selectionModel().selectedRows()]
+        if not rows and self.list_view.currentIndex().isValid():
+            rows = [self.list_view.currentIndex().row()]
+        return rows
+
+    def remove_item(self):
+        """Remove selected items from the list."""
+        rows = self.selected_rows()
+        if rows:
+            self.model.remove_rows(rows)
+            self.items_changed.emit()
+
+    def toggle_exclude(self):
+        """Toggle include / EXCLUDE for the selected items."""
+        rows = self.selected_rows()
+        if rows:
+            self.model.toggle_exclude(rows)
+            self.items_changed.emit()
+
+    def apply_filter(self, text):
+        """Show only the objects containing the filter text."""
+        self.model.set_filter(text)
+
+    def _update_count(self, *args):
+        total = self.model.total_count()
+        shown = self.model.rowCount()
+        self.count_label.setText(f"{total} objects" if shown == total else f"{shown} of {total} objects")
+
+    def clear_all(self):
+        """Clear all items."""
+        reply = QMessageBox.question(
+            self, "Clear List",
+            "Are you sure you want to clear all items?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.model.set_items([])
+            self.items_changed.emit()
+
+    def set_items(self, items):
+        """Set list items from a list."""
+        self.model.set_items(items)
+
+    def get_items(self):
+        """Get all items as a list."""
+        return self.model.items()
+
+
+class AppGUI(QMainWindow):
+    """
+    Main application GUI class for generating AVEVA E3D export files.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.settings = QSettings('3DDesignMagic', 'E3DExporter')
+        self.projects = ProjectRegistry()
+        # Styling before the widgets exist polishes each widget once, at creation
+        self.applied_theme = None
+        self._apply_stylesheet(self.settings.value('theme', 'Dark'))
+        self.side_panel = None  # built on first use (toggle_side_panel)
+        self.info_dialog = None
+        self.object_model = ObjectListModel(self)
+        self.panel_project = None
+        self.panel_save_timer = QTimer(self)
+        self.panel_save_timer.setSingleShot(True)
+        self.panel_save_timer.setInterval(PANEL_SAVE_DELAY_MS)
+        self.run_info_timer = QTimer(self)
+        self.run_info_timer.setSingleShot(True)
+        self.run_info_timer.setInterval(RUN_INFO_DELAY_MS)
+        self.initUI()
+        self.load_theme()
+        self.connect_signals()
+        if self.projects.error:
+            QMessageBox.warning(self, "Project Registry", f"Project registry could not be loaded:\n{self.projects.error}")
+
+    def initUI(self):
+        """
+        Initializes the user interface with improved structure and grouping.
+        """
+        self.setWindowTitle("Export E3D To Navis App")
+        self.setFixedSize(WINDOW_WIDTH, WINDOW_HEIGHT)  # ارتفاع رو کمی بیشتر کردم برای جا دادن time picker
+
+        # Central Widget and Layout
+        central_widget = QWidget(self)
+        self.setCentralWidget(central_widget)
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setContentsMargins(20, 20, 20, 10)
+        main_layout.setSpacing(15)
+
+        # --- Theme Selection ---
+        theme_layout = QHBoxLayout()
+        theme_label = QLabel("🎨 Interface Theme:")
+        self.combo_mode = QComboBox()
+        self.combo_mode.addItems(["Light", "Dark"])
+        self.combo_mode.setCurrentText("Dark")
+        self.combo_mode.setToolTip("Select your preferred theme")
+        theme_layout.addWidget(theme_label)
+        theme_layout.addWidget(self.combo_mode)
+        theme_layout.addStretch()
+        main_layout.addLayout(theme_layout)
+
+        # --- AVEVA Configuration Group ---
+        aveva_group = QGroupBox("AVEVA E3D Configuration")
+        aveva_group.setStyleSheet("QGroupBox { font-weight: bold; padding-top: 10px; }")
+        aveva_layout = QGridLayout()
+        aveva_layout.setHorizontalSpacing(15)
+        aveva_layout.setVerticalSpacing(10)
+
+        self.labels = {}
+        self.line_edits = {}
+        self.buttons = {}
+
+        # AVEVA Folder
+        self.labels["aveva_folder"] = QLabel("📁 AVEVA Folder:")
+        self.line_edits["aveva_folder"] = QLineEdit("C:/Program Files (x86)/AVEVA/Everything3D3.1")
+        self.line_edits["aveva_folder"].setToolTip("Path to AVEVA E3D installation folder")
+        self.buttons["browse_aveva"] = QPushButton("📂 Browse")
+        self.buttons["browse_aveva"].setObjectName("browse")
+        self.buttons["browse_aveva"].setToolTip("Browse for AVEVA folder")
+
+        aveva_layout.addWidget(self.labels["aveva_folder"], 0, 0)
+        aveva_layout.addWidget(self.line_edits["aveva_folder"], 0, 1)
+        aveva_layout.addWidget(self.buttons["browse_aveva"], 0, 2)
+
+        aveva_group.setLayout(aveva_layout)
+        main_layout.addWidget(aveva_group)
+
+        # --- Project Information Group ---
+        project_group = QGroupBox("Project Information")
+        project_group.setStyleSheet("QGroupBox { font-weight: bold; padding-top: 10px; }")
+        project_layout = QGridLayout()
+        project_layout.setHorizontalSpacing(15)
+        project_layout.setVerticalSpacing(10)
+
+        # Project Code (ComboBox با امکان ویرایش)
+        self.labels["proj_code"] = QLabel("🏗️ Project Code:")
+        self.combo_proj_code = QComboBox()
+        self.combo_proj_code.setEditable(True)  # امکان تایپ دستی
+        self.combo_proj_code.addItems(list(self.projects.projects()))
+        self.combo_proj_code.setCurrentText("PBZ")  # پیش‌فرض
+        self.combo_proj_code.setToolTip("Select or enter your project code")
+        project_layout.addWidget(self.labels["proj_code"], 0, 0)
+        project_layout.addWidget(self.combo_proj_code, 0, 1, 1, 2)
+
+        # User
+        self.labels["user"] = QLabel("👤 User:")
+        self.line_edits["user"] = QLineEdit("PASHAEI")
+        self.line_edits["user"].setToolTip("AVEVA username")
+        project_layout.addWidget(self.labels["user"], 1, 0)
+        project_layout.addWidget(self.line_edits["user"], 1, 1, 1, 2)
+
+        # Password
+        self.labels["password"] = QLabel("🔑 Password:")
+        self.line_edits["password"] = QLineEdit("PA02")
+        self.line_edits["password"].setEchoMode(QLineEdit.EchoMode.Password)
+        self.line_edits["password"].setToolTip("AVEVA password")
+        project_layout.addWidget(self.labels["password"], 2, 0)
+        project_layout.addWidget(self.line_edits["password"], 2, 1, 1, 2)
+
+        # MDB (فقط نمایش، خودکار پر میشه)
+        self.labels["mdb"] = QLabel("💾 MDB:")
+        self.line_edits["mdb"] = QLineEdit("/P2-ALL-PLANT")
+        self.line_edits["mdb"].setToolTip("Master Database name (auto-filled based on project)")
+        project_layout.addWidget(self.labels["mdb"], 3, 0)
+        project_layout.addWidget(self.line_edits["mdb"], 3, 1, 1, 2)
+
+        project_group.setLayout(project_layout)
+        main_layout.addWidget(project_group)
+
+        # --- Export Settings Group ---
+        export_group = QGroupBox("Export Settings")
+        export_group.setStyleSheet("QGroupBox { font-weight: bold; padding-top: 10px; }")
+        export_layout = QGridLayout()
+        export_layout.setHorizontalSpacing(15)
+        export_layout.setVerticalSpacing(10)
+
+        # Output Folder
+        self.labels["output_folder"] = QLabel("📤 Output Folder:")
+        self.line_edits["output_folder"] = QLineEdit("C:/Users/h.izadi/Downloads")
+        self.line_edits["output_folder"].setToolTip("Folder where exported files will be saved")
+        self.buttons["browse_output"] = QPushButton("📂 Browse")
+        self.buttons["browse_output"].setObjectName("browse")
+        export_layout.addWidget(self.labels["output_folder"], 0, 0)
+        export_layout.addWidget(self.line_edits["output_folder"], 0, 1)
+        export_layout.addWidget(self.buttons["browse_output"], 0, 2)
+
+        # Navisworks Folder
+        self.labels["navis_folder"] = QLabel("🔧 Navisworks Folder:")
+        self.line_edits["navis_folder"] = QLineEdit("C:/Program Files/Autodesk/Navisworks Manage 2020")
+        self.line_edits["navis_folder"].setToolTip("Path to Navisworks installation")
+        self.buttons["browse_navis"] = QPushButton("📂 Browse")
+        self.buttons["browse_navis"].setObjectName("browse")
+        export_layout.addWidget(self.labels["navis_folder"], 1, 0)
+        export_layout.addWidget(self.line_edits["navis_folder"], 1, 1)
+        export_layout.addWidget(self.buttons["browse_navis"], 1, 2)
+
+        # Object List
+        self.labels["object_list"] = QLabel("📋 Object List (.txt):")
+        self.line_edits["object_list"] = QLineEdit("")
+        self.line_edits["object_list"].setToolTip("Text file containing objects to export")
+        self.buttons["browse_objects"] = QPushButton("📂 Browse")
+        self.buttons["browse_objects"].setObjectName("browse")
+        export_layout.addWidget(self.labels["object_list"], 2, 0)
+        export_layout.addWidget(self.line_edits["object_list"], 2, 1)
+        export_layout.addWidget(self.buttons["browse_objects"], 2, 2)
+
+        # Scratch Folder (optional local staging for intermediate files)
+        self.labels["scratch_folder"] = QLabel("⚡ Scratch Folder:")
+        self.line_edits["scratch_folder"] = QLineEdit("")
+        self.line_edits["scratch_folder"].setPlaceholderText("Optional - fast local disk for TEMP.RVM / TEMP.txt")
+        self.line_edits["scratch_folder"].setToolTip(
+            "If set, intermediate files are written here and only the final NWD\n"
+            "is copied (checksum-verified) to the output folder")
+        self.buttons["browse_scratch"] = QPushButton("📂 Browse")
+        self.buttons["browse_scratch"].setObjectName("browse")
+        export_layout.addWidget(self.labels["scratch_folder"], 3, 0)
+        export_layout.addWidget(self.line_edits["scratch_folder"], 3, 1)
+        export_layout.addWidget(self.buttons["browse_scratch"], 3, 2)
+
+        export_group.setLayout(export_layout)
+        main_layout.addWidget(export_group)
+
+        # --- Export Options Group ---
+        options_group = QGroupBox("Export Options")
+        options_group.setStyleSheet("QGroupBox { font-weight: bold; padding-top: 10px; }")
+        options_layout = QVBoxLayout()
+        options_layout.setSpacing(12)
+
+        # Export mode: geometry and attributes, or only one of them (each with its own schedule)
+        mode_layout = QHBoxLayout()
+        self.label_export_mode = QLabel("📊 Export:")
+        self.combo_export_mode = QComboBox()
+        for mode, label in EXPORT_MODES.items():
+            self.combo_export_mode.addItem(label, mode)
+        self.combo_export_mode.setToolTip(
+            "Geometry only: no attribute dump (fast refresh, NWD without properties)\n"
+            "Attributes only: no RVM/NWD, the dump is published as <PROJ>-attributes.txt\n"
+            "The daily schedule below belongs to the selected mode")
+        mode_layout.addWidget(self.label_export_mode)
+        mode_layout.addWidget(self.combo_export_mode)
+
+        # Quality profile (per project): RVM export options, e.g. a fast preview without holes
+        quality_profiles = load_quality_profiles()
+        self.label_quality_profile = QLabel("🎚️ Quality:")
+        self.combo_quality_profile = QComboBox()
+        self.combo_quality_profile.addItems(list(quality_profiles))
+        self.combo_quality_profile.setCurrentText(DEFAULT_QUALITY_PROFILE)
+        self.combo_quality_profile.setToolTip(
+            "\n".join(f"{name}: {profile.get('description', '')}" for name, profile in quality_profiles.items())
+            + f"\n(extend with {QUALITY_PROFILES_FILE_NAME} next to the application)")
+        mode_layout.addWidget(self.label_quality_profile)
+        mode_layout.addWidget(self.combo_quality_profile)
+        mode_layout.addStretch()
+        options_layout.addLayout(mode_layout)
+
+        # Single pass: the attribute dump runs inline, right before the geometry export
+        self.checkbox_single_pass = QCheckBox("🔂 Single Pass (attributes and geometry in one macro)")
+        self.checkbox_single_pass.setToolTip(
+            "Dump the attributes inside RVM.mac right before exporting the geometry, so the export\n"
+            "reads the model the dump has just loaded; TEMP.txt is the same as with attribute.mac\n"
+            "(not used by pipelined exports). Compare the run times with 'main.py single-pass-report'")
+        self.checkbox_single_pass.setChecked(False)
+        options_layout.addWidget(self.checkbox_single_pass)
+
+        # Attribute Profile (per project)
+        profile_layout = QHBoxLayout()
+        profile_layout.setContentsMargins(30, 0, 0, 0)  # Indent from left
+        self.label_attribute_profile = QLabel("🧾 Attribute Profile:")
+        self.combo_attribute_profile = QComboBox()
+        self.combo_attribute_profile.addItems(list(load_attribute_profiles()))
+        self.combo_attribute_profile.setCurrentText(DEFAULT_ATTRIBUTE_PROFILE)
+        self.combo_attribute_profile.setToolTip(
+            "Which attributes attribute.mac evaluates per element type\n"
+            f"(extend with {ATTRIBUTE_PROFILES_FILE_NAME} next to the application)")
+        profile_layout.addWidget(self.label_attribute_profile)
+        profile_layout.addWidget(self.combo_attribute_profile)
+
+        # Element types collected for the attribute dump (per project)
+        self.label_collect_types = QLabel("Types:")
+        self.line_edits["collect_types"] = QLineEdit("")
+        self.line_edits["collect_types"].setPlaceholderText("Default: all types")
+        profile_layout.addWidget(self.label_collect_types)
+        profile_layout.addWidget(self.line_edits["collect_types"], 1)
+        options_layout.addLayout(profile_layout)
+
+        # Element types a tiled export ('main.py tile') exports per tile (per project)
+        tile_layout = QHBoxLayout()
+        tile_layout.setContentsMargins(30, 0, 0, 0)
+        self.label_tile_types = QLabel("🧩 Tile Types:")
+        self.line_edits["tile_types"] = QLineEdit("")
+        self.line_edits["tile_types"].setPlaceholderText(f"Default: {' '.join(DEFAULT_TILE_TYPES)}")
+        self.line_edits["tile_types"].setToolTip(
+            "Element types a tiled export writes per tile (space separated); other types are left out.\n"
+            f"Default: {' '.join(DEFAULT_TILE_TYPES)}. 'main.py tile' and 'main.py tile-report' count the\n"
+            "elements of the last Attributes only dump that no tile type covers")
+        tile_layout.addWidget(self.label_tile_types)
+        tile_layout.addWidget(self.line_edits["tile_types"], 1)
+        options_layout.addLayout(tile_layout)
+
+        # Keep Intermediates Checkbox
+        self.checkbox_keep_intermediates = QCheckBox("🗄️ Keep Compressed Intermediates (TEMP.RVM / TEMP.txt)")
+        self.checkbox_keep_intermediates.setToolTip(
+            f"Archive the intermediates of the last {RETENTION_DEFAULTS['keep_runs']} runs per project "
+            f"in '{INTERMEDIATES_FOLDER_NAME}' instead of deleting them")
+        self.checkbox_keep_intermediates.setChecked(False)
+        options_layout.addWidget(self.checkbox_keep_intermediates)
+
+        # Warm session: reuse one running E3D for back-to-back exports of the same project and MDB
+        self.checkbox_warm_session = QCheckBox("♨️ Warm E3D Session (reuse a running E3D)")
+        self.checkbox_warm_session.setToolTip(
+            "Run the export in a long-lived E3D session of this project and MDB instead of starting E3D\n"
+            "every time; it is restarted after a number of jobs (main.py warm-status / warm-stop)")
+        self.checkbox_warm_session.setChecked(False)
+        options_layout.addWidget(self.checkbox_warm_session)
+
+        # Discipline split: one E3D session and NWD per discipline, federated in an NWF
+        split_layout = QHBoxLayout()
+        self.checkbox_split_disciplines = QCheckBox("🧩 Split by Discipline (parallel NWDs + NWF)")
+        self.checkbox_split_disciplines.setToolTip(
+            "Export EL / EQ / PI / ST / IN / supports as separate NWDs in parallel E3D sessions\n"
+            f"and federate them in <PROJ>.nwf (rules: {DISCIPLINE_RULES_FILE_NAME})")
+        self.checkbox_split_disciplines.setChecked(False)
+        self.label_max_sessions = QLabel("Sessions:")
+        self.spin_max_sessions = QSpinBox()
+        self.spin_max_sessions.setRange(1, 16)
+        self.spin_max_sessions.setValue(DEFAULT_MAX_SESSIONS)
+        self.spin_max_sessions.setToolTip("Maximum number of E3D sessions running at the same time")
+        self.spin_max_sessions.setEnabled(False)
+        self.checkbox_pipeline = QCheckBox("⏩ Pipelined")
+        self.checkbox_pipeline.setToolTip(
+            "Export the disciplines one after another in a single E3D session and convert each\n"
+            "to NWD in the background while the next one exports (one E3D licence)")
+        self.checkbox_pipeline.setEnabled(False)
+        self.checkbox_balanced = QCheckBox("⚖️ Balanced")
+        self.checkbox_balanced.setToolTip(
+            "Instead of disciplines, split the list into one shard per session with equal predicted\n"
+            "export time (per-object timings of past runs, or 'main.py prescan' element counts)")
+        self.checkbox_balanced.setEnabled(False)
+        split_layout.addWidget(self.checkbox_split_disciplines)
+        split_layout.addWidget(self.checkbox_pipeline)
+        split_layout.addWidget(self.checkbox_balanced)
+        split_layout.addStretch()
+        split_layout.addWidget(self.label_max_sessions)
+        split_layout.addWidget(self.spin_max_sessions)
+        options_layout.addLayout(split_layout)
+
+        # Daily Export Checkbox
+        self.checkbox_daily_export = QCheckBox("📅 Enable Daily Export Scheduling")
+        self.checkbox_daily_export.setToolTip("Schedule automatic daily exports")
+        self.checkbox_daily_export.setChecked(False)
+        options_layout.addWidget(self.checkbox_daily_export)
+
+        # Time Selection (initially hidden)
+        time_layout = QHBoxLayout()
+        time_layout.setContentsMargins(30, 5, 0, 5)  # Indent from left
+
+        self.label_export_time = QLabel("⏰ Export Time:")
+        self.label_export_time.setEnabled(False)
+
+        self.time_edit_export = QTimeEdit()
+        self.time_edit_export.setDisplayFormat("HH:mm")
+        self.time_edit_export.setTime(QTime(0, 0))  # Default: 00:00
+        self.time_edit_export.setEnabled(False)
+        self.time_edit_export.setToolTip("Select the time for daily export (24-hour format)")
+        self.time_edit_export.setMinimumWidth(100)
+
+        # Estimated duration of the export from the run history (see ExportEstimator)
+        self.label_estimate = QLabel("")
+        self.label_estimate.setStyleSheet("color: gray;")
+
+        self.label_export_every = QLabel("🔁 Every:")
+        self.label_export_every.setEnabled(False)
+        self.spin_export_every = QSpinBox()
+        self.spin_export_every.setRange(0, 12)
+        self.spin_export_every.setSuffix(" h")
+        self.spin_export_every.setSpecialValueText("once")
+        self.spin_export_every.setToolTip("Repeat the export every N hours after the start time (once = daily)")
+        self.spin_export_every.setEnabled(False)
+
+        time_layout.addWidget(self.label_export_time)
+        time_layout.addWidget(self.time_edit_export)
+        time_layout.addWidget(self.label_export_every)
+        time_layout.addWidget(self.spin_export_every)
+
+        # The schedule of a mode may run another quality than the project's, e.g. a morning preview
+        self.combo_schedule_quality = QComboBox()
+        self.combo_schedule_quality.addItem("Project quality", "")
+        for name in quality_profiles:
+            self.combo_schedule_quality.addItem(name, name)
+        self.combo_schedule_quality.setToolTip("Quality profile of the scheduled runs of this mode")
+        self.combo_schedule_quality.setEnabled(False)
+        time_layout.addWidget(self.combo_schedule_quality)
+        time_layout.addWidget(self.label_estimate)
+        time_layout.addStretch()
+
+        options_layout.addLayout(time_layout)
+        options_group.setLayout(options_layout)
+        main_layout.addWidget(options_group)
+
+        # --- Action Buttons ---
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+
+        self.buttons["generate"] = QPushButton("⚡ Generate & Run")
+        self.buttons["generate"].setToolTip("Generate export files and execute")
+        self.buttons["generate"].setMinimumWidth(150)
+
+        self.buttons["info"] = QPushButton("ℹ️ About")
+        self.buttons["info"].setToolTip("About this application")
+        self.buttons["info"].setMinimumWidth(100)
+
+        button_layout.addWidget(self.buttons["generate"])
+        button_layout.addWidget(self.buttons["info"])
+        button_layout.addStretch()
+        main_layout.addLayout(button_layout)
+
+        # --- Status Bar ---
+        self.status_bar = QStatusBar()
+        self.setStatusBar(self.status_bar)
+        self.status_bar.showMessage("Ready to export | 3D DESIGN MAGIC")
+
+        # Toggle button for side panel
+        self.btn_toggle_panel = QPushButton("◄", self)
+        self.btn_toggle_panel.setGeometry(WINDOW_WIDTH - 30, 10, 25, 50)
+        self.btn_toggle_panel.setToolTip("Show/Hide Object List Panel")
+        self.btn_toggle_panel.clicked.connect(self.toggle_side_panel)
+        self.panel_visible = False
+    def apply_dark_theme(self):
+        """اعمال تم تاریک"""
+        self._apply_stylesheet("Dark")
+
+    def apply_light_theme(self):
+        """اعمال تم روشن"""
+        self._apply_stylesheet("Light")
+
+    def _apply_stylesheet(self, theme_name):
+        """Applies a theme stylesheet; re-applying the current one (a full re-polish) is skipped."""
+        if self.applied_theme == theme_name:
+            return
+        self.setStyleSheet(THEME_STYLESHEETS.get(theme_name, DARK_STYLESHEET))
+        self.applied_theme = theme_name
+
+    def connect_signals(self):
+        """
+        Connects widget signals to corresponding slots (functions).
+        """
+        # Theme change
+        self.combo_mode.currentTextChanged.connect(self.on_theme_changed)
+
+        # Project Code auto-fill MDB
+        self.combo_proj_code.currentTextChanged.connect(self._on_project_changed)
+
+        # Browse buttons
+        self.buttons["browse_aveva"].clicked.connect(lambda: self._browse_folder(self.line_edits["aveva_folder"]))
+        self.buttons["browse_output"].clicked.connect(lambda: self._browse_folder(self.line_edits["output_folder"]))
+        self.buttons["browse_navis"].clicked.connect(lambda: self._browse_folder(self.line_edits["navis_folder"]))
+        self.buttons["browse_objects"].clicked.connect(
+            lambda: self._browse_file(self.line_edits["object_list"], "Text files (*.txt)"))
+        self.buttons["browse_scratch"].clicked.connect(lambda: self._browse_folder(self.line_edits["scratch_folder"]))
+
+        # Main action buttons
+        self.buttons["generate"].clicked.connect(self.generate_files)
+        self.buttons["info"].clicked.connect(self._show_info_dialog)
+
+        # Daily export checkbox controls time edit visibility
+        self.checkbox_daily_export.stateChanged.connect(self._on_daily_export_changed)
+
+        # Remember the retention choice
+        self.checkbox_keep_intermediates.toggled.connect(
+            lambda checked: self.settings.setValue('keep_intermediates', checked))
+
+        self.checkbox_warm_session.toggled.connect(lambda checked: self.settings.setValue('warm_session', checked))
+        self.checkbox_single_pass.toggled.connect(lambda checked: self.settings.setValue('single_pass', checked))
+
+        # Export mode: its schedule and the options that only apply to some modes
+        self.combo_export_mode.currentIndexChanged.connect(self._on_export_mode_changed)
+        self.time_edit_export.timeChanged.connect(self._save_mode_schedule)
+        self.spin_export_every.valueChanged.connect(self._save_mode_schedule)
+        self.combo_schedule_quality.currentIndexChanged.connect(self._save_mode_schedule)
+        self.combo_schedule_quality.currentIndexChanged.connect(self._schedule_run_info)
+
+        # Remember the discipline split choice
+        self.checkbox_split_disciplines.toggled.connect(self._update_split_options)
+        self.checkbox_pipeline.toggled.connect(self._update_split_options)
+        self.checkbox_split_disciplines.toggled.connect(
+            lambda checked: self.settings.setValue('split_disciplines', checked))
+        self.checkbox_pipeline.toggled.connect(lambda checked: self.settings.setValue('pipeline_parts', checked))
+        self.checkbox_balanced.toggled.connect(self._update_split_options)
+        self.checkbox_balanced.toggled.connect(lambda checked: self.settings.setValue('balanced_shards', checked))
+        self.spin_max_sessions.valueChanged.connect(lambda value: self.settings.setValue('max_sessions', value))
+
+        # Project code change loads corresponding object list and options
+        self.combo_proj_code.currentTextChanged.connect(self.load_panel_objects)
+        self.combo_proj_code.currentTextChanged.connect(self.load_project_options)
+        self.combo_attribute_profile.currentTextChanged.connect(self.save_project_options)
+        self.combo_quality_profile.currentTextChanged.connect(self.save_project_options)
+        self.combo_quality_profile.currentTextChanged.connect(self._schedule_run_info)
+        self.time_edit_export.timeChanged.connect(self._schedule_run_info)
+        self.line_edits["output_folder"].editingFinished.connect(self._schedule_run_info)
+        # Run history and type counts are read from disk: a burst of changes is one read
+        self.run_info_timer.timeout.connect(self._update_run_info)
+        self.line_edits["collect_types"].editingFinished.connect(self.save_project_options)
+        self.line_edits["tile_types"].editingFinished.connect(self.save_project_options)
+
+        # Save panel objects when the list changes (debounced: a burst of edits is one write)
+        self.panel_save_timer.timeout.connect(self.save_panel_objects)
+
+    def _on_project_changed(self, project_code):
+        """Auto-fill MDB and the scheduled export time from the project registry."""
+        entry = self.projects.get(project_code)
+        if not entry:
+            return
+
+        # اگر پروژه در رجیستری باشد، MDB رو پر کن
+        if entry.get("mdb"):
+            self.line_edits["mdb"].setText(entry["mdb"])
+        schedule = QTime.fromString(entry.get("schedule") or "", "HH:mm")
+        if schedule.isValid():
+            self.time_edit_export.setTime(schedule)
+
+    def load_theme(self):
+        """بارگذاری و اعمال تم ذخیره شده"""
+        saved_theme = self.settings.value('theme', 'Dark')  # پیش‌فرض Dark
+        self.combo_mode.setCurrentText(saved_theme)
+        self.on_theme_changed(saved_theme)
+
+        # Load retention choice
+        self.checkbox_keep_intermediates.setChecked(self.settings.value('keep_intermediates', False, type=bool))
+        self.checkbox_warm_session.setChecked(self.settings.value('warm_session', False, type=bool))
+        self.checkbox_single_pass.setChecked(self.settings.value('single_pass', False, type=bool))
+
+        # Load discipline split choice
+        self.checkbox_split_disciplines.setChecked(self.settings.value('split_disciplines', False, type=bool))
+        self.spin_max_sessions.setValue(self.settings.value('max_sessions', DEFAULT_MAX_SESSIONS, type=int))
+        self.checkbox_pipeline.setChecked(self.settings.value('pipeline_parts', False, type=bool))
+        self.checkbox_balanced.setChecked(self.settings.value('balanced_shards', False, type=bool))
+
+        # Load local scratch folder (machine specific, empty = write directly to output)
+        self.line_edits["scratch_folder"].setText(self.settings.value('scratch_folder', '', type=str))
+
+        # Load export mode and its daily export schedule (after the split choice it may override)
+        mode = self.settings.value('export_mode', DEFAULT_EXPORT_MODE, type=str)
+        self.combo_export_mode.setCurrentIndex(max(0, self.combo_export_mode.findData(mode)))
+        self._on_export_mode_changed()
+
+        # Load panel objects and options for current project
+        self.load_panel_objects()
+        self.load_project_options()
+
+    def on_theme_changed(self, theme_name):
+        """تغییر تم بر اساس انتخاب کاربر"""
+        if theme_name == "Light":
+            self.apply_light_theme()
+        else:
+            self.apply_dark_theme()
+
+        # ذخیره تنظیمات
+        self.settings.setValue('theme', theme_name)
+
+    def _browse_folder(self, line_edit):
+        """Opens a dialog to select a folder and sets the path to the line edit."""
+        folder_path = QFileDialog.getExistingDirectory(self, "Select Folder")
+        if folder_path:
+            line_edit.setText(folder_path.replace("\\", "/"))
+
+    def _browse_file(self, line_edit, file_filter):
+        """Opens a dialog to select a file and sets the path to the line edit."""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select File", "", file_filter)
+        if file_path:
+            line_edit.setText(file_path.replace("\\", "/"))
+
+    def _show_info_dialog(self):
+        """Displays a professional About dialog with detailed information (built once)."""
+        if self.info_dialog is None:
+            self.info_dialog = self._build_info_dialog()
+        self.info_dialog.exec()
+
+    def _build_info_dialog(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("About - Export E3D to Navisworks")
+        dialog.setFixedSize(500, 450)
+
+        layout = QVBoxLayout(dialog)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(15)
+
+        # Logo/Header
+        header = QLabel("🏗️ Export E3D to Navisworks")
+        header_font = QFont()
+        header_font.setPointSize(16)
+        header_font.setBold(True)
+        header.setFont(header_font)
+        header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(header)
+
+        # Version
+        version_label = QLabel("Version 1.0")
+        version_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        version_font = QFont()
+        version_font.setPointSize(10)
+        version_label.setFont(version_font)
+        layout.addWidget(version_label)
+
+        # Separator
+        separator = QLabel("━" * 60)
+        separator.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(separator)
+
+        # Description
+        description = QTextBrowser()
+        description.setMaximumHeight(150)
+        description.setOpenExternalLinks(False)
+        description_text = """
+        <p><b>پلتفرم حرفه‌ای اکسپورت AVEVA E3D به Navisworks</b></p>
+
+        <p>این ابزار قدرتمند برای تبدیل خودکار مدل‌های AVEVA E3D به فرمت Navisworks طراحی شده است. 
+        با قابلیت‌های پیشرفته شامل:</p>
+
+        <ul>
+            <li>تولید خودکار فایل‌های RVM و Attribute</li>
+            <li>پشتیبانی از Export دسته‌جمعی اشیاء</li>
+            <li>ذخیره خودکار تنظیمات</li>
+        </ul>
+        """
+        description.setHtml(description_text)
+        layout.addWidget(description)
+
+        # Developer Info
+        info_text = QLabel()
+        info_text.setWordWrap(True)
+        info_text.setTextFormat(Qt.TextFormat.RichText)
+        info_text.setOpenExternalLinks(False)
+        info_text.setText("""
+        <p><b>👨‍💻 توسعه‌دهنده:</b> HOSSEIN IZADI</p>
+        <p><b>📧 ایمیل:</b> <a href='hossein.pi.ad@gmail.com' style='color: #5E81AC; text-decoration: none;'>hossein.pi.ad@gmail.com</a></p>
+        <p><b>🌐 گیت‌هاب:</b> <a href='https://github.com/arkittioe' style='color: #5E81AC; text-decoration: none;'>https://github.com/arkittioe</a></p>
+        <p><b>📅 تاریخ انتشار:</b> 1404/08/24</p>
+        """)
+
+        # Connect link clicks
+        info_text.linkActivated.connect(self._open_link)
+        layout.addWidget(info_text)
+
+        # Footer
+        footer = QLabel("Made with ❤️ for AVEVA & Navisworks users")
+        footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        footer_font = QFont()
+        footer_font.setItalic(True)
+        footer_font.setPointSize(9)
+        footer.setFont(footer_font)
+        layout.addWidget(footer)
+
+        layout.addStretch()
+
+        # Close Button
+        close_button = QPushButton("✓ Close")
+        close_button.clicked.connect(dialog.accept)
+        close_button.setMinimumWidth(100)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        button_layout.addStretch()
+        layout.addLayout(button_layout)
+        return dialog
+
+    def _open_link(self, url):
+        """Opens URLs in default browser."""
+        QDesktopServices.openUrl(QUrl(url))
+
+    def generate_files(self):
+        """
+        Main logic to generate the four output files based on GUI inputs.
+        """
+        self.status_bar.showMessage("⏳ Generating files...")
+        try:
+            # --- 1. Collect and Validate Data ---
+
+            # Get export time based on checkbox state
+            if self.checkbox_daily_export.isChecked():
+                export_time_value = self.time_edit_export.time().toString("HH:mm")
+            else:
+                export_time_value = False
+
+            data = {
+                "aveva_path": self.line_edits["aveva_folder"].text().strip(),
+                "proj_code": self.combo_proj_code.currentText().strip(),
+                "user": self.line_edits["user"].text().strip(),
+                "password": self.line_edits["password"].text(),
+                "mdb": self.line_edits["mdb"].text().strip(),
+                "output_folder": self.line_edits["output_folder"].text().strip(),
+                "scratch_folder": self.line_edits["scratch_folder"].text().strip(),
+                "roamer_path": os.path.join(self.line_edits["navis_folder"].text().strip(), "Roamer.exe").replace("\\",
+                                                                                                                  "/"),
+                "areas_file": self.line_edits["object_list"].text().strip(),
+                "export_attribute": self._current_export_mode() != "geometry",
+                "export_mode": self._current_export_mode(),
+                "attribute_profile": self.combo_attribute_profile.currentText(),
+                "quality_profile": self.combo_quality_profile.currentText(),
+                "collect_types": self.line_edits["collect_types"].text().upper().split(),
+                "tile_types": self.line_edits["tile_types"].text().upper().split(),
+                "keep_intermediates": self.checkbox_keep_intermediates.isChecked(),
+                "single_pass": self.checkbox_single_pass.isChecked(),
+                "warm_session": DEFAULT_WARM_ROOT if self.checkbox_warm_session.isChecked() else "",
+                "daily_export": self.checkbox_daily_export.isChecked(),
+                "export_time": export_time_value,
+                "schedules": self._schedules(),
+            }
+
+            # Basic validation (skip export_time and areas_file)
+            for key, value in data.items():
+                if key in ["export_time", "areas_file", "scratch_folder", "collect_types", "tile_types", "warm_session", "schedules"]:  # Skip optional fields
+                    continue
+                if not value and isinstance(value, str):
+                    QMessageBox.warning(self, "Input Error",
+                                        f"Field '{key.replace('_', ' ').title()}' cannot be empty.")
+                    return
+
+            output_folder = Path(data["output_folder"])
+            if not output_folder.exists() or not output_folder.is_dir():
+                QMessageBox.warning(self, "Path Error", f"Output folder does not exist:\n{output_folder}")
+                return
+
+            if data["scratch_folder"]:
+                try:
+                    Path(data["scratch_folder"]).mkdir(parents=True, exist_ok=True)
+                except OSError as e:
+                    QMessageBox.warning(self, "Path Error", f"Scratch folder cannot be created:\n{e}")
+                    return
+            self.settings.setValue('scratch_folder', data["scratch_folder"])
+
+            # --- 2. Read Object List (from file OR panel) ---
+            object_list = []
+            areas_file_path = Path(data["areas_file"]) if data["areas_file"] else None
+
+            # اول سعی کن از فایل بخون
+            if areas_file_path and areas_file_path.exists() and areas_file_path.is_file():
+                with open(areas_file_path, 'r', encoding='utf-8') as f:
+                    object_list = [line.strip() for line in f if line.strip()]
+
+            # اگر فایل نبود یا خالی بود، از پنل استفاده کن
+            if not object_list:
+                object_list = self.object_model.items()
+
+            # چک نهایی: اگه هیچ object نداریم
+            if not object_list:
+                QMessageBox.warning(
+                    self,
+                    "Object List Error",
+                    "No objects found!\n\n"
+                    "Please either:\n"
+                    "1. Specify a valid SITE.txt file with objects, or\n"
+                    "2. Add objects to the side panel (click ◄ button)"
+                )
+                return
+
+            # Normalize paths for macro files (use forward slashes)
+            normalized_data = {k: (v.replace("\\", "/") if isinstance(v, str) else v) for k, v in data.items()}
+
+            # Patterns (/U109A:*) become catalog names here; schedules keep them and expand at run time
+            try:
+                export_objects = resolve_object_patterns(normalized_data, object_list)
+            except ValueError as e:
+                QMessageBox.warning(self, "Object List Error", str(e))
+                return
+
+            # --- 3. Generate Files (unchanged artifacts are skipped) ---
+            if self.checkbox_split_disciplines.isChecked() and self.checkbox_pipeline.isChecked():
+                generator = PipelinedExport(normalized_data, export_objects)
+            elif self.checkbox_split_disciplines.isChecked() and self.checkbox_balanced.isChecked():
+                sessions = self.spin_max_sessions.value()
+                costs, _ = object_costs(normalized_data["output_folder"], normalized_data["proj_code"])
+                generator = PartitionedExport(normalized_data, export_objects, sessions,
+                                              parts=plan_shards(export_objects, sessions, costs))
+            elif self.checkbox_split_disciplines.isChecked():
+                generator = PartitionedExport(normalized_data, export_objects, self.spin_max_sessions.value())
+            else:
+                generator = ExportGenerator(normalized_data, export_objects)
+            written, unchanged = generator.generate(output_folder)
+
+            message = f"All files were generated successfully in:\n{output_folder}"
+            if unchanged:
+                message += f"\n\nUp to date (not rewritten): {', '.join(unchanged)}"
+            message += self._register_schedules(normalized_data, object_list)
+            QMessageBox.information(self, "Success", message)
+            self.status_bar.showMessage("✓ Files generated successfully!", 5000)
+
+            # --- 4. اجرای خودکار فایل RunE3D.bat ---
+            bat_file_path = output_folder / "RunE3D.bat"
+            if bat_file_path.exists():
+                try:
+                    # استفاده از os.startfile برای اجرای فایل به صورت مستقل (مثل دوبار کلیک)
+                    os.startfile(str(bat_file_path))
+                    self.status_bar.showMessage("✓ RunE3D.bat executed successfully!", 3000)
+                except Exception as e:
+                    QMessageBox.warning(self, "Execution Error",
+                                        f"Files generated but failed to run RunE3D.bat:\n{str(e)}")
+            else:
+                QMessageBox.warning(self, "File Error",
+                                    "RunE3D.bat was not generated properly.")
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An unexpected error occurred:\n{str(e)}")
+            self.status_bar.showMessage("✗ Error occurred during generation", 5000)
+
+    def _update_split_options(self):
+        """Pipelined parts share one E3D session, so the session limit only applies to parallel parts."""
+        split = self.checkbox_split_disciplines.isChecked()
+        pipelined, balanced = self.checkbox_pipeline.isChecked(), self.checkbox_balanced.isChecked()
+        self.checkbox_pipeline.setEnabled(split and not balanced)
+        self.checkbox_balanced.setEnabled(split and not pipelined)
+        self.spin_max_sessions.setEnabled(split and not pipelined)
+
+    def _on_daily_export_changed(self, state):
+        """Enable/disable time selection based on daily export checkbox."""
+        is_enabled = (state == Qt.CheckState.Checked.value)
+        self.time_edit_export.setEnabled(is_enabled)
+        self.label_export_time.setEnabled(is_enabled)
+        self.spin_export_every.setEnabled(is_enabled)
+        self.label_export_every.setEnabled(is_enabled)
+        self.combo_schedule_quality.setEnabled(is_enabled)
+        self._save_mode_schedule()
+
+    def _current_export_mode(self):
+        return self.combo_export_mode.currentData() or DEFAULT_EXPORT_MODE
+
+    def _on_export_mode_changed(self):
+        """Shows the schedule of the selected mode and the options that apply to it."""
+        mode = self._current_export_mode()
+        self.settings.setValue('export_mode', mode)
+
+        # Schedules are kept per mode; 'both' takes over the single schedule of older versions
+        legacy = mode == DEFAULT_EXPORT_MODE
+        enabled = self.settings.value(f'schedule_{mode}/enabled',
+                                      self.settings.value('daily_export', False, type=bool) if legacy else False,
+                                      type=bool)
+        saved_time = self.settings.value(f'schedule_{mode}/time',
+                                         self.settings.value('export_time', '00:00', type=str) if legacy else '00:00',
+                                         type=str)
+        self._loading_schedule = True
+        time_obj = QTime.fromString(saved_time, "HH:mm")
+        if time_obj.isValid():
+            self.time_edit_export.setTime(time_obj)
+        self.spin_export_every.setValue(self.settings.value(f'schedule_{mode}/every', 0, type=int))
+        quality = self.settings.value(f'schedule_{mode}/quality', '', type=str)
+        self.combo_schedule_quality.setCurrentIndex(max(0, self.combo_schedule_quality.findData(quality)))
+        self.checkbox_daily_export.setChecked(enabled)
+        self._loading_schedule = False
+        self._on_daily_export_changed(Qt.CheckState.Checked.value if enabled else Qt.CheckState.Unchecked.value)
+
+        self.checkbox_single_pass.setEnabled(mode == "both")
+        if mode == "attributes":
+            self.checkbox_split_disciplines.setChecked(False)  # parts are geometry exports
+        self.checkbox_split_disciplines.setEnabled(mode != "attributes")
+        self._schedule_run_info()
+
+    def _save_mode_schedule(self):
+        """Remembers the daily schedule of the selected export mode."""
+        if getattr(self, '_loading_schedule', False):
+            return
+        mode = self._current_export_mode()
+        self.settings.setValue(f'schedule_{mode}/enabled', self.checkbox_daily_export.isChecked())
+        self.settings.setValue(f'schedule_{mode}/time', self.time_edit_export.time().toString("HH:mm"))
+        self.settings.setValue(f'schedule_{mode}/every', self.spin_export_every.value())
+        self.settings.setValue(f'schedule_{mode}/quality', self.combo_schedule_quality.currentData() or "")
+
+    def _schedules(self):
+        """The enabled schedules of all modes: {mode: {"time": "HH:MM", "every_hours": n[, "quality": profile]}}."""
+        schedules = {}
+        for mode in EXPORT_MODES:
+            if self.settings.value(f'schedule_{mode}/enabled', False, type=bool):
+                schedules[mode] = {"time": self.settings.value(f'schedule_{mode}/time', '00:00', type=str),
+                                   "every_hours": self.settings.value(f'schedule_{mode}/every', 0, type=int)}
+                quality = self.settings.value(f'schedule_{mode}/quality', '', type=str)
+                if quality:
+                    schedules[mode]["quality"] = quality
+        return schedules
+
+    def _ensure_side_panel(self):
+        """Builds the side panel on first use; the object list itself lives in object_model."""
+        if self.side_panel is None:
+            self.side_panel = SidePanel(self.object_model, self, catalog=self.current_catalog)
+            self.side_panel.setGeometry(WINDOW_WIDTH, 0, PANEL_WIDTH, WINDOW_HEIGHT)  # شروع از خارج پنجره
+            self.side_panel.hide()
+            self.side_panel.items_changed.connect(self.panel_save_timer.start)
+            self.btn_toggle_panel.raise_()
+        return self.side_panel
+
+    def toggle_side_panel(self):
+        """Toggle side panel visibility with animation."""
+        self._ensure_side_panel()
+        if self.panel_visible:
+            # Hide panel
+            self.animation = QPropertyAnimation(self.side_panel, b"geometry")
+            self.animation.setDuration(300)
+            self.animation.setStartValue(QRect(WINDOW_WIDTH, 0, PANEL_WIDTH, WINDOW_HEIGHT))
+            self.animation.setEndValue(QRect(WINDOW_WIDTH + PANEL_WIDTH, 0, PANEL_WIDTH, WINDOW_HEIGHT))
+            self.animation.finished.connect(self.side_panel.hide)
+            self.animation.start()
+            self.btn_toggle_panel.setText("◄")
+            self.btn_toggle_panel.setGeometry(WINDOW_WIDTH - 30, 10, 25, 50)
+            self.setFixedSize(WINDOW_WIDTH, WINDOW_HEIGHT)
+        else:
+            # Show panel
+            self.side_panel.update_catalog_status()
+            self.side_panel.show()
+            self.animation = QPropertyAnimation(self.side_panel, b"geometry")
+            self.animation.setDuration(300)
+            self.animation.setStartValue(QRect(WINDOW_WIDTH + PANEL_WIDTH, 0, PANEL_WIDTH, WINDOW_HEIGHT))
+            self.animation.setEndValue(QRect(WINDOW_WIDTH, 0, PANEL_WIDTH, WINDOW_HEIGHT))
+            self.animation.start()
+            self.btn_toggle_panel.setText("►")
+            self.btn_toggle_panel.setGeometry(WINDOW_WIDTH + PANEL_WIDTH - 30, 10, 25, 50)
+            self.setFixedSize(WINDOW_WIDTH + PANEL_WIDTH, WINDOW_HEIGHT)
+
+        self.panel_visible = not self.panel_visible
+
+    def current_catalog(self):
+        """Cached site/zone catalog of the selected project and MDB, or None."""
+        return load_catalog(self.combo_proj_code.currentText(), self.line_edits["mdb"].text().strip())
+
+    def load_panel_objects(self):
+        """Load saved object list for current project from settings."""
+        # Edits of the previous project that are still waiting for the debounce are saved first
+        if self.panel_save_timer.isActive():
+            self.panel_save_timer.stop()
+            self.save_panel_objects()
+
+        proj_code = self.combo_proj_code.currentText()
+        self.panel_project = proj_code
+        if self.side_panel is not None:
+            self.side_panel.update_catalog_status()
+        saved_objects = self.settings.value(f'objects_{proj_code}', None)
+
+        if saved_objects:
+            self.object_model.set_items(saved_objects)
+        else:
+            # Load defaults from the project registry
+            self.object_model.set_items(self.projects.default_objects(proj_code))
+
+    def load_project_options(self):
+        """Load the per-project export options (attribute and quality profiles, collected and tiled types)."""
+        proj_code = self.combo_proj_code.currentText()
+        entry = self.projects.get(proj_code) or {}
+        profile = self.settings.value(f'attribute_profile_{proj_code}',
+                                      entry.get("attribute_profile", DEFAULT_ATTRIBUTE_PROFILE), type=str)
+        self.combo_attribute_profile.blockSignals(True)
+        self.combo_attribute_profile.setCurrentText(profile)
+        self.combo_attribute_profile.blockSignals(False)
+        quality = self.settings.value(f'quality_profile_{proj_code}',
+                                      entry.get("quality_profile", DEFAULT_QUALITY_PROFILE), type=str)
+        self.combo_quality_profile.blockSignals(True)
+        self.combo_quality_profile.setCurrentText(quality)
+        self.combo_quality_profile.blockSignals(False)
+        self.line_edits["collect_types"].setText(self.settings.value(f'collect_types_{proj_code}', '', type=str))
+        self.line_edits["tile_types"].setText(self.settings.value(
+            f'tile_types_{proj_code}', " ".join(entry.get("tile_types", [])), type=str))
+        self._schedule_run_info()
+
+    def save_project_options(self):
+        """Save the per-project export options."""
+        proj_code = self.combo_proj_code.currentText()
+        self.settings.setValue(f'attribute_profile_{proj_code}', self.combo_attribute_profile.currentText())
+        self.settings.setValue(f'quality_profile_{proj_code}', self.combo_quality_profile.currentText())
+        self.settings.setValue(f'collect_types_{proj_code}',
+                               " ".join(self.line_edits["collect_types"].text().upper().split()))
+        self.settings.setValue(f'tile_types_{proj_code}',
+                               " ".join(self.line_edits["tile_types"].text().upper().split()))
+
+    def _schedule_run_info(self, *args):
+        """(Re)starts the run info timer; the signal arguments are not needed."""
+        self.run_info_timer.start()
+
+    def _update_run_info(self):
+        """Refresh what is read from the project's run history: type counts and the estimate."""
+        self._update_type_counts_tooltip()
+        self._update_estimate()
+
+    def _update_type_counts_tooltip(self):
+        """Show the element counts per type of the project's last run next to the type list."""
+        tooltip = ("Element types collected for the attribute dump (space separated).\n"
+                   f"Default: {' '.join(DEFAULT_COLLECT_TYPES)}")
+        record = load_type_counts(self.line_edits["output_folder"].text().strip(),
+                                  self.combo_proj_code.currentText())
+        if record:
+            top = list(record["counts"].items())[:10]
+            tooltip += f"\n\nLast run: {record['total']} elements\n" + "\n".join(
+                f"  {element_type}: {count}" for element_type, count in top)
+        self.line_edits["collect_types"].setToolTip(tooltip)
+
+    def _register_schedules(self, data, objects):
+        """
+        Registers the per-mode schedules of the project as Windows tasks (and removes the
+        tasks of modes no longer scheduled). Returns a line for the success message.
+        """
+        project = data["proj_code"]
+        if os.name != "nt" or not (data["schedules"] or self.settings.value(f'scheduled_{project}', False, type=bool)):
+            return ""
+        results = register_schedules(data, objects)
+        self.settings.setValue(f'scheduled_{project}', bool(data["schedules"]))
+        failed = [f"{EXPORT_MODES[mode]}: {message}" for mode, ok, message in results if not ok]
+        if failed:
+            QMessageBox.warning(self, "Schedule Error",
+                                "Could not register the scheduled exports:\n" + "\n".join(failed))
+        scheduled = [f"{EXPORT_MODES[mode]} at {schedule['time']}"
+                     + (f" every {schedule['every_hours']} h" if schedule.get("every_hours") else "")
+                     + (f" ({schedule['quality']})" if schedule.get("quality") else "")
+                     for mode, schedule in data["schedules"].items()]
+        return f"\n\nScheduled: {'; '.join(scheduled)}" if scheduled else ""
+
+    def _update_estimate(self):
+        """Show the predicted duration and finish time of the project's export next to the export time."""
+        # Labelled qualities (preview) keep their own run history
+        quality = self.combo_schedule_quality.currentData() or self.combo_quality_profile.currentText()
+        project = quality_project({"proj_code": self.combo_proj_code.currentText(), "quality_profile": quality})
+        estimate = ExportEstimator(self.line_edits["output_folder"].text().strip()).estimate(
+            project, mode=self._current_export_mode())
+        duration = estimate["targets"].get("duration_s")
+        if duration is None:
+            self.label_estimate.setText("")
+            self.label_estimate.setToolTip("No run history yet (run an export or 'main.py prescan')")
+            return
+
+        def minutes(seconds):
+            return f"{int(seconds // 3600)}:{int(seconds % 3600 // 60):02d}"
+
+        text = f"≈ {minutes(duration['value'])} h"
+        if duration["high"] is not None:
+            text += f" (±{minutes((duration['high'] - duration['low']) / 2)})"
+        finish = self.time_edit_export.time().addSecs(int(duration["high"] or duration["value"]))
+        self.label_estimate.setText(f"{text} → done by {finish.toString('HH:mm')}")
+
+        lines = [f"{estimate['elements']} elements, fitted on {duration['runs']} run(s) ({duration['basis']})"]
+        for target, label in (("rvm_bytes", "RVM"), ("attributes_bytes", "Attributes"), ("nwd_bytes", "NWD")):
+            if target in estimate["targets"]:
+                lines.append(f"{label}: ~{estimate['targets'][target]['value'] / 1e6:,.0f} MB")
+        self.label_estimate.setToolTip("\n".join(lines))
+
+    def save_panel_objects(self):
+        """Save current panel objects to settings (under the project they were loaded for)."""
+        objects = self.object_model.items()
+        self.settings.setValue(f'objects_{self.panel_project}', objects)
+
+    def closeEvent(self, event):
+        """Flush a pending panel save before the window closes."""
+        if self.panel_save_timer.isActive():
+            self.panel_save_timer.stop()
+            self.save_panel_objects()
+        super().closeEvent(event)
+
+
+def run_gui():
+    """Shows the main window and runs the Qt event loop."""
+    app = QApplication(sys.argv)
+    ex = AppGUI()
+    ex.show()
+    return app.exec()
+
+
+class _FirstPaintProbe(QObject):
+    """Quits the event loop right after the window has painted for the first time."""
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            QTimer.singleShot(0, QApplication.quit)
+        return False
+
+
+def probe_first_paint():
+    """Starts the GUI and exits after its first paint (timed by 'main.py startup-check')."""
+    app = QApplication(sys.argv[:1])
+    window = AppGUI()
+    probe = _FirstPaintProbe(window)
+    window.installEventFilter(probe)
+    window.show()
+    return app.exec()
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+Shared export job queue and the worker agent that runs on every host with an E3D
+licence. The queue is a single SQLite file (on a file share or local disk); workers
+claim jobs under a lease, renew it with heartbeats, and jobs whose lease ran out
+(crashed or disconnected host) go back to the queue.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import sqlite3
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+from core import (
+    CatalogScan, ExportGenerator, catalog_needs_scan, federate_parts, parse_rvm_log_line, quality_project,
+    FILETOOLS_EXE_NAME,
+)
+
+
+JOB_LEASE_SECONDS = 120      # a job is requeued when its worker misses heartbeats this long
+JOB_MAX_ATTEMPTS = 3         # claims per job before it is marked failed
+WORKER_POLL_SECONDS = 5.0    # idle wait between claim attempts
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    grp TEXT,
+    project TEXT,
+    shard TEXT,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    result TEXT,
+    error TEXT,
+    progress TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+CREATE TABLE IF NOT EXISTS job_groups (
+    grp TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    worker TEXT,
+    finished REAL,
+    error TEXT
+);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue. Every call opens its own connection, so one JobQueue can be
+    used from several threads and many processes/hosts can share the file. Claims run
+    in a BEGIN IMMEDIATE transaction, so two workers never get the same job.
+    Lease times are wall-clock: hosts sharing a queue need synchronised clocks.
+    """
+
+    def __init__(self, path, lease_seconds=JOB_LEASE_SECONDS, max_attempts=JOB_MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "progress" not in columns:  # queues created before progress reporting
+                conn.execute("ALTER TABLE jobs ADD COLUMN progress TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Transaction(conn)
+
+    def enqueue(self, spec, project=None, shard=None, group=None):
+        """Adds a job; `spec` is {"data": <settings.json fields>, "objects": [...]}. Returns its id."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (grp, project, shard, spec, created) VALUES (?, ?, ?, ?, ?)",
+                (group, project, shard, json.dumps(spec), time.time()))
+            return cursor.lastrowid
+
+    def claim(self, worker):
+        """Leases the oldest queued job to `worker`. Returns the job dict or None."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_expired(conn, now)
+            row = conn.execute("SELECT * FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                "started = ?, error = NULL WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]))
+            job = dict(row)
+        job["spec"] = json.loads(job["spec"])
+        job["worker"] = worker
+        job["attempts"] += 1
+        return job
+
+    def heartbeat(self, job_id, worker, progress=None):
+        """Extends the lease (and records progress). False means the lease was lost (the job was requeued)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_until = ?, progress = COALESCE(?, progress) "
+                "WHERE id = ? AND worker = ? AND state = 'running'",
+                (time.time() + self.lease_seconds, progress, job_id, worker))
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker, result=None):
+        """Marks a job done; ignored (returns False) if the worker no longer holds the lease."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', finished = ?, result = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ? AND state = 'running'",
+                (time.time(), json.dumps(result), job_id, worker))
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker, error, retry=True):
+        """Returns a job to the queue (or marks it failed after max_attempts)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT attempts FROM jobs WHERE id = ? AND worker = ? AND state = 'running'",
+                               (job_id, worker)).fetchone()
+            if row is None:
+                return False
+            state = "queued" if retry and row["attempts"] < self.max_attempts else "failed"
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_until = NULL, "
+                "finished = CASE WHEN ? = 'failed' THEN ? END WHERE id = ?",
+                (state, str(error), state, time.time(), job_id))
+            return True
+
+    def requeue_expired(self):
+        """Requeues jobs whose worker stopped sending heartbeats. Returns their ids."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return self._requeue_expired(conn, time.time())
+
+    def _requeue_expired(self, conn, now):
+        rows = conn.execute("SELECT id, attempts FROM jobs WHERE state = 'running' AND lease_until < ?",
+                            (now,)).fetchall()
+        for row in rows:
+            state = "queued" if row["attempts"] < self.max_attempts else "failed"
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = 'lease expired', lease_until = NULL, "
+                "finished = CASE WHEN ? = 'failed' THEN ? END WHERE id = ?",
+                (state, state, now, row["id"]))
+        return [row["id"] for row in rows]
+
+    def counts(self, group=None):
+        """{state: number of jobs}, optionally for one group."""
+        with self._connect() as conn:
+            query = "SELECT state, COUNT(*) AS n FROM jobs"
+            args = ()
+            if group is not None:
+                query += " WHERE grp = ?"
+                args = (group,)
+            rows = conn.execute(query + " GROUP BY state", args).fetchall()
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update({row["state"]: row["n"] for row in rows})
+        return counts
+
+    def finish_group(self, group, worker):
+        """
+        Claims the group's closing step once all of its jobs have ended: returns the
+        group's counts to exactly one caller, None while jobs are left or if another
+        worker already claimed it. Counting and claiming share one transaction.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM jobs WHERE grp = ? GROUP BY state",
+                                (group,)).fetchall()
+            counts = dict.fromkeys(JOB_STATES, 0)
+            counts.update({row["state"]: row["n"] for row in rows})
+            if counts["queued"] or counts["running"]:
+                return None
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO job_groups (grp, state, worker) VALUES (?, ?, ?)",
+                (group, "failed" if counts["failed"] else "federating", worker))
+            return counts if cursor.rowcount == 1 else None
+
+    def unclosed_groups(self):
+        """
+        One job (with its spec) of every group whose jobs have all ended but that no
+        worker closed, e.g. when its last shard failed through lease expiry.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE id IN (SELECT MIN(id) FROM jobs WHERE grp IS NOT NULL "
+                "AND grp NOT IN (SELECT grp FROM job_groups) GROUP BY grp "
+                "HAVING SUM(state IN ('queued', 'running')) = 0)").fetchall()
+        jobs = [dict(row) for row in rows]
+        for job in jobs:
+            job["spec"] = json.loads(job["spec"])
+        return jobs
+
+    def end_group(self, group, state, error=None):
+        """Records how the group's closing step ended ('done' or 'failed')."""
+        with self._connect() as conn:
+            conn.execute("UPDATE job_groups SET state = ?, finished = ?, error = ? WHERE grp = ?",
+                         (state, time.time(), error, group))
+
+    def groups(self, limit=20):
+        """Newest closed groups first: federated ('done'), or 'failed' with the reason."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM job_groups ORDER BY rowid DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def jobs(self, limit=50):
+        """Newest jobs first, without their specs."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, grp, project, shard, state, attempts, worker, created, started, finished, error, "
+                "progress FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, job_id):
+        """One job including its result, without the spec (it holds credentials); None if unknown."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        del job["spec"]
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class _Transaction:
+    """Connection context: commits (or rolls back) an open transaction and closes."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+        return False
+
+
+class E3DRunner:
+    """
+    Runs one job on this host: generates the macros locally from the job spec and runs
+    the generated RunE3D.bat, which publishes the NWD to the shared output folder.
+    """
+
+    def __init__(self, work_root=None):
+        self.work_root = Path(work_root or Path(tempfile.gettempdir()) / "e3d_worker")
+        self._logs = {}
+
+    def progress(self, job):
+        """Last line of the job's RVM log (e.g. '[RVM] Export /U109A:PI'), sent with the heartbeat."""
+        log_path = self._logs.get(job["id"])
+        try:
+            with open(log_path, 'rb') as f:
+                f.seek(max(0, f.seek(0, os.SEEK_END) - 4096))
+                lines = f.read().decode('utf-8', 'replace').splitlines()
+        except (OSError, TypeError):
+            return None
+        return lines[-1].strip() if lines else None
+
+    def __call__(self, job):
+        spec = job["spec"]
+        local = self.work_root / f"job-{job['id']}"
+        local.mkdir(parents=True, exist_ok=True)
+        # Publish in the foreground: the result below must be this run's record
+        data = dict(spec["data"], macro_folder=local.as_posix(), foreground_publish=True)
+        if job.get("shard"):
+            data["part"] = job["shard"]
+        if not data.get("scratch_folder"):
+            # Intermediates stay on this host; only the NWD is published to the share
+            data["scratch_folder"] = (local / "scratch").as_posix()
+        if catalog_needs_scan(data, spec["objects"]):
+            # Unattended runs refresh a missing or stale catalog instead of failing on it
+            CatalogScan(data).generate(local)
+            subprocess.run(["cmd", "/c", str(local / "CatalogE3D.bat")], cwd=local, check=True)
+        generator = ExportGenerator(data, spec["objects"])
+        self._logs[job["id"]] = Path(generator.work_folder) / "RVM_LOG.txt"
+        generator.generate(local)
+        subprocess.run(["cmd", "/c", str(local / "RunE3D.bat")], cwd=local, check=True)
+
+        result = {"project": generator.run_project}
+        if generator.mode == "attributes":
+            return result
+        nwd_name = self._nwd_name(Path(generator.macro_folder) / "RVM_LOG.txt", Path(generator.work_folder) / "RVM_LOG.txt")
+        latest = Path(data["output_folder"]) / f"{generator.run_project}-latest.json"
+        try:
+            with open(latest, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            record = {}
+        if not nwd_name or record.get("run") != nwd_name:
+            raise RuntimeError(f"{nwd_name or 'The NWD'} was not published to {latest.parent} "
+                               f"(latest is {record.get('run') or 'missing'})")
+        result.update(record)
+        return result
+
+    @staticmethod
+    def _nwd_name(*log_paths):
+        """File name of the NWD this run wrote, from the first RVM log that names it."""
+        for log_path in log_paths:
+            try:
+                with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        stage, _, value = parse_rvm_log_line(line)
+                        if stage == "nwd_path" and value:
+                            return Path(value.replace("\\", "/")).name
+            except OSError:
+                continue
+        return None
+
+
+class FakeRunner:
+    """Stand-in for E3DRunner to exercise the queue locally without E3D."""
+
+    def __init__(self, seconds=1.0, fail_rate=0.0, crash_rate=0.0):
+        self.seconds = seconds
+        self.fail_rate = fail_rate
+        self.crash_rate = crash_rate
+
+    def progress(self, job):
+        return f"fake export of shard {job['shard']}"
+
+    def __call__(self, job):
+        time.sleep(self.seconds / 2)
+        if random.random() < self.crash_rate:
+            os._exit(3)  # a host that dies mid-job: its lease has to expire
+        time.sleep(self.seconds / 2)
+        if random.random() < self.fail_rate:
+            raise RuntimeError("simulated export failure")
+        return {"project": job["project"], "shard": job["shard"], "pid": os.getpid()}
+
+
+def _federate_group(queue, job, worker):
+    """
+    Builds the NWF once every shard of the job's group has ended, run by the one worker
+    that claims the group. A group with failed shards is not federated: its NWF would
+    silently lack their parts.
+    """
+    spec = job["spec"]
+    parts = spec.get("federate_parts")
+    if not parts or not job["grp"]:
+        return
+    counts = queue.finish_group(job["grp"], worker)
+    if counts is None:
+        return
+    if counts["failed"]:
+        error = f"{counts['failed']} failed shard(s), not federated"
+        queue.end_group(job["grp"], "failed", error)
+        print(f"[WORKER] Group {job['grp']}: {error}", file=sys.stderr)
+        return
+    data = spec["data"]
+    filetools = os.path.join(os.path.dirname(data["roamer_path"]), FILETOOLS_EXE_NAME)
+    try:
+        nwf_path, rebuilt = federate_parts(data["output_folder"], quality_project(data), parts, filetools)
+    except (OSError, subprocess.CalledProcessError) as e:
+        queue.end_group(job["grp"], "failed", str(e))
+        raise
+    queue.end_group(job["grp"], "done")
+    print(f"[WORKER] Federated {nwf_path} ({'rebuilt' if rebuilt else 'up to date'})")
+
+
+def run_worker(queue, runner, worker=None, poll_seconds=WORKER_POLL_SECONDS, exit_when_empty=False, max_jobs=None):
+    """
+    Claims and runs jobs until stopped. A heartbeat thread renews the lease every third
+    of the lease time while the runner works. Returns the number of jobs completed.
+    """
+    worker = worker or default_worker_id()
+    completed = 0
+    while max_jobs is None or completed < max_jobs:
+        job = queue.claim(worker)
+        if job is None:
+            _close_ended_groups(queue, worker)
+            if exit_when_empty and not queue.counts()["running"]:
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        print(f"[WORKER] {worker} running job {job['id']} ({job['project']} {job['shard'] or ''})".rstrip())
+        stop = threading.Event()
+        lost = threading.Event()
+
+        report = getattr(runner, "progress", lambda job: None)
+
+        def beat():
+            while not stop.wait(queue.lease_seconds / 3):
+                if not queue.heartbeat(job["id"], worker, report(job)):
+                    lost.set()
+                    return
+
+        heartbeat = threading.Thread(target=beat, daemon=True)
+        heartbeat.start()
+        failed = False
+        try:
+            result = runner(job)
+        except Exception as e:
+            stop.set()
+            queue.fail(job["id"], worker, e)
+            print(f"[WORKER] Job {job['id']} failed: {e}", file=sys.stderr)
+            failed = True
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if not failed:
+            if lost.is_set() or not queue.complete(job["id"], worker, result):
+                print(f"[WORKER] Lease of job {job['id']} was lost, result discarded", file=sys.stderr)
+                continue
+            completed += 1
+        # The last shard to end, done or failed for good, closes its group
+        _close_group(queue, job, worker)
+    return completed
+
+
+def _close_group(queue, job, worker):
+    try:
+        _federate_group(queue, job, worker)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[WORKER] Federation of {job['grp']} failed: {e}", file=sys.stderr)
+
+
+def _close_ended_groups(queue, worker):
+    """Closes the groups no worker closed (their last shard failed by lease expiry)."""
+    for job in queue.unclosed_groups():
+        _close_group(queue, job, worker)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from core import diff_attribute_dumps
+
+
+def _dump(path, elements):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("NEW Header Information\nProject := PBZ\n")
+        for name, attributes in elements:
+            f.write(f"NEW {name}\n" + "".join(f"{key} := {value}\n" for key, value in attributes.items()))
+        f.write("END\n")
+    return path
+
+
+def test_merge_join_over_spilled_runs(tmp_path):
+    old = _dump(tmp_path / "old.txt", [("/P-3", {"Spec": "A1"}), ("/P-1", {"Spec": "A1"}),
+                                        ("/P-2", {"Spec": "A1", "Pipe Size": "50mm"}), ("/V-1", {"weight": "12"})])
+    new = _dump(tmp_path / "new.txt", [("/V-1", {"weight": "14"}), ("/P-4", {"Spec": "A1"}),
+                                        ("/P-2", {"Spec": "B2", "Pipe Size": "65mm"}), ("/P-1", {"Spec": "A1"})])
+    # One element per run forces the external merge; the result must not depend on it
+    report = diff_attribute_dumps(old, new, chunk_records=1)
+    assert report == diff_attribute_dumps(old, new)
+    assert report["summary"] == {"added": 1, "removed": 1, "changed": 2, "unchanged": 1}
+    assert report["attributes"] == {"Pipe Size": 1, "Spec": 1, "weight": 1}
+    assert {entry["element"]: entry["status"] for entry in report["details"]} == {
+        "/P-2": "changed", "/P-3": "removed", "/P-4": "added", "/V-1": "changed"}
+
+
+def test_repeated_names_pair_in_order(tmp_path):
+    old = _dump(tmp_path / "old.txt", [("/TEE", {"Spec": "A"}), ("/TEE", {"Spec": "B"})])
+    new = _dump(tmp_path / "new.txt", [("/TEE", {"Spec": "A"}), ("/TEE", {"Spec": "C"}), ("/TEE", {"Spec": "D"})])
+    report = diff_attribute_dumps(old, new, ignore=("Spec",), chunk_records=2)
+    assert report["summary"] == {"added": 1, "removed": 0, "changed": 0, "unchanged": 2}
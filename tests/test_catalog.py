@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import pytest
+
+from core import CATALOG_TTL, catalog_path, expand_object_patterns, resolve_object_patterns
+
+CATALOG = {"entries": [
+    {"type": "SITE", "name": "/U109A", "owner": "/PBZ", "elements": 100},
+    {"type": "ZONE", "name": "/U109A:Z1", "owner": "/U109A", "elements": 40},
+    {"type": "ZONE", "name": "/U109A:Z9X", "owner": "/U109A", "elements": 10},
+    {"type": "SITE", "name": "/U110", "owner": "/PBZ", "elements": 50},
+]}
+
+
+def test_expand_object_patterns():
+    lines, unmatched = expand_object_patterns(
+        ["/U110", "t /u109a:z*", "EXCLUDE /U109A:Z9*", "/U1*", "/U2*"], CATALOG)
+    # the zones of a matched site are left out, /U110 is not repeated
+    assert lines == ["/U110", "T /U109A:Z1", "T /U109A:Z9X", "EXCLUDE /U109A:Z9X", "/U109A"]
+    assert unmatched == ["/U2*"]
+
+
+def test_stale_catalog_is_refused(tmp_path):
+    data = {"proj_code": "PBZ", "mdb": "/PBZ-ALL"}
+    path = catalog_path("PBZ", "/PBZ-ALL", tmp_path)
+    path.write_text(json.dumps({**CATALOG, "recorded": time.time() - CATALOG_TTL - 60}), encoding='utf-8')
+    with pytest.raises(ValueError, match="rescan"):
+        resolve_object_patterns(data, ["/U1*"], tmp_path)
+    assert resolve_object_patterns(data, ["/U1*"], tmp_path, ttl=CATALOG_TTL * 2) == ["/U109A", "/U110"]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import ast
+import math
+import struct
+from array import array
+
+from core import NPY_HEADER_BYTES, ColumnarDump, _NpyWriter, _read_npy_raw, convert_attribute_dump
+
+
+def test_npy_header_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.COLUMNAR_FLUSH_ROWS", 2)
+    values = [1.5, -2.0, 1e300, 0.0, 3.25]
+    writer = _NpyWriter(tmp_path / "c0.npy", "d")
+    for value in values:
+        writer.append(value)
+    writer.close()
+
+    raw = (tmp_path / "c0.npy").read_bytes()
+    length, = struct.unpack("<H", raw[8:10])
+    assert raw[:8] == b"\x93NUMPY\x01\x00" and 10 + length == NPY_HEADER_BYTES
+    header = ast.literal_eval(raw[10:NPY_HEADER_BYTES].decode('latin-1'))
+    assert header["shape"] == (len(values),) and header["descr"][1:] == "f8"
+    payload = array('d')
+    payload.frombytes(_read_npy_raw(tmp_path / "c0.npy"))
+    assert list(payload) == values
+
+
+def test_convert_attribute_dump(tmp_path):
+    dump = tmp_path / "PBZ-attributes.txt"
+    dump.write_text("NEW Header Information\nProject := PBZ\n"
+                    "NEW /P-100\nType := PIPE\nPipe Size := 100mm\n"
+                    "NEW TUBE 1 of /P-100\nLength := 1 1/2in\n"
+                    "NEW /V-1\nType := VALV\nPipe Size := =0/0\nSpec := Ä1\n"
+                    "END\n", encoding='utf-8')
+    convert_attribute_dump(dump)
+    columns = ColumnarDump(tmp_path / "PBZ-attributes.columns")
+    assert columns.strings("_type") == ["PIPE", "TUBI", "VALV"]
+    assert columns.strings("Spec") == ["", "", "Ä1"]
+    sizes = list(columns.numeric("Pipe Size"))
+    assert sizes[0] == 100.0 and math.isnan(sizes[1]) and math.isnan(sizes[2])
+    assert list(columns.numeric("Length"))[1] == 1.5
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import json
+
+from control import REQUIRED_JOB_FIELDS, ControlServer
+from jobqueue import JobQueue
+
+
+async def _exchange(server, raw):
+    listener = await asyncio.start_server(server._handle, "127.0.0.1", 0)
+    async with listener:
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        writer.write(raw)
+        response = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+    return int(response.split()[1]), json.loads(response.partition(b"\r\n\r\n")[2])
+
+
+def _post(body):
+    body = body.encode('utf-8')
+    return b"POST /jobs HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+
+
+def test_malformed_requests_are_answered(tmp_path):
+    server = ControlServer(JobQueue(tmp_path / "queue.sqlite"))
+    job = dict.fromkeys(REQUIRED_JOB_FIELDS, "x")
+    for raw in (b"POST /jobs HTTP/1.1\r\nContent-Length: many\r\n\r\n", _post("[1, 2]"), _post('"text"'),
+                _post(json.dumps({**job, "objects": "/U109A"})), _post(json.dumps({**job, "objects": [1]}))):
+        status, payload = asyncio.run(_exchange(server, raw))
+        assert status == 400 and payload["error"]
+    assert asyncio.run(_exchange(server, _post(json.dumps({**job, "objects": ["/U109A"]}))))[0] == 201
+
+
+def test_unexpected_errors_become_500(tmp_path):
+    class BrokenQueue(JobQueue):
+        def get(self, job_id):
+            raise RuntimeError("share unreachable")
+
+    server = ControlServer(BrokenQueue(tmp_path / "queue.sqlite"))
+    assert asyncio.run(_exchange(server, b"GET /jobs/1 HTTP/1.1\r\n\r\n")) == (500, {"error": "internal error"})
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+from core import ObjectFilterIndex
+
+
+class SmallBlocks(ObjectFilterIndex):
+    BLOCK_SIZE = 3   # edits then cross block boundaries with a handful of entries
+
+
+def test_search_after_edits_matches_a_plain_scan():
+    items = [f"/U{number:03d}/Z{number % 4}" for number in range(1, 12)] + ["EXCLUDE /U002/Z2"]
+    index = SmallBlocks(items)
+
+    def check():
+        for query in ("/", "/u0", "/u01", "z2", "exclude", "t /u", "nothing"):
+            assert index.search(query) == [row for row, item in enumerate(items) if query in item.lower()]
+
+    check()
+    index.append(["/U012/Z0", "T /U013"])
+    items += ["/U012/Z0", "T /U013"]
+    check()
+    index.remove_range(2, 6)
+    del items[2:7]
+    check()
+    index.replace(3, "EXCLUDE /U099/Z9")
+    items[3] = "EXCLUDE /U099/Z9"
+    check()
+    assert index.search(" ") is None
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from jobqueue import FakeRunner, JobQueue, run_worker
+
+
+def test_group_closed_when_its_last_shard_expires(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite", lease_seconds=0.5, max_attempts=1)
+    spec = {"data": {}, "objects": [], "federate_parts": ["S1", "S2"]}
+    for shard in ("S1", "S2"):
+        queue.enqueue(spec, project="PBZ", shard=shard, group="g1")
+    queue.claim("crashed-host")   # S1 never sends a heartbeat and expires after S2 is done
+
+    assert run_worker(queue, FakeRunner(seconds=0), "w1", poll_seconds=0.05, exit_when_empty=True) == 1
+    assert queue.counts("g1") == {"queued": 0, "running": 0, "done": 1, "failed": 1}
+    [group] = queue.groups()
+    assert group["grp"] == "g1" and group["state"] == "failed" and group["worker"] == "w1"
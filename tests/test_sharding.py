@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+
+from core import plan_report, plan_shards
+
+COSTS = {"/U1": 90, "/U2": 10, "/U3": 75, "/U4": 20, "/U5": 60, "/U6": 30, "/U7": 45, "/U8": 5}
+
+
+def test_lpt_makespan_bound():
+    sessions = 3
+    optimum = min(max(sum(cost for cost, shard in zip(COSTS.values(), assignment) if shard == number)
+                      for number in range(sessions))
+                  for assignment in itertools.product(range(sessions), repeat=len(COSTS)))
+    report = plan_report(list(COSTS), sessions, COSTS)
+    assert report["lower_bound"] <= optimum <= report["makespan"] <= (4 / 3 - 1 / (3 * sessions)) * optimum
+    assert report["makespan"] <= report["naive_makespan"]
+
+
+def test_shards_keep_list_order_and_excludes():
+    objects = ["/U1", "T /U2", "EXCLUDE /U1/Z9", "/U3", "/U4"]
+    shards = plan_shards(objects, 2, COSTS)
+    for lines in shards.values():
+        assert lines[-1] == "EXCLUDE /U1/Z9"
+        assert lines[:-1] == [line for line in objects if line in lines[:-1]]
+    assert sorted(line for lines in shards.values() for line in lines[:-1]) == sorted(set(objects) - {"EXCLUDE /U1/Z9"})
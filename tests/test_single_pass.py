@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from core import ExportGenerator
+
+DATA = {"aveva_path": "C:/AVEVA", "proj_code": "PBZ", "user": "SYSTEM", "password": "x", "mdb": "/PBZ-ALL",
+        "output_folder": "D:/out", "roamer_path": "C:/Navisworks/Roamer.exe", "areas_file": "",
+        "export_attribute": True, "daily_export": False, "export_time": False}
+OBJECTS = ["/U109A", "/U109A:Z1", "T /U110", "EXCLUDE /U109A:Z9"]
+
+
+def test_single_pass_writes_the_two_pass_dump():
+    two_pass = ExportGenerator(DATA, OBJECTS)._generate_attribute_mac()
+    single_pass = ExportGenerator({**DATA, "single_pass": True}, OBJECTS)._generate_rvm_mac()
+    # attribute.mac's collection and walk, verbatim and once, so TEMP.txt has the same rows in the same order
+    dump = two_pass[:two_pass.index("$* Hide the from")].strip()
+    assert dump in single_pass
+    assert single_pass.count("collect all") == 1
+    assert single_pass.index(dump) < single_pass.index("EXPORT FILE")
+    assert "$M " not in single_pass
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Batch callbacks must not pay for PyQt6; the GUI must paint within its budget."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run(*args, **kwargs):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, timeout=300, **kwargs)
+
+
+def test_command_line_import_is_qt_free():
+    result = _run("-c", "import sys, main, cli; print('PyQt6' in sys.modules)")
+    assert result.stdout.strip() == "False", result.stderr
+
+
+def test_import_budget():
+    result = _run("main.py", "startup-check", "--skip-gui")
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_first_paint_budget():
+    pytest.importorskip("PyQt6")
+    result = _run("main.py", "startup-check", env={**os.environ, "QT_QPA_PLATFORM": "offscreen"})
+    assert result.returncode == 0, result.stdout + result.stderr
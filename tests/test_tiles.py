@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from core import TILE_UNBOUNDED, TileExport, _pml_volume, plan_tiles, uncovered_elements
+
+
+def test_tile_edges():
+    tiles = plan_tiles((-1000, 2000, 5000, 8000), 3, 2)
+    assert tiles["X1Y1"] == [None, None, 1000, 5000]
+    assert tiles["X2Y2"] == [1000, 5000, 3000, None]
+    assert tiles["X3Y2"] == [3000, 5000, None, None]
+    assert _pml_volume(-1500, None, 3000, -400) == (
+        f"within W 1500 S {TILE_UNBOUNDED} D {TILE_UNBOUNDED} to E 3000 S 400 U {TILE_UNBOUNDED}")
+
+
+def test_elements_reaching_west_or_south_belong_to_the_neighbour():
+    def commands(tile):
+        data = {"proj_code": "PBZ", "mdb": "/PBZ-ALL", "part": "X", "tile": tile}
+        return TileExport(data, ["/U109A", "EXCLUDE /U109A/Z9"])._export_commands("RVM_LOG.txt")
+
+    assert "Difference" not in commands([None, None, 1000, 5000])
+    interior = commands([1000, 5000, None, None])
+    assert f"Var !WEST collect all ($!TTYPES) {_pml_volume(None, None, 1000, None)} for /U109A EXCLUDE /U109A/Z9" in interior
+    assert f"Var !SOUTH collect all ($!TTYPES) {_pml_volume(None, None, None, 5000)}" in interior
+
+
+def test_uncovered_elements_counts_what_no_tile_type_holds(tmp_path):
+    dump = tmp_path / "PBZ-attributes.txt"
+    dump.write_text("\n".join([
+        "NEW Header Information", "END",
+        "NEW /SITE-A", "Type := SITE",
+        "NEW /ZONE-A", "Type := ZONE",
+        "NEW /PUMP-1", "Type := EQUI", "NEW /PUMP-1/NOZ", "Type := NOZZ", "END", "END",
+        "NEW /STRU-1", "Type := STRU", "NEW /FRMW-1", "Type := FRMW", "END", "END",
+        "NEW /STRU-2", "Type := STRU", "NEW /PANE-1", "Type := PANE", "END", "END",
+        "NEW /SUPP-1", "Type := SUPPO", "END",
+        "END", "END",
+    ]), encoding="utf-8")
+    assert uncovered_elements(dump) == {"STRU": 1, "PANE": 1, "SUPPO": 1}
+    assert uncovered_elements(dump, ["EQUI", "FRMW", "STRU", "SUPPO"]) == {}
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Warm E3D session: one long-lived E3D per project and MDB on this machine that runs
+export macros dropped into its inbox, so back-to-back exports skip the E3D start-up
+and MDB open. The session is a PML loop (WARM.mac) polling a folder:
+
+    <root>/<PROJ>-<MDB>/inbox/      job macros waiting, run oldest first
+    <root>/<PROJ>-<MDB>/running/    the job E3D is running now
+    <root>/<PROJ>-<MDB>/done/       finished jobs (.done / .failed)
+    <root>/<PROJ>-<MDB>/heartbeat   touched every idle poll
+    <root>/<PROJ>-<MDB>/STOP        asks the session to exit after the current job
+    <root>/<PROJ>-<MDB>/EXITED      written by the session when it has left the loop
+
+Every job starts with GETWORK, so it exports the model as saved now and not as it
+was when the session opened the MDB.
+
+The session exits by itself after a number of jobs and is recycled when its memory
+grows too much (needs the optional psutil), so leaks in long E3D sessions stay bounded.
+"""
+
+import os
+import re
+import json
+import time
+import subprocess
+from pathlib import Path
+
+
+WARM_MAX_JOBS = 20             # jobs per session before it exits and a fresh one starts
+WARM_MAX_MEMORY_MB = 6144      # recycle an idle session above this (E3D and its children)
+WARM_POLL_SECONDS = 2          # idle wait of the PML loop between inbox checks
+WARM_HEARTBEAT_TIMEOUT = 60    # an idle session that has not touched its heartbeat this long is gone
+WARM_START_TIMEOUT = 600       # E3D start-up and MDB open, before the first heartbeat
+WARM_JOB_TIMEOUT = 4 * 3600    # a job longer than this means the session died in it
+WARM_KEEP_DONE = 200           # finished job files kept in done/
+
+# Detached, so a session outlives the batch file that started it
+_DETACHED = getattr(subprocess, "DETACHED_PROCESS", 0) | getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+
+
+class WarmSessionError(Exception):
+    """The warm session could not be started or did not take the job."""
+
+
+class WarmSession:
+    """Files and process of the warm session for one project and MDB."""
+
+    def __init__(self, root, data, max_jobs=WARM_MAX_JOBS, max_memory_mb=WARM_MAX_MEMORY_MB):
+        self.data = data
+        self.max_jobs = max_jobs
+        self.max_memory_mb = max_memory_mb
+        mdb = re.sub(r"[^A-Za-z0-9_-]+", "_", data["mdb"]).strip("_") or "MDB"
+        self.folder = Path(root) / f"{data['proj_code']}-{mdb}"
+        self.inbox = self.folder / "inbox"
+        self.running = self.folder / "running"
+        self.done = self.folder / "done"
+        self.macro_path = self.folder / "WARM.mac"
+        self.state_path = self.folder / "session.json"
+        self.heartbeat_path = self.folder / "heartbeat"
+        self.stop_path = self.folder / "STOP"
+        self.exited_path = self.folder / "EXITED"
+
+    # --- state -----------------------------------------------------------------------
+
+    def state(self):
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def _age(self, path):
+        try:
+            return time.time() - path.stat().st_mtime
+        except OSError:
+            return None
+
+    def running_jobs(self):
+        return sorted(self.running.glob("*.mac")) if self.running.is_dir() else []
+
+    def queued_jobs(self):
+        return sorted(self.inbox.glob("*.mac")) if self.inbox.is_dir() else []
+
+    def is_alive(self):
+        """True while the session is starting, idle with a fresh heartbeat, or running a job."""
+        state = self.state()
+        if not state or self.exited_path.exists():
+            return False
+        heartbeat = self._age(self.heartbeat_path)
+        if heartbeat is None:
+            return time.time() - state.get("started", 0) < WARM_START_TIMEOUT
+        if heartbeat < WARM_HEARTBEAT_TIMEOUT:
+            return True
+        return any(self._age(job) is not None and self._age(job) < WARM_JOB_TIMEOUT for job in self.running_jobs())
+
+    def memory_mb(self):
+        """Resident memory of the session's process tree, or None without psutil."""
+        pid = self.state().get("pid")
+        try:
+            import psutil
+        except ImportError:
+            return None
+        if not pid:
+            return None
+        try:
+            process = psutil.Process(pid)
+            tree = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in tree) / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    def needs_recycle(self):
+        memory = self.memory_mb()
+        return memory is not None and memory > self.max_memory_mb and not self.running_jobs()
+
+    # --- lifecycle -------------------------------------------------------------------
+
+    def bootstrap_macro(self):
+        """WARM.mac: the PML loop that runs the inbox jobs in this E3D."""
+        def bat(path):
+            return str(path).replace("/", "\\")
+
+        inbox, running, done = bat(self.inbox), bat(self.running), bat(self.done)
+        return f"""
+DESIGN
+$* Warm session: runs the job macros of the inbox, oldest first, until STOP or {self.max_jobs} jobs
+!JOBS = 0
+!INBOX = object FILE('{self.inbox.as_posix()}')
+!STOP = object FILE('{self.stop_path.as_posix()}')
+do
+  if !STOP.Exists() then
+    break
+  endif
+  !NAMES = ARRAY()
+  do !F values !INBOX.Files()
+    !NAMES.Append(!F.Name())
+  enddo
+  if !NAMES.Size() eq 0 then
+    SYSCOM |echo $!JOBS> "{bat(self.heartbeat_path)}" & timeout /t {WARM_POLL_SECONDS} /nobreak >nul|
+    skip
+  endif
+  !NAMES.Sort()
+  !JOB = !NAMES[1]
+  SYSCOM |move /y "{inbox}\\$!JOB" "{running}\\$!JOB" >nul|
+  $M /{self.running.as_posix()}/$!JOB
+  handle ANY
+    SYSCOM |move /y "{running}\\$!JOB" "{done}\\$!JOB.failed" >nul|
+  elsehandle NONE
+    SYSCOM |move /y "{running}\\$!JOB" "{done}\\$!JOB.done" >nul|
+  endhandle
+  !JOBS = !JOBS + 1
+  if !JOBS ge {self.max_jobs} then
+    break
+  endif
+enddo
+SYSCOM |echo $!JOBS> "{bat(self.exited_path)}"|
+FINISH
+"""
+
+    def start(self):
+        """Starts a new E3D on WARM.mac, detached from the caller."""
+        data = self.data
+        for folder in (self.inbox, self.running, self.done):
+            folder.mkdir(parents=True, exist_ok=True)
+        for path in (self.stop_path, self.exited_path, self.heartbeat_path):
+            path.unlink(missing_ok=True)
+        # A job left in running/ died with the previous session
+        for job in self.running_jobs():
+            os.replace(job, self.done / f"{job.name}.failed")
+        self.macro_path.write_text(self.bootstrap_macro(), encoding='utf-8')
+
+        aveva = Path(data["aveva_path"])
+        command = [str(aveva / "mon.exe"), "PROD", "E3D", "init", str(aveva / "launch.init"), "GRAPHICS",
+                   data["proj_code"], f"{data['user']}/{data['password']}", f"/{data['mdb']}",
+                   f"$M{self.macro_path}"]
+        try:
+            process = subprocess.Popen(command, creationflags=_DETACHED, close_fds=True,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            raise WarmSessionError(f"cannot start E3D: {e}")
+        self.state_path.write_text(json.dumps({"pid": process.pid, "started": time.time()}), encoding='utf-8')
+        print(f"[WARM] Started E3D session {self.folder.name} (pid {process.pid})")
+        return process.pid
+
+    def stop(self, timeout=WARM_JOB_TIMEOUT):
+        """Asks the session to exit after its current job and waits for it."""
+        if not self.is_alive():
+            return True
+        self.stop_path.write_text("stop", encoding='utf-8')
+        deadline = time.time() + timeout
+        while self.is_alive() and time.time() < deadline:
+            time.sleep(WARM_POLL_SECONDS)
+        return not self.is_alive()
+
+    # --- jobs ------------------------------------------------------------------------
+
+    def submit(self, macro_path, timeout=WARM_START_TIMEOUT, log_path=None):
+        """
+        Queues a macro for the session (starting or recycling it first when needed) and
+        returns once E3D has picked it up, so the caller can follow the macro's own log.
+        The job refreshes the session's view of the model (GETWORK) before the macro and
+        notes it in `log_path`, the macro's RVM_LOG.txt.
+        """
+        if self.is_alive() and self.needs_recycle():
+            print(f"[WARM] Recycling session at {self.memory_mb():.0f} MB")
+            self.stop()
+        if not self.is_alive():
+            self.start()
+
+        # Written beside the inbox and moved in, so the loop never reads half a file
+        name = f"{time.time_ns()}-{os.getpid()}.mac"
+        pending = self.folder / f"{name}.tmp"
+        lines = ["GETWORK"]
+        if log_path:
+            log_bat = str(log_path).replace("/", "\\")
+            lines.append(f"SYSCOM |echo [RVM] Getwork {self.folder.name} >> {log_bat}|")
+        lines.append(f"$M /{Path(macro_path).as_posix()}")
+        pending.write_text("\n".join(lines) + "\n", encoding='utf-8')
+        job = self.inbox / name
+        os.replace(pending, job)
+        self._prune_done()
+
+        deadline = time.time() + timeout
+        while job.exists():
+            if time.time() > deadline:
+                job.unlink(missing_ok=True)
+                raise WarmSessionError(f"session {self.folder.name} did not pick up the job in {timeout} s")
+            if not self.is_alive():
+                # It exited (job limit, STOP) between our check and the job landing in the inbox
+                self.start()
+            time.sleep(1)
+        return name
+
+    def _prune_done(self):
+        finished = sorted(self.done.iterdir(), key=lambda path: path.name) if self.done.is_dir() else []
+        for path in finished[:-WARM_KEEP_DONE]:
+            path.unlink(missing_ok=True)
+
+    def status(self):
+        state = self.state()
+        finished = [path.name for path in self.done.iterdir()] if self.done.is_dir() else []
+        return {
+            "session": self.folder.name,
+            "alive": self.is_alive(),
+            "pid": state.get("pid"),
+            "started": state.get("started"),
+            "memory_mb": self.memory_mb(),
+            "queued": len(self.queued_jobs()),
+            "running": [job.name for job in self.running_jobs()],
+            "done": sum(name.endswith(".done") for name in finished),
+            "failed": sum(name.endswith(".failed") for name in finished),
+        }
+
+
+def warm_sessions(root):
+    """Every session folder under a warm root, as (project, mdb) data for WarmSession."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    sessions = []
+    for folder in sorted(root.iterdir()):
+        if folder.is_dir() and "-" in folder.name:
+            project, mdb = folder.name.split("-", 1)
+            sessions.append(WarmSession(root, {"proj_code": project, "mdb": mdb}))
+    return sessions